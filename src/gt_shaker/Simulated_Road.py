@@ -17,14 +17,11 @@
 
 
 import numpy as np
-import time
 
-try:
-    from numba import njit
-except ImportError:
-    def njit(func): return func
+from .jit import kernel
+from .events import EV_BUMP, REF_BLOCK
 
-@njit(fastmath=True, cache=True)
+@kernel("(float32[::1], float64, float64, float64, float64, float64, float64)", prefer="numpy") # whole-array; NumPy measured ~3x faster
 def generate_texture_jit(steps, phase, jitter_phase, grain_rad, jitter_rad, texture_vol, speed_ramp):
     """ Generates road texture at C-speed """
     jitter = 0.3 * np.sin(jitter_phase + (steps * jitter_rad))
@@ -32,16 +29,16 @@ def generate_texture_jit(steps, phase, jitter_phase, grain_rad, jitter_rad, text
     return np.tanh(texture_wave * 2.5) * texture_vol * speed_ramp * 0.8
 
 class RoadSimulator:
-    def __init__(self, sample_rate):
+    def __init__(self, sample_rate, events=None):
         self.sample_rate = sample_rate
         self.wheelbase = 2.75
-        self.bump_queue = []
-        self.last_bump_time = 0
-        self.phase = 0.0
+        self.events = events # events.EventScheduler that plays the discrete bumps
+        self.last_bump_sample = -sample_rate
         self.texture_phase = 0.0
         self.jitter_phase = 0.0
 
-    def generate_bumps(self, speed_kmh, roughness, texture_vol, effects_vol, texture_freq, is_reverse, frame_count):
+    def generate_bumps(self, speed_kmh, roughness, texture_vol, effects_vol, texture_freq, is_reverse, frame_count, texture=None):
+        """ texture: optional (front vol, rear vol, freq Hz) from the road texture analysis, replacing the synthetic grain """
         abs_speed = abs(speed_kmh)
         if abs_speed < 3.0: return np.zeros(frame_count, dtype=np.float32), np.zeros(frame_count, dtype=np.float32)
 
@@ -50,7 +47,17 @@ class RoadSimulator:
         steps = np.arange(frame_count, dtype=np.float32)
         front_sig = np.zeros(frame_count, dtype=np.float32); rear_sig = np.zeros(frame_count, dtype=np.float32)
 
-        if texture_vol > 0:
+        if texture is not None:
+            tex_f, tex_r, tex_hz = texture
+            if tex_f > 0.001 or tex_r > 0.001:
+                grain_rad = 2 * np.pi * tex_hz / self.sample_rate
+                jitter_rad = 2 * np.pi * 10.0 / self.sample_rate
+                grain_wave = generate_texture_jit(steps, self.texture_phase, self.jitter_phase, grain_rad, jitter_rad, 1.0, 1.0)
+                if not is_reverse: front_sig += grain_wave * tex_f; rear_sig += grain_wave * tex_r
+                else: front_sig += grain_wave * tex_r; rear_sig += grain_wave * tex_f
+                self.texture_phase = (self.texture_phase + (frame_count * grain_rad)) % (2 * np.pi)
+                self.jitter_phase = (self.jitter_phase + (frame_count * jitter_rad)) % (2 * np.pi)
+        elif texture_vol > 0:
             grain_rad = 2 * np.pi * (float(texture_freq) + (v_ms * 0.3)) / self.sample_rate
             jitter_rad = 2 * np.pi * 10.0 / self.sample_rate
             grain_wave = generate_texture_jit(steps, self.texture_phase, self.jitter_phase, grain_rad, jitter_rad, texture_vol, speed_ramp)
@@ -58,34 +65,16 @@ class RoadSimulator:
             self.texture_phase = (self.texture_phase + (frame_count * grain_rad)) % (2 * np.pi)
             self.jitter_phase = (self.jitter_phase + (frame_count * jitter_rad)) % (2 * np.pi)
 
-        # Discrete Bumps handling (Standard Python is fine for low-frequency events)
-        now = time.time()
-        if roughness > 0 and effects_vol > 0:
-            if np.random.random() < (roughness * 0.15 * v_ms * 0.05) and (now - self.last_bump_time) > 0.1:
-                self.bump_queue.append({
-                    'rear_trigger': now + (self.wheelbase / v_ms),
-                    'intensity': np.random.uniform(0.5, 1.0) * roughness,
-                    'front_samples_left': int(0.15 * self.sample_rate),
-                    'rear_samples_left': int(0.15 * self.sample_rate),
-                    'rear_active': False
-                })
-                self.last_bump_time = now
-
-            step_rad = 2 * np.pi * 22.0 / self.sample_rate
-            active_bumps = []
-            for b in self.bump_queue:
-                w = np.sin(self.phase + (steps * step_rad)) * b['intensity'] * effects_vol * speed_ramp * 2.0
-                if b['front_samples_left'] > 0:
-                    if not is_reverse: front_sig += w
-                    else: rear_sig += w
-                    b['front_samples_left'] -= frame_count
-                if not b['rear_active'] and now >= b['rear_trigger']: b['rear_active'] = True
-                if b['rear_active'] and b['rear_samples_left'] > 0:
-                    if not is_reverse: rear_sig += w
-                    else: front_sig += w
-                    b['rear_samples_left'] -= frame_count
-                if b['front_samples_left'] > 0 or b['rear_samples_left'] > 0 or not b['rear_active']: active_bumps.append(b)
-            self.bump_queue = active_bumps
-            self.phase = (self.phase + (frame_count * step_rad)) % (2 * np.pi)
+        # Discrete bumps: front wheels at a random sample in this block, rears one wheelbase later.
+        # The chance is per second (it used to be per callback, i.e. it depended on the block size)
+        if roughness > 0 and effects_vol > 0 and self.events is not None:
+            p_block = roughness * 0.15 * v_ms * 0.05 * (frame_count / self.sample_rate) / REF_BLOCK
+            offset = int(np.random.randint(frame_count)); at = self.events.pos + offset
+            if np.random.random() < p_block and at - self.last_bump_sample > 0.1 * self.sample_rate:
+                amp = np.random.uniform(0.5, 1.0) * roughness * effects_vol * speed_ramp * 2.0
+                front, rear = (1, 0) if not is_reverse else (0, 1)
+                self.events.post(EV_BUMP, amp, g0=float(front == 0), g1=float(front == 1), offset=offset)
+                self.events.post(EV_BUMP, amp, g0=float(rear == 0), g1=float(rear == 1), offset=offset, delay=self.wheelbase / v_ms)
+                self.last_bump_sample = at
 
         return front_sig, rear_sig
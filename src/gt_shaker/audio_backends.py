@@ -0,0 +1,238 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+
+import threading, time, wave
+import numpy as np
+
+class OutputBackend:
+    """
+    Common interface for audio outputs.
+    Streaming mode: open(rate, channels, frames, render) where render(frame_count, xrun)
+    returns interleaved float32 bytes; the backend pulls blocks on its own thread.
+    Blocking mode: open(..., render=None) and push blocks with write().
+    """
+    name = 'base'
+
+    def __init__(self, audio_cfg):
+        self.audio_cfg = audio_cfg
+        self.rate = 48000; self.channels = 2; self.frames = 1024
+        self.render = None
+
+    def open(self, rate, channels, frames_per_buffer, render=None):
+        raise NotImplementedError
+
+    def start(self): raise NotImplementedError
+    def stop(self): raise NotImplementedError
+    def close(self): raise NotImplementedError
+    def is_open(self): raise NotImplementedError
+    def is_active(self): raise NotImplementedError
+    def write(self, samples): raise NotImplementedError
+
+    def terminate(self):
+        """ Releases the audio library itself (end of engine run) """
+        if self.is_open(): self.close()
+
+class PyAudioBackend(OutputBackend):
+    """ PortAudio callback stream (the original output path) """
+    name = 'pyaudio'
+
+    def __init__(self, audio_cfg):
+        super().__init__(audio_cfg)
+        import pyaudio
+        self.pyaudio = pyaudio
+        self.pa = pyaudio.PyAudio()
+        self.stream = None
+
+    def open(self, rate, channels, frames_per_buffer, render=None):
+        self.rate, self.channels, self.frames, self.render = rate, channels, frames_per_buffer, render
+        idx = self.audio_cfg.get('device_index', -1)
+        self.stream = self.pa.open(
+            format=self.pyaudio.paFloat32,
+            channels=channels,
+            rate=rate,
+            output=True,
+            output_device_index=None if idx == -1 else idx,
+            stream_callback=self._callback if render else None,
+            frames_per_buffer=frames_per_buffer
+        )
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        xrun = bool(status & (self.pyaudio.paOutputUnderflow | self.pyaudio.paOutputOverflow))
+        return (self.render(frame_count, xrun), self.pyaudio.paContinue)
+
+    def start(self): self.stream.start_stream()
+    def stop(self): self.stream.stop_stream()
+    def is_open(self): return self.stream is not None
+    def is_active(self): return self.stream is not None and self.stream.is_active()
+
+    def close(self):
+        try:
+            self.stream.stop_stream()
+            self.stream.close()
+        except: pass
+        self.stream = None
+
+    def write(self, samples):
+        self.stream.write(samples.astype(np.float32).tobytes())
+
+    def terminate(self):
+        super().terminate()
+        self.pa.terminate()
+
+class _ThreadedBackend(OutputBackend):
+    """ Shared pull loop for backends that render on their own writer thread """
+
+    def __init__(self, audio_cfg):
+        super().__init__(audio_cfg)
+        self.opened = False
+        self.active = False
+        self.thread = None
+        self.xrun = False
+        self.on_block = None    # Optional tap: callback(interleaved float32 block, monotonic time it starts playing)
+        self.play_start = None  # Set by _write_block
+
+    def open(self, rate, channels, frames_per_buffer, render=None):
+        self.rate, self.channels, self.frames, self.render = rate, channels, frames_per_buffer, render
+        self._open_device()
+        self.opened = True
+
+    def start(self):
+        if self.render is None: return
+        self.active = True
+        # A writer stuck in a slow block is still ours; never run two of them
+        if self.thread is not None and self.thread.is_alive(): return
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.active = False
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(2.0)
+            if not self.thread.is_alive(): self.thread = None
+
+    def close(self):
+        self.stop()
+        if self.opened: self._close_device()
+        self.opened = False
+
+    def is_open(self): return self.opened
+    def is_active(self): return self.active and self.thread is not None and self.thread.is_alive()
+
+    def _run(self):
+        while self.active:
+            data = self.render(self.frames, self.xrun)
+            self.xrun = False
+            self._write_block(data)
+            if self.on_block is not None: self.on_block(np.frombuffer(data, dtype=np.float32), self.play_start)
+
+    def write(self, samples):
+        self._write_block(samples.astype(np.float32).tobytes())
+
+    def _open_device(self): pass
+    def _close_device(self): pass
+    def _write_block(self, data): raise NotImplementedError
+
+class AlsaBackend(_ThreadedBackend):
+    """
+    Direct ALSA (or PipeWire's ALSA plugin) output with blocking writes.
+    Skips PortAudio's callback thread and ring buffer; the kernel's period
+    size paces the writer thread. Requires pyalsaaudio.
+    """
+    name = 'alsa'
+
+    def __init__(self, audio_cfg):
+        super().__init__(audio_cfg)
+        import alsaaudio
+        self.alsaaudio = alsaaudio
+        self.pcm = None
+
+    def _open_device(self):
+        a = self.alsaaudio
+        self.pcm = a.PCM(type=a.PCM_PLAYBACK, mode=a.PCM_NORMAL,
+                         device=self.audio_cfg.get('alsa_device', 'default'),
+                         channels=self.channels, rate=self.rate, format=a.PCM_FORMAT_FLOAT_LE,
+                         periodsize=self.frames, periods=int(self.audio_cfg.get('alsa_periods', 2)))
+
+    def _close_device(self):
+        try: self.pcm.close()
+        except Exception: pass
+        self.pcm = None
+
+    def _write_block(self, data):
+        try:
+            written = self.pcm.write(data)
+            if written is not None and written < 0: self.xrun = True # -EPIPE: underrun, ALSA re-prepares
+        except self.alsaaudio.ALSAAudioError:
+            self.xrun = True
+        # The write returns once there is room, i.e. with the other periods still queued ahead of this one
+        periods = int(self.audio_cfg.get('alsa_periods', 2))
+        self.play_start = time.monotonic() + (periods - 1) * self.frames / float(self.rate)
+
+class NullBackend(_ThreadedBackend):
+    """
+    Sound-card-free sink for CI, benchmarks and soak runs.
+    realtime=True paces blocks like a device (null_speed > 1 plays them that many times
+    faster, for accelerated soak runs); False renders as fast as possible.
+    wav_path optionally records the output as 16-bit PCM.
+    """
+    name = 'null'
+
+    def __init__(self, audio_cfg):
+        super().__init__(audio_cfg)
+        self.realtime = bool(audio_cfg.get('null_realtime', True))
+        self.speed = max(1e-3, float(audio_cfg.get('null_speed', 1.0)))
+        self.wav_path = audio_cfg.get('wav_path')
+        self.wav = None
+        self.next_deadline = 0.0
+        self.frames_written = 0
+
+    def _open_device(self):
+        self.next_deadline = time.monotonic()
+        if self.wav_path:
+            self.wav = wave.open(self.wav_path, 'wb')
+            self.wav.setnchannels(self.channels); self.wav.setsampwidth(2); self.wav.setframerate(self.rate)
+
+    def _close_device(self):
+        if self.wav is not None:
+            self.wav.close()
+            self.wav = None
+
+    def _write_block(self, data):
+        block = np.frombuffer(data, dtype=np.float32)
+        if self.wav is not None:
+            self.wav.writeframes((np.clip(block, -1.0, 1.0) * 32767.0).astype('<i2').tobytes())
+        self.frames_written += len(block) // self.channels
+        # A paced sink plays a block from its slot on the timeline, but never before it was written
+        self.play_start = max(self.next_deadline, time.monotonic()) if self.realtime else time.monotonic()
+        if self.realtime:
+            self.next_deadline += (len(block) // self.channels) / self.rate / self.speed
+            delay = self.next_deadline - time.monotonic()
+            if delay > 0: time.sleep(delay)
+            elif delay < -0.5: self.next_deadline = time.monotonic() # Resync after a stall
+
+BACKENDS = {'pyaudio': PyAudioBackend, 'alsa': AlsaBackend, 'null': NullBackend}
+
+def create_backend(audio_cfg):
+    """ Picks the backend named in audio.backend; falls back to PyAudio if the module is missing """
+    name = audio_cfg.get('backend', 'pyaudio')
+    try:
+        return BACKENDS.get(name, PyAudioBackend)(audio_cfg)
+    except ImportError as e:
+        print(f"ERROR: Audio backend '{name}' unavailable ({e}). Falling back to PyAudio.")
+        return PyAudioBackend(audio_cfg)
@@ -17,32 +17,19 @@
 
 import numpy as np
 from .Simulated_Road import RoadSimulator
+from .events import EventScheduler, EV_SHIFT, EV_IMPACT, B_IMPACT, B_SHIFT, B_ROAD
+from .jit import kernel
+from .eq import OutputEQ, DEFAULT_EQ
+from .limiter import LookaheadLimiter, DEFAULT_LIMITER
+from .governor import Q_NO_TEXTURE, Q_SIMPLE_ENGINE
+from .features import (F_ROAD_F, F_ROAD_R, F_IMPACT_F, F_IMPACT_R,
+                       F_TC_F, F_TC_R, F_ABS_F, F_ABS_R, F_BRAKING, F_TEX_F, F_TEX_R, F_TEX_HZ)
+from .control import C_RPM, C_SPEED, C_TRIG_F, C_TRIG_R, C_ROAD_F, C_ROAD_R
 
-try:
-    from numba import njit
-except ImportError:
-    def njit(f=None, *args, **kwargs):
-        if callable(f): return f
-        def decorator(func): return func
-        return decorator
 
 # --- JIT KERNELS (Uændret) ---
-@njit(fastmath=True, cache=True)
-def jit_suspension_logic(curr, last_pos, last_vel, road_thresh, impact_thresh):
-    r_f, r_r, i_f, i_r = 0.0, 0.0, 0.0, 0.0
-    new_pos = np.zeros(4, dtype=np.float32)
-    new_vel = np.zeros(4, dtype=np.float32)
-    for i in range(4):
-        v = curr[i] - last_pos[i]
-        a = np.abs(v - last_vel[i])
-        new_vel[i] = v; new_pos[i] = curr[i]
-        road_val = (np.maximum(0.0, a - road_thresh) * 400.0)**1.2
-        imp_val = np.maximum(0.0, a - impact_thresh) * 180.0
-        if i < 2: r_f += road_val; i_f = np.maximum(i_f, imp_val)
-        else: r_r += road_val; i_r = np.maximum(i_r, imp_val)
-    return r_f, r_r, i_f, i_r, new_pos, new_vel
-
-@njit(fastmath=True, cache=True)
+# Suspension physics moved to features.jit_suspension_step (runs once per packet)
+@kernel("(float32[::1], int64, float64)", prefer="numpy") # whole-array; NumPy measured ~4x faster
 def jit_engine_core(p_buf, profile_idx, rpm_ratio):
     if profile_idx == 1:
         p = np.sign(np.sin(p_buf)) * (np.abs(np.sin(p_buf))**4.0)
@@ -53,39 +40,61 @@ def jit_engine_core(p_buf, profile_idx, rpm_ratio):
     else:
         return np.sin(p_buf) + (rpm_ratio * 0.4) * np.sin(p_buf * 2.0)
 
-@njit(fastmath=True, cache=True)
-def jit_limiter(ch0, ch1, threshold=0.85):
-    c0 = np.where(np.abs(ch0) > threshold, np.tanh(ch0), ch0)
-    c1 = np.where(np.abs(ch1) > threshold, np.tanh(ch1), ch1)
-    return c0, c1
-
 class AudioProcessor:
     def __init__(self, sample_rate):
         self.sample_rate = sample_rate
-        self.road_sim = RoadSimulator(sample_rate)
+        self.events = EventScheduler(sample_rate)
+        self.road_sim = RoadSimulator(sample_rate, self.events)
+        self.eq = OutputEQ(sample_rate)
+        self.limiter = LookaheadLimiter(sample_rate)
+        self.quality = 0 # governor.QUALITY_LEVELS index, set by the engine
         self.steps_cache = np.arange(2048, dtype=np.float32)
         self.steps_cache_large = np.arange(3072, dtype=np.float32)
 
         self.rpm_phase = 0.0; self.susp_phase_road = 0.0; self.susp_phase_imp = 0.0
-        self.bump_phase = 0.0; self.bump_trigger = 0.0; self.traction_phase_r = 0.0
+        self.traction_phase_r = 0.0
         self.traction_phase_f = 0.0; self.smooth_rpm = 1000.0; self.last_gear = 0
-        self.last_susp_pos = np.zeros(4, dtype=np.float32)
-        self.last_susp_vel = np.zeros(4, dtype=np.float32)
-        self.last_car_vel_y = 0.0; self.current_gain = 0.0
+        self.current_gain = 0.0
 
         # Ducking State Variables
         self.reduction_smooth = 1.0     # Engine generic ducking
         self.traction_duck_smooth = 1.0 # Traction ducking (High Prio)
         self.susp_duck_smooth = 1.0     # Suspension ducking (Mid Prio)
 
-        self.impact_f_trigger = 0.0
-        self.impact_r_trigger = 0.0
         self.last_accel_z = 0.0
 
+    def configure(self, cfg, cfg_version=None):
+        """ Designs the EQ and limiter for cfg ahead of the first block (a chain prepared off the audio thread) """
+        self.eq.configure(cfg.get('output_eq', DEFAULT_EQ), cfg_version)
+        self.limiter.configure(cfg.get('limiter', DEFAULT_LIMITER))
+
+    def adopt(self, old):
+        """
+        Continues where `old` (the same chain at another synthesis rate) left off: phases,
+        smoothers and ducking, ringing event voices, EQ memories and the limiter's delay line.
+        Called on the audio thread between two blocks; the new chain was built and configured beforehand.
+        """
+        for k, v in vars(old).items():
+            if isinstance(v, (bool, int, float, np.generic)) and k != 'sample_rate': setattr(self, k, v)
+        to_new = self.events.adopt(old.events)
+        rs, ors = self.road_sim, old.road_sim
+        rs.texture_phase = ors.texture_phase; rs.jitter_phase = ors.jitter_phase
+        rs.last_bump_sample = to_new(ors.last_bump_sample)
+        self.eq.adopt(old.eq)
+        self.limiter.adopt(old.limiter)
+
     def get_stereo_gain(self, bal):
         bal = float(bal); return (1.0, bal * 2.0) if bal <= 0.5 else ((1.0 - bal) * 2.0, 1.0)
 
-    def process(self, data, cfg, frame_count, live_debug, is_muted=False, traction_triggers=(0.0, 0.0), is_braking=False):
+    def process(self, data, cfg, frame_count, live_debug, features, is_muted=False, controls=None, events=(), t0=None, cfg_version=None):
+        """
+        Synthesises one block from the packet-rate feature frame (see features.FEATURES).
+        `controls` (control.ControlInterpolator curves) replaces the held per-block values
+        of rpm, speed, slip and road level with per-sample ones when given.
+        `events` are the transients queued by the FeatureExtractor; t0 is the time the
+        block's first sample stands for, so they start on their own sample.
+        cfg_version (the engine's config version) spares the EQ re-checking an unchanged config.
+        """
         mix_ch0 = np.zeros(frame_count, dtype=np.float32)
         mix_ch1 = np.zeros(frame_count, dtype=np.float32)
 
@@ -107,7 +116,13 @@ class AudioProcessor:
         # ==========================================================
 
         # --- A. TRACTION LOSS (Highest Priority) ---
-        trig_f, trig_r = traction_triggers
+        if controls is not None:
+            trig_f_env = controls[C_TRIG_F]; trig_r_env = controls[C_TRIG_R]
+            trig_f = float(trig_f_env.max()); trig_r = float(trig_r_env.max())
+        else:
+            trig_f = trig_f_env = float(max(features[F_TC_F], features[F_ABS_F]))
+            trig_r = trig_r_env = float(max(features[F_TC_R], features[F_ABS_R]))
+        is_braking = features[F_BRAKING] > 0.0
         max_slip = max(trig_f, trig_r)
         trac_cfg = cfg['effects'].get('traction', {})
 
@@ -125,36 +140,16 @@ class AudioProcessor:
         # 2. EFFEKT GENERERING
         # ==========================================================
 
-        # --- IMPACT (Uheld/Kanter - Duckes IKKE) ---
+        # --- TRANSIENTS (impacts, gear shifts, kerbs; bumps are posted by the road sim) ---
         obs_cfg = cfg['effects'].get('obstacle_impact', {'enabled': True, 'volume': 1.0, 'threshold': 50.0})
-        if obs_cfg['enabled'] and not is_muted:
-            surge = getattr(data, 'surge_g', 0.0)
-            sway  = getattr(data, 'sway_g', 0.0)
-            thresh = float(obs_cfg.get('threshold', 50.0))
-            scale_factor = 0.05
-
-            if surge < -thresh:
-                self.impact_f_trigger = max(self.impact_f_trigger, min(5.0, (abs(surge) - thresh) * scale_factor))
-            elif surge > thresh:
-                self.impact_r_trigger = max(self.impact_r_trigger, min(5.0, (abs(surge) - thresh) * scale_factor))
-            if abs(sway) > thresh:
-                side_val = min(5.0, (abs(sway) - thresh) * scale_factor)
-                self.impact_f_trigger = max(self.impact_f_trigger, side_val)
-                self.impact_r_trigger = max(self.impact_r_trigger, side_val)
-
-        if self.impact_f_trigger > 0 or self.impact_r_trigger > 0:
-            imp_freq = float(obs_cfg.get('freq', 30.0))
-            imp_step = 2 * np.pi * imp_freq / self.sample_rate
-            imp_vol = float(obs_cfg.get('volume', 1.0)) * safe_gain
-
-            # Impact duckes ikke af nogen (det er en "ulykke")
-            if self.impact_f_trigger > 0:
-                mix_ch0 += np.sin(self.bump_phase + (steps * imp_step)) * self.impact_f_trigger * imp_vol
-                self.impact_f_trigger = max(0, self.impact_f_trigger - 0.5)
-            if self.impact_r_trigger > 0:
-                mix_ch1 += np.sin(self.bump_phase + (steps * imp_step)) * self.impact_r_trigger * imp_vol
-                self.impact_r_trigger = max(0, self.impact_r_trigger - 0.5)
-            self.bump_phase = (self.bump_phase + (frame_count * imp_step)) % (2 * np.pi)
+        ev = self.events
+        ev.begin(t0)
+        if not is_muted:
+            for kind, t, ch, amp in events:
+                g0 = 1.0 if ch != 1 else 0.0; g1 = 1.0 if ch != 0 else 0.0
+                if kind == EV_IMPACT: ev.post(kind, amp, g0, g1, t=t, group=1 + ch, freq=float(obs_cfg.get('freq', 30.0)))
+                elif kind == EV_SHIFT: ev.post(kind, amp, g0, g1, t=t, group=0)
+                else: ev.post(kind, amp, g0, g1, t=t)
 
         # --- 1. SUSPENSION ---
         # (Ducks Engine/Road via 'duck_from_suspension', Ducked by Traction via 'duck_from_traction')
@@ -162,14 +157,9 @@ class AudioProcessor:
         target_susp_duck = 1.0
 
         if susp_cfg['enabled'] and data.speed_kmh > 4.0:
-            curr_susp = np.array([data.suspension_height_FL, data.suspension_height_FR, data.suspension_height_RL, data.suspension_height_RR], dtype=np.float32)
-            r_f, r_r, i_f, i_r, self.last_susp_pos, self.last_susp_vel = jit_suspension_logic(
-                curr_susp, self.last_susp_pos, self.last_susp_vel,
-                float(susp_cfg.get('threshold', 0.5)) * 0.012,
-                (float(susp_cfg.get('impact_threshold', 3.0)) / 40.0) * 0.040
-            )
-            g_body = abs(data.vel_y - self.last_car_vel_y); self.last_car_vel_y = data.vel_y
-            if g_body > 0.05: i_f += g_body * 15.0; i_r += g_body * 15.0
+            r_f = float(features[F_ROAD_F]); r_r = float(features[F_ROAD_R])
+            i_f = float(features[F_IMPACT_F]); i_r = float(features[F_IMPACT_R])
+            road_f_env, road_r_env = (controls[C_ROAD_F], controls[C_ROAD_R]) if controls is not None else (r_f, r_r)
 
             # --- NY DUCKING LOGIK (Noise Gated Impact) ---
             total_impact = i_f + i_r
@@ -203,8 +193,8 @@ class AudioProcessor:
             susp_vol = float(susp_cfg.get('road_volume', 1.0)) * duck_from_traction
             imp_vol = float(susp_cfg.get('impact_volume', 1.0)) * duck_from_traction
 
-            mix_ch0 += ((t_road * r_r * susp_vol * gR_susp) + (t_imp * i_r * imp_vol * gR_susp))
-            mix_ch1 += ((t_road * r_f * susp_vol * gF_susp) + (t_imp * i_f * imp_vol * gF_susp))
+            mix_ch0 += ((t_road * road_r_env * susp_vol * gR_susp) + (t_imp * i_r * imp_vol * gR_susp))
+            mix_ch1 += ((t_road * road_f_env * susp_vol * gF_susp) + (t_imp * i_f * imp_vol * gF_susp))
 
         # Opdater Suspension Ducking Smooth (Sender værdien videre til Engine/Road sektionerne)
         self.susp_duck_smooth = (self.susp_duck_smooth * 0.8) + (target_susp_duck * 0.2)
@@ -216,10 +206,18 @@ class AudioProcessor:
         # --- SIM ROAD (Ducked by Traction AND Suspension) ---
         if cfg['effects']['sim_road'].get('enabled', True):
             sim_cfg = cfg['effects']['sim_road']
+            texture = None
+            tex_volume = float(sim_cfg.get('texture_volume', 0.5))
+            if self.quality >= Q_NO_TEXTURE:
+                texture = (0.0, 0.0, 0.0); tex_volume = 0.0 # Governor: bumps only
+            elif sim_cfg.get('texture_mode', 'analyzed') == 'analyzed':
+                # Texture follows what the suspension actually reports; the slider sets the ceiling
+                texture = (tex_volume * float(features[F_TEX_F]), tex_volume * float(features[F_TEX_R]),
+                           float(sim_cfg.get('texture_freq', 30.0)) + float(features[F_TEX_HZ]))
             road_f, road_r = self.road_sim.generate_bumps(
                 data.speed_kmh, float(sim_cfg.get('roughness', 0.3)),
-                float(sim_cfg.get('texture_volume', 0.5)), float(sim_cfg.get('volume', 1.0)),
-                float(sim_cfg.get('texture_freq', 30.0)), data.gear == 0, frame_count
+                tex_volume, float(sim_cfg.get('volume', 1.0)),
+                float(sim_cfg.get('texture_freq', 30.0)), data.gear == 0, frame_count, texture
             )
 
             # PÅFØR DOBBELT DUCKING (Traction * Suspension)
@@ -233,14 +231,25 @@ class AudioProcessor:
         # --- ENGINE (Ducked by Traction AND Suspension) ---
         rpm_cfg = cfg['effects']['rpm']
         if rpm_cfg['enabled'] and data.engine_rpm > 10.0:
-            if data.gear != self.last_gear: self.smooth_rpm = data.engine_rpm
-            else: self.smooth_rpm = (self.smooth_rpm * 0.2) + (data.engine_rpm * 0.8)
-            rpm_ratio = min(max(self.smooth_rpm, 0) / (data.car_max_rpm or 8000), 1.0)
-            rpm_freq = float(rpm_cfg.get('min_freq', 25.0)) + (rpm_ratio * (float(rpm_cfg.get('max_freq', 90.0)) - float(rpm_cfg.get('min_freq', 25.0))))
-            s_rad = 2 * np.pi * rpm_freq / self.sample_rate
+            min_freq = float(rpm_cfg.get('min_freq', 25.0)); max_freq = float(rpm_cfg.get('max_freq', 90.0))
             p_idx = 1 if rpm_cfg.get('profile') == 'v8' else (2 if rpm_cfg.get('profile') == 'boxer' else 0)
-            wave = jit_engine_core(self.rpm_phase + (steps * s_rad), p_idx, rpm_ratio)
-            self.rpm_phase = (self.rpm_phase + (frame_count * s_rad)) % (2 * np.pi)
+            if self.quality >= Q_SIMPLE_ENGINE: p_idx = 0 # Governor: plain two-partial engine
+            if controls is not None:
+                # Per-sample frequency: accumulate phase so shifts glide instead of stepping per block
+                self.smooth_rpm = float(controls[C_RPM][-1])
+                rpm_ratio = np.minimum(controls[C_RPM] / (data.car_max_rpm or 8000), 1.0)
+                s_rad = (2 * np.pi / self.sample_rate) * (min_freq + rpm_ratio * (max_freq - min_freq))
+                phases = np.cumsum(s_rad)
+                wave = jit_engine_core(self.rpm_phase + phases - s_rad, p_idx, float(rpm_ratio.mean()))
+                self.rpm_phase = (self.rpm_phase + float(phases[-1])) % (2 * np.pi)
+            else:
+                if data.gear != self.last_gear: self.smooth_rpm = data.engine_rpm
+                else: self.smooth_rpm = (self.smooth_rpm * 0.2) + (data.engine_rpm * 0.8)
+                rpm_ratio = min(max(self.smooth_rpm, 0) / (data.car_max_rpm or 8000), 1.0)
+                rpm_freq = min_freq + (rpm_ratio * (max_freq - min_freq))
+                s_rad = 2 * np.pi * rpm_freq / self.sample_rate
+                wave = jit_engine_core(self.rpm_phase + (steps * s_rad), p_idx, rpm_ratio)
+                self.rpm_phase = (self.rpm_phase + (frame_count * s_rad)) % (2 * np.pi)
 
             # PÅFØR DOBBELT DUCKING (Traction * Suspension)
             total_duck_factor = duck_from_traction * duck_from_suspension
@@ -248,22 +257,28 @@ class AudioProcessor:
             # Smooth overgangen en smule mere for motorlyden for at undgå "hak"
             self.reduction_smooth = (self.reduction_smooth * 0.8) + (max(0.15, total_duck_factor) * 0.2)
 
-            eff_vol = (float(rpm_cfg.get('pit_boost', 0.8)) * (1.0 - min(data.speed_kmh / 8.0, 1.0))) + (float(rpm_cfg.get('volume', 0.5)) * min(data.speed_kmh / 8.0, 1.0))
+            pit_mix = np.minimum(controls[C_SPEED] / 8.0, 1.0) if controls is not None else min(data.speed_kmh / 8.0, 1.0)
+            eff_vol = (float(rpm_cfg.get('pit_boost', 0.8)) * (1.0 - pit_mix)) + (float(rpm_cfg.get('volume', 0.5)) * pit_mix)
             amp = (0.6 + (rpm_ratio ** 1.5) * 0.8) * eff_vol * safe_gain * self.reduction_smooth
             gR_rpm, gF_rpm = self.get_stereo_gain(rpm_cfg.get('balance', 0.5))
             mix_ch0 += wave * amp * gR_rpm; mix_ch1 += wave * amp * gF_rpm
 
-        # --- GEAR SHIFT (Ducked by Traction) ---
-        if cfg['effects'].get('gear_shift', {}).get('enabled') and data.gear != self.last_gear: self.bump_trigger = 2.5
-        if self.bump_trigger > 0:
-            b_step = 2 * np.pi * 32.0 / self.sample_rate
+        # --- EVENT VOICES: impacts (not ducked), gear shift (ducked by traction), bumps/kerbs (road ducking) ---
+        bus = ev.render(frame_count)
+        live_debug['voices'] = ev.active
+        if bus is not None:
+            imp_vol = float(obs_cfg.get('volume', 1.0)) * safe_gain
+            mix_ch0 += bus[B_IMPACT * 2] * imp_vol; mix_ch1 += bus[B_IMPACT * 2 + 1] * imp_vol
+
             # Gear shift skal mærkes, men vi lader Traction loss ducke den lidt, hvis det går helt galt
-            gear_duck = max(0.5, duck_from_traction)
-            b_wave = np.sin(self.bump_phase + (steps * b_step)) * self.bump_trigger * float(cfg['effects']['gear_shift'].get('volume', 1.0)) * safe_gain * gear_duck
-            self.bump_phase = (self.bump_phase + (frame_count * b_step)) % (2 * np.pi)
-            gR_gear, gF_gear = self.get_stereo_gain(cfg['effects']['gear_shift'].get('balance', 0.5))
-            mix_ch0 += b_wave * gR_gear; mix_ch1 += b_wave * gF_gear
-            self.bump_trigger = max(0, self.bump_trigger - 0.15)
+            gear_cfg = cfg['effects'].get('gear_shift', {})
+            gear_vol = float(gear_cfg.get('volume', 1.0)) * safe_gain * max(0.5, duck_from_traction)
+            gR_gear, gF_gear = self.get_stereo_gain(gear_cfg.get('balance', 0.5))
+            mix_ch0 += bus[B_SHIFT * 2] * (gear_vol * gR_gear); mix_ch1 += bus[B_SHIFT * 2 + 1] * (gear_vol * gF_gear)
+
+            road_vol = 0.7 * safe_gain * duck_from_traction * duck_from_suspension
+            mix_ch0 += bus[B_ROAD * 2] * road_vol; mix_ch1 += bus[B_ROAD * 2 + 1] * road_vol
+            if cfg['effects']['sim_road'].get('enabled', True): live_debug['sim_road'] += float(np.max(np.abs(bus[B_ROAD * 2:])))
 
         # --- TRACTION / ABS (Ingen ducking - den er kongen) ---
         if trac_cfg.get('enabled', True):
@@ -281,15 +296,23 @@ class AudioProcessor:
                 sr = 2 * np.pi * r_freq / self.sample_rate
                 wave = np.sin(self.traction_phase_r + (steps * sr))
                 if is_braking: wave = np.sign(wave) * 0.5 + wave * 0.5
-                mix_ch0 += wave * t_vol * trig_r * 3.0
+                mix_ch0 += wave * t_vol * trig_r_env * 3.0
                 self.traction_phase_r = (self.traction_phase_r + (frame_count * sr)) % (2 * np.pi)
             if trig_f > 0.001:
                 sf = 2 * np.pi * f_freq / self.sample_rate
                 wave = np.sin(self.traction_phase_f + (steps * sf))
                 if is_braking: wave = np.sign(wave) * 0.5 + wave * 0.5
-                mix_ch1 += wave * t_vol * trig_f * 3.0
+                mix_ch1 += wave * t_vol * trig_f_env * 3.0
                 self.traction_phase_f = (self.traction_phase_f + (frame_count * sf)) % (2 * np.pi)
 
         self.last_gear = data.gear
-        mix_ch0, mix_ch1 = jit_limiter(mix_ch0, mix_ch1, 0.85)
+
+        # Per-shaker high-pass / low-pass / peaking EQ (state carries across blocks)
+        self.eq.configure(cfg.get('output_eq', DEFAULT_EQ), cfg_version)
+        self.eq.process(0, mix_ch0); self.eq.process(1, mix_ch1)
+
+        # Look-ahead peak limiter instead of tanh clipping: keeps the waveform clean under load
+        self.limiter.configure(cfg.get('limiter', DEFAULT_LIMITER))
+        self.limiter.process(0, mix_ch0); self.limiter.process(1, mix_ch1)
+        live_debug['limiter_gr'] = self.limiter.meter(frame_count / self.sample_rate)
         return np.clip(mix_ch0 * gain_envelope, -0.98, 0.98), np.clip(mix_ch1 * gain_envelope, -0.98, 0.98)
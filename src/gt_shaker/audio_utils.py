@@ -17,27 +17,20 @@
 
 
 import numpy as np
-import pyaudio
+from .audio_backends import create_backend
 
 def play_test_tone(cfg, side):
     """ 
     Hardware verification function.
     Generates a short 60Hz burst for testing rear/front shaker output.
     """
-    pa = pyaudio.PyAudio()
-    idx = cfg['audio'].get('device_index', -1)
+    backend = create_backend(cfg['audio'])
     rate = int(cfg['audio'].get('sample_rate', 48000))
     vol = float(cfg.get('master_volume', 0.5))
     buffer_size = 2048
     
     try:
-        stream = pa.open(
-            format=pyaudio.paFloat32, 
-            channels=2, 
-            rate=rate, 
-            output=True, 
-            output_device_index=None if idx == -1 else idx
-        )
+        backend.open(rate, 2, buffer_size)
         steps = np.arange(buffer_size)
         phase = 0.0
         trigger = 1.0
@@ -53,12 +46,10 @@ def play_test_tone(cfg, side):
             else:
                 out = np.column_stack((np.zeros(buffer_size, dtype=np.float32), tone))
                 
-            stream.write(np.clip(out, -0.95, 0.95).astype(np.float32).tobytes())
+            backend.write(np.clip(out, -0.95, 0.95).ravel())
             trigger *= 0.90
             
-        stream.stop_stream()
-        stream.close()
     except Exception as e:
         print(f"Hardware test error: {e}")
     finally:
-        pa.terminate()
+        backend.terminate()
@@ -0,0 +1,185 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+# Micro-benchmarks for the per-packet and per-block hot paths.
+# Usage: python -m gt_shaker.bench [name ...]
+
+import sys, time
+import numpy as np
+
+def _timeit(fn, n, warmup=50):
+    """ Returns (mean, p99) microseconds per call """
+    for _ in range(warmup): fn()
+    samples = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        t0 = time.perf_counter(); fn(); samples[i] = time.perf_counter() - t0
+    return samples.mean() * 1e6, np.percentile(samples, 99) * 1e6
+
+def bench_road_texture(n=20000):
+    """ RoadTextureAnalyzer.push, i.e. the added cost per packet """
+    from .road_texture import RoadTextureAnalyzer
+    rng = np.random.default_rng(0)
+    heights = 0.1 + 0.002 * rng.standard_normal((n + 50, 4))
+    for window in (32, 64, 128):
+        a = RoadTextureAnalyzer(window=window)
+        it = iter(heights)
+        mean, p99 = _timeit(lambda: a.push(next(it)), n)
+        print(f"road_texture window={window:<4} {mean:8.2f} us/packet  p99 {p99:8.2f} us")
+
+def bench_kernels(n=5000):
+    """ Every registered kernel: numba vs. its NumPy fallback on the same inputs """
+    from . import jit
+    jit.warmup(verbose=False)
+    jit._load_kernel_modules()
+    rng = np.random.default_rng(0)
+    for name, disp, signatures, impl, _, sample in jit.KERNELS:
+        for sig in signatures:
+            args = sample(sig, rng, 3072)
+            line = f"{name:<22}"
+            if disp is not None:
+                mean, p99 = _timeit(lambda: disp(*args), n)
+                line += f" numba {mean:8.2f} us (p99 {p99:7.2f})"
+            mean, p99 = _timeit(lambda: impl(*args), n)
+            print(line + f"   numpy {mean:8.2f} us (p99 {p99:7.2f})")
+
+def bench_render(n=300, frame_count=3072):
+    """ One device block through AudioProcessor: full device rate vs. ~3 kHz + polyphase upsampling """
+    import types
+    from .audio_processor import AudioProcessor
+    from .features import FEATURES, F_ROAD_F, F_ROAD_R, F_TC_R, F_TEX_F, F_TEX_R, F_TEX_HZ
+    from .resample import Upsampler, internal_factor
+    from . import jit
+    jit.warmup(verbose=False)
+
+    # Every effect on (web_app's defaults, without importing the Flask app)
+    cfg = {'master_volume': 0.75, 'output_headroom': 0.5, 'effects': {
+        'rpm': {'enabled': True, 'volume': 0.25, 'pit_boost': 0.8, 'balance': 0.5, 'min_freq': 25.0, 'max_freq': 60.0, 'profile': 'v8'},
+        'gear_shift': {'enabled': True, 'volume': 1.0, 'balance': 0.5},
+        'suspension': {'enabled': True, 'balance': 0.5, 'road_volume': 1.0, 'impact_volume': 1.0, 'priority': True, 'rpm_dim': 0.5},
+        'traction': {'enabled': True, 'volume': 0.8, 'front_freq': 38.0, 'rear_freq': 34.0, 'priority': True},
+        'sim_road': {'enabled': True, 'volume': 0.5, 'texture_volume': 0.5, 'texture_freq': 30.0, 'roughness': 0.3},
+        'obstacle_impact': {'enabled': True, 'volume': 1.0, 'threshold': 50.0, 'freq': 30.0}}}
+    data = types.SimpleNamespace(speed_kmh=120.0, engine_rpm=6000.0, car_max_rpm=8000, gear=4, surge_g=0.0, sway_g=0.0)
+    features = np.zeros(len(FEATURES), dtype=np.float32)
+    features[F_ROAD_F] = features[F_ROAD_R] = 0.3; features[F_TC_R] = 0.5
+    features[F_TEX_F] = features[F_TEX_R] = 0.5; features[F_TEX_HZ] = 8.0
+    debug = {}
+
+    for rate in (44100, 48000, 96000):
+        full = AudioProcessor(rate)
+        def run_full():
+            ch0, ch1 = full.process(data, cfg, frame_count, debug, features, cfg_version=0)
+            return np.column_stack((ch0, ch1)).flatten().astype(np.float32)
+        t_full, _ = _timeit(run_full, n)
+
+        up = Upsampler(internal_factor(rate, 3000))
+        dec = AudioProcessor(rate / up.factor)
+        def run_decimated():
+            m = up.needed(frame_count)
+            if m:
+                ch0, ch1 = dec.process(data, cfg, m, debug, features, cfg_version=0)
+                up.process(np.column_stack((ch0, ch1)))
+            return np.clip(up.pull(frame_count), -0.98, 0.98)
+        t_dec, _ = _timeit(run_decimated, n)
+        print(f"render {rate:>5} Hz x{frame_count}: full {t_full:8.1f} us   {rate / up.factor:.0f} Hz + x{up.factor} upsample {t_dec:8.1f} us   ({t_full / t_dec:.1f}x)")
+
+def bench_eq(n=2000, frame_count=3072, channels=8, rate=48000):
+    """ OutputEQ (HP + LP + 2 peaks per channel) across 8 channels vs. the block budget """
+    from .eq import OutputEQ
+    from . import jit
+    jit.warmup(verbose=False)
+    names = tuple(f"ch{c}" for c in range(channels))
+    band = {"highpass_hz": 12.0, "lowpass_hz": 200.0, "peaks": [{"freq": 45.0, "gain_db": -6.0, "q": 4.0}, {"freq": 30.0, "gain_db": 3.0, "q": 1.5}]}
+    eq = OutputEQ(rate, channels=names)
+    eq.configure(dict({"enabled": True}, **{name: band for name in names}))
+    bufs = [np.random.default_rng(c).uniform(-0.5, 0.5, frame_count).astype(np.float32) for c in range(channels)]
+    def run():
+        for c in range(channels): eq.process(c, bufs[c])
+    mean, p99 = _timeit(run, n)
+    budget = frame_count / rate * 1e6
+    print(f"eq {channels} ch x 4 biquads x{frame_count} @ {rate} Hz: {mean:8.1f} us (p99 {p99:7.1f}) = {100 * mean / budget:.2f}% of the {budget / 1000:.0f} ms block")
+
+def bench_limiter(n=2000, frame_count=3072, rate=48000):
+    """ Look-ahead limiter on a signal that spends most of its time above the ceiling """
+    from .limiter import LookaheadLimiter, DEFAULT_LIMITER
+    from . import jit
+    jit.warmup(verbose=False)
+    lim = LookaheadLimiter(rate)
+    lim.configure(DEFAULT_LIMITER)
+    src = [np.random.default_rng(c).uniform(-1.5, 1.5, frame_count).astype(np.float32) for c in range(2)]
+    bufs = [s.copy() for s in src]
+    def run():
+        # Refill first: the limiter works in place
+        for c in range(2):
+            bufs[c][:] = src[c]; lim.process(c, bufs[c])
+    mean, p99 = _timeit(run, n)
+    budget = frame_count / rate * 1e6
+    print(f"limiter 2 ch x{frame_count} @ {rate} Hz: {mean:8.1f} us (p99 {p99:7.1f}) = {100 * mean / budget:.2f}% of the {budget / 1000:.0f} ms block, GR {lim.meter(0.0):.1f} dB")
+
+def bench_events(n=2000, frame_count=3072, rate=48000):
+    """ Event voice rendering: cost per block against the number of active voices """
+    from .events import EventScheduler, EV_SHIFT
+    from . import jit
+    jit.warmup(verbose=False)
+    budget = frame_count / rate * 1e6
+    for voices in (0, 1, 4, 16, 32):
+        ev = EventScheduler(rate)
+        def run():
+            # Keep `voices` long notes sounding; the pool retires nothing during the run
+            if ev.active < voices:
+                for _ in range(voices - ev.active): ev.post(EV_SHIFT, 1000.0)
+            ev.render(frame_count)
+        mean, p99 = _timeit(run, n)
+        print(f"events {voices:2d} voices x{frame_count} @ {rate} Hz: {mean:8.1f} us (p99 {p99:7.1f}) = {100 * mean / budget:.2f}% of the {budget / 1000:.0f} ms block")
+
+def bench_decode(n=20, packets=20000):
+    """ Vectorised bulk decode vs. the live per-packet path (decrypt_packet + GTData) """
+    from .bulk_decode import decode_records, decode_with_gtdata
+    from .capture import RECORD_DTYPE
+    from .console_sim import build_packet, cruise
+    from .network_manager import encrypt_packet
+    records = np.zeros(packets, dtype=RECORD_DTYPE)
+    for i in range(packets):
+        data = encrypt_packet(build_packet(packet_id=i, **cruise(i / 60.0)), (i * 2654435761) & 0xFFFFFFFF)
+        records[i]['time'] = i / 60.0; records[i]['length'] = len(data)
+        records[i]['data'][:len(data)] = np.frombuffer(data, dtype=np.uint8)
+    bulk, _ = _timeit(lambda: decode_records(records), n, warmup=2)
+    live, _ = _timeit(lambda: decode_with_gtdata(records[:2000]), max(1, n // 4), warmup=1)
+    bulk_pps = packets / (bulk / 1e6); live_pps = 2000 / (live / 1e6)
+    print(f"decode {packets} packets: bulk {bulk_pps:10.0f} packets/s, GTData {live_pps:10.0f} packets/s ({bulk_pps / live_pps:.1f}x)")
+
+BENCHMARKS = {
+    'road_texture': bench_road_texture,
+    'kernels': bench_kernels,
+    'render': bench_render,
+    'eq': bench_eq,
+    'limiter': bench_limiter,
+    'events': bench_events,
+    'decode': bench_decode,
+}
+
+def main(argv=None):
+    names = (argv if argv is not None else sys.argv[1:]) or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark '{name}'. Available: {', '.join(BENCHMARKS)}")
+            continue
+        BENCHMARKS[name]()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import argparse, json, os, time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .capture import open_capture
+from .network_manager import GT7_KEY, PACKET_SIZE
+
+# --- Vectorised Salsa20 (keystream for many packets, each with its own nonce) ---
+_SIGMA = np.array([0x61707865, 0x3320646e, 0x79622d32, 0x6b206574], dtype=np.uint32)
+_KEY = np.frombuffer(GT7_KEY, dtype='<u4').astype(np.uint32)
+_BLOCKS = -(-PACKET_SIZE // 64) # 64-byte keystream blocks per packet
+
+def _rotl(x, n):
+    return (x << np.uint32(n)) | (x >> np.uint32(32 - n))
+
+def _quarter(x, a, b, c, d):
+    x[b] ^= _rotl(x[a] + x[d], 7)
+    x[c] ^= _rotl(x[b] + x[a], 9)
+    x[d] ^= _rotl(x[c] + x[b], 13)
+    x[a] ^= _rotl(x[d] + x[c], 18)
+
+def salsa20_keystream(iv):
+    """ (n, _BLOCKS * 64) uint8 keystream for the per-packet IVs (GT7 nonce = iv ^ 0xDEADBEAF, iv) """
+    n = len(iv)
+    lanes = n * _BLOCKS
+    init = np.empty((16, lanes), dtype=np.uint32)
+    init[0] = _SIGMA[0]; init[5] = _SIGMA[1]; init[10] = _SIGMA[2]; init[15] = _SIGMA[3]
+    init[1:5] = _KEY[:4, None]; init[11:15] = _KEY[4:, None]
+    init[6] = np.repeat(iv ^ np.uint32(0xDEADBEAF), _BLOCKS); init[7] = np.repeat(iv, _BLOCKS)
+    init[8] = np.tile(np.arange(_BLOCKS, dtype=np.uint32), n); init[9] = 0
+    x = init.copy()
+    with np.errstate(over='ignore'):
+        for _ in range(10):
+            _quarter(x, 0, 4, 8, 12); _quarter(x, 5, 9, 13, 1); _quarter(x, 10, 14, 2, 6); _quarter(x, 15, 3, 7, 11)
+            _quarter(x, 0, 1, 2, 3); _quarter(x, 5, 6, 7, 4); _quarter(x, 10, 11, 8, 9); _quarter(x, 15, 12, 13, 14)
+        x += init
+    # (16, n*blocks) words -> per packet: block after block, 16 little-endian words each
+    return np.ascontiguousarray(x.T).astype('<u4').view(np.uint8).reshape(n, _BLOCKS * 64)
+
+def decrypt_packets(data):
+    """ (n, >=PACKET_SIZE) uint8 ciphertexts -> (n, PACKET_SIZE) plaintexts """
+    data = np.ascontiguousarray(data[:, :PACKET_SIZE])
+    iv = data[:, 0x40:0x44].copy().view('<u4').reshape(-1).astype(np.uint32)
+    return data ^ salsa20_keystream(iv)[:, :PACKET_SIZE]
+
+# --- Structured decode: the GTData layout as one NumPy dtype ---
+_RAW = [
+    ('magic', 'S4', 0x00), ('position_x', '<f4', 0x04), ('position_y', '<f4', 0x08), ('position_z', '<f4', 0x0C),
+    ('velocity_x', '<f4', 0x10), ('vel_y', '<f4', 0x14), ('velocity_z', '<f4', 0x18), ('yaw', '<f4', 0x20),
+    ('engine_rpm', '<f4', 0x3C), ('speed', '<f4', 0x4C),
+    ('tire_temp_FL', '<f4', 0x60), ('tire_temp_FR', '<f4', 0x64), ('tire_temp_RL', '<f4', 0x68), ('tire_temp_RR', '<f4', 0x6C),
+    ('packet_id', '<i4', 0x70), ('current_lap', '<i2', 0x74), ('best_lap_ms', '<i4', 0x78), ('last_lap_ms', '<i4', 0x7C),
+    ('position', '<i2', 0x84), ('car_shift_rpm', '<u2', 0x88), ('car_max_rpm', '<u2', 0x8A), ('flags', '<u2', 0x8E),
+    ('gear_byte', 'u1', 0x90), ('throttle_raw', 'u1', 0x91), ('brake_raw', 'u1', 0x92), ('misc_flags', 'u1', 0x93),
+    ('wheel_speed_FL', '<f4', 0xA4), ('wheel_speed_FR', '<f4', 0xA8), ('wheel_speed_RL', '<f4', 0xAC), ('wheel_speed_RR', '<f4', 0xB0),
+    ('wheel_radius_FL', '<f4', 0xB4), ('wheel_radius_FR', '<f4', 0xB8), ('wheel_radius_RL', '<f4', 0xBC), ('wheel_radius_RR', '<f4', 0xC0),
+    ('suspension_height_FL', '<f4', 0xC4), ('suspension_height_FR', '<f4', 0xC8),
+    ('suspension_height_RL', '<f4', 0xCC), ('suspension_height_RR', '<f4', 0xD0),
+    ('car_code', '<i4', 0x124),
+]
+RAW_DTYPE = np.dtype({'names': [f[0] for f in _RAW], 'formats': [f[1] for f in _RAW],
+                      'offsets': [f[2] for f in _RAW], 'itemsize': PACKET_SIZE})
+
+_PASS = ('packet_id', 'current_lap', 'best_lap_ms', 'last_lap_ms', 'position', 'car_code',
+         'position_x', 'position_y', 'position_z', 'velocity_x', 'vel_y', 'velocity_z', 'yaw',
+         'engine_rpm', 'car_shift_rpm', 'car_max_rpm',
+         'tire_temp_FL', 'tire_temp_FR', 'tire_temp_RL', 'tire_temp_RR',
+         'wheel_radius_FL', 'wheel_radius_FR', 'wheel_radius_RL', 'wheel_radius_RR',
+         'suspension_height_FL', 'suspension_height_FR', 'suspension_height_RL', 'suspension_height_RR')
+# One output column per GTData attribute, plus receive time and a validity flag
+COLUMNS = dict([('time', '<f8'), ('valid', '?')] + [(name, RAW_DTYPE.fields[name][0].str) for name in _PASS] + [
+    ('speed_kmh', '<f4'), ('gear', 'u1'), ('throttle', '<f4'), ('brake', '<f4'),
+    ('in_race', '?'), ('is_paused', '?'), ('is_loading', '?'), ('rev_limiter_active', '?'),
+    ('wheel_speed_FL', '<f4'), ('wheel_speed_FR', '<f4'), ('wheel_speed_RL', '<f4'), ('wheel_speed_RR', '<f4'),
+    ('surge_g', '<f4'), ('sway_g', '<f4')])
+
+def decode_records(records, prev=None):
+    """
+    Capture records -> dict of columns. prev is the record before records[0] (for the
+    acceleration columns across chunk borders). surge_g/sway_g are the instantaneous
+    values; the live client adds peak-hold/decay and a 10-packet rpm average on top.
+    """
+    plain = decrypt_packets(records['data'])
+    raw = plain.view(RAW_DTYPE).reshape(-1)
+    out = {'time': np.asarray(records['time'], dtype=np.float64),
+           'valid': (raw['magic'] == b'G7S0') | (raw['magic'] == b'\x30\x53\x37\x47')}
+    for name in _PASS: out[name] = raw[name]
+    out['speed_kmh'] = raw['speed'] * np.float32(3.6)
+    out['gear'] = raw['gear_byte'] & 0x0F
+    out['throttle'] = raw['throttle_raw'] * np.float32(100.0 / 255.0)
+    out['brake'] = raw['brake_raw'] * np.float32(100.0 / 255.0)
+    flags = raw['flags']
+    out['in_race'] = (flags & 1) != 0; out['is_paused'] = (flags & 2) != 0; out['is_loading'] = (flags & 4) != 0
+    out['rev_limiter_active'] = (raw['misc_flags'] & 0x20) != 0
+    for w in ('FL', 'FR', 'RL', 'RR'): out[f'wheel_speed_{w}'] = np.abs(raw[f'wheel_speed_{w}'])
+
+    # World-frame acceleration from consecutive velocities, rotated into the car frame
+    vx = raw['velocity_x'].astype(np.float64); vz = raw['velocity_z'].astype(np.float64); t = out['time']
+    if prev is not None:
+        p = decode_records(prev[None], None)
+        vx = np.concatenate(([p['velocity_x'][0]], vx)); vz = np.concatenate(([p['velocity_z'][0]], vz)); t = np.concatenate((p['time'], t))
+    else:
+        vx = np.concatenate((vx[:1], vx)); vz = np.concatenate((vz[:1], vz)); t = np.concatenate((t[:1] - 1.0, t))
+    dt = np.maximum(np.diff(t), 0.010)
+    ax = np.diff(vx) / dt; az = np.diff(vz) / dt
+    sin_y = np.sin(raw['yaw']); cos_y = np.cos(raw['yaw'])
+    out['surge_g'] = (az * cos_y + ax * sin_y).astype(np.float32)
+    out['sway_g'] = (ax * cos_y - az * sin_y).astype(np.float32)
+    return out
+
+# --- Chunked, parallel decode into memory-mapped column files ---
+def _open_columns(out_dir, count, mode):
+    if mode == 'w+':
+        os.makedirs(out_dir, exist_ok=True)
+        return {name: np.lib.format.open_memmap(os.path.join(out_dir, f"{name}.npy"), mode='w+', dtype=dt, shape=(count,))
+                for name, dt in COLUMNS.items()}
+    return {name: np.load(os.path.join(out_dir, f"{name}.npy"), mmap_mode=mode) for name in COLUMNS}
+
+def _decode_chunk(capture_path, out_dir, start, stop):
+    """ Pool worker: maps the capture and the output columns itself, so no packet data is pickled """
+    records = open_capture(capture_path)
+    cols = _open_columns(out_dir, None, 'r+')
+    decoded = decode_records(records[start:stop], records[start - 1] if start > 0 else None)
+    for name, col in cols.items():
+        col[start:stop] = decoded[name]
+        col.flush()
+    return int(np.count_nonzero(decoded['valid']))
+
+def bulk_decode(capture_path, out_dir, workers=None, chunk=16384):
+    """ Decodes a capture into <out_dir>/<column>.npy (open them with mmap_mode='r'); returns a summary """
+    t0 = time.perf_counter()
+    count = len(open_capture(capture_path))
+    cols = _open_columns(out_dir, count, 'w+')
+    for col in cols.values(): col.flush()
+    del cols
+    ranges = [(s, min(s + chunk, count)) for s in range(0, count, chunk)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(ranges) < 2:
+        valid = sum(_decode_chunk(capture_path, out_dir, s, e) for s, e in ranges)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(ranges)), mp_context=mp.get_context('spawn')) as pool:
+            valid = sum(pool.map(_decode_chunk, *zip(*[(capture_path, out_dir, s, e) for s, e in ranges])))
+    elapsed = time.perf_counter() - t0
+    summary = {'capture': os.path.abspath(capture_path), 'packets': count, 'valid': valid, 'columns': list(COLUMNS),
+               'workers': 1 if len(ranges) < 2 else min(workers, len(ranges)), 'seconds': round(elapsed, 3),
+               'packets_per_s': round(count / elapsed) if elapsed > 0 else None}
+    with open(os.path.join(out_dir, 'summary.json'), 'w') as f: json.dump(summary, f, indent=1)
+    return summary
+
+def decode_with_gtdata(records):
+    """ The live path (pycryptodome + one GTData per packet), for comparison """
+    from .network_manager import decrypt_packet, GTData
+    out = []
+    for rec in records:
+        d = decrypt_packet(rec['data'][:rec['length']].tobytes())
+        if d is not None: out.append(GTData(d))
+    return out
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decode a raw telemetry capture into one .npy column per GTData field")
+    parser.add_argument('capture', help="Capture file (.gtcap) recorded with capture.enabled")
+    parser.add_argument('out_dir', help="Output directory for the column files")
+    parser.add_argument('--workers', type=int, default=None, help="Processes (default: all cores)")
+    parser.add_argument('--chunk', type=int, default=16384, help="Packets per chunk")
+    parser.add_argument('--compare', type=int, default=0, metavar='N', help="Also time the per-packet GTData path on N packets")
+    args = parser.parse_args(argv)
+    s = bulk_decode(args.capture, args.out_dir, args.workers, args.chunk)
+    print(f"{s['packets']} packets ({s['valid']} valid) with {s['workers']} worker(s) in {s['seconds']:.2f}s = {s['packets_per_s']} packets/s")
+    if args.compare:
+        records = open_capture(args.capture)[:args.compare]
+        t0 = time.perf_counter(); decode_with_gtdata(records); dt = time.perf_counter() - t0
+        print(f"GTData path: {len(records)} packets in {dt:.2f}s = {round(len(records) / dt)} packets/s")
+
+if __name__ == "__main__":
+    main()
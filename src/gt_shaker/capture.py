@@ -0,0 +1,62 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import os, struct, threading, time
+import numpy as np
+
+# File = 64-byte header + fixed-size records, so a capture can be opened as one np.memmap
+CAPTURE_MAGIC = b'GT7CAP\x00\x01'
+HEADER_SIZE = 64
+MAX_PACKET = 344 # Largest GT7 packet variant ('~'); shorter ones are zero padded
+RECORD_DTYPE = np.dtype([('time', '<f8'), ('length', '<u2'), ('pad', 'V6'), ('data', 'u1', (MAX_PACKET,))])
+_RECORD_HEAD = struct.Struct('<dH6x')
+
+class CaptureWriter:
+    def __init__(self, path):
+        """ Appends every raw (still encrypted) datagram with its receive time """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.f = open(path, 'wb')
+        header = CAPTURE_MAGIC + struct.pack('<Id', RECORD_DTYPE.itemsize, time.time())
+        self.f.write(header.ljust(HEADER_SIZE, b'\0'))
+        self.lock = threading.Lock()
+        self.count = 0
+        print(f"INFO: Capturing raw telemetry to {path}")
+
+    def write(self, now, data):
+        n = min(len(data), MAX_PACKET)
+        with self.lock:
+            if self.f is None: return
+            self.f.write(_RECORD_HEAD.pack(now, n) + bytes(data[:n]).ljust(MAX_PACKET, b'\0'))
+            self.count += 1
+
+    def close(self):
+        with self.lock:
+            if self.f is None: return
+            self.f.close(); self.f = None
+        print(f"INFO: Capture closed ({self.count} packets).")
+
+def open_capture(path):
+    """ Memory-mapped record array of a capture (a record cut short by a crash is ignored) """
+    with open(path, 'rb') as f:
+        header = f.read(HEADER_SIZE)
+    if header[:8] != CAPTURE_MAGIC: raise ValueError(f"{path} is not a GT7 capture")
+    if struct.unpack('<I', header[8:12])[0] != RECORD_DTYPE.itemsize: raise ValueError(f"{path}: unsupported record size")
+    count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+    if count == 0: return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,))
@@ -0,0 +1,120 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import json, os, tempfile, threading, time
+
+def atomic_write(path, text):
+    """ Writes to a temp file in the same directory and renames it over the target """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try: os.unlink(tmp_path)
+        except OSError: pass
+        raise
+    # Persist the rename itself (matters on SD cards losing power)
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try: os.fsync(dir_fd)
+        finally: os.close(dir_fd)
+    except OSError:
+        pass
+
+class ConfigWriter:
+    def __init__(self, path, quiet_period=1.0, merge=None, lock=None):
+        """
+        Debounced config persistence.
+        schedule() serialises the config on the caller's thread and marks it dirty;
+        a background thread writes it once no new change has arrived for quiet_period seconds.
+        lock is the (reentrant) lock every writer of the config dict holds; the dump takes it too.
+        merge(snapshot, on_disk) combines the snapshot with what another process wrote meanwhile.
+        """
+        self.path = path
+        self.quiet_period = quiet_period
+        self.merge = merge
+        self.lock = lock
+        self.cond = threading.Condition()
+        self.pending = None
+        self.last_change = 0.0
+        self.thread = None
+        self.write_lock = threading.Lock()
+        self.writes = 0
+
+    def _dump(self, cfg):
+        if self.lock is not None:
+            with self.lock: return json.dumps(cfg, indent=4)
+        # No lock from the owner: a concurrent edit can trip the dump, so retry a few times
+        for _ in range(20):
+            try: return json.dumps(cfg, indent=4)
+            except RuntimeError: time.sleep(0.001)
+        print(f"Config save error: {self.path} kept changing while saving; this change was not written")
+        return None
+
+    def schedule(self, cfg):
+        # Snapshot now: the writer thread must never walk a dict other threads are still changing
+        text = self._dump(cfg)
+        if text is None: return
+        with self.cond:
+            self.pending = text
+            self.last_change = time.monotonic()
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+            self.cond.notify()
+
+    def flush(self):
+        """ Writes any pending change immediately and waits for an in-flight write (called on shutdown) """
+        with self.cond:
+            text, self.pending = self.pending, None
+        if text is not None: self._write(text)
+        else:
+            with self.write_lock: pass
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.pending is None:
+                    self.cond.wait()
+                remaining = self.quiet_period - (time.monotonic() - self.last_change)
+                if remaining > 0:
+                    self.cond.wait(remaining)
+                    continue
+                text, self.pending = self.pending, None
+            self._write(text)
+
+    def _write(self, text):
+        with self.write_lock:
+            self._write_locked(text)
+
+    def _write_locked(self, text):
+        try:
+            if self.merge is not None:
+                try:
+                    with open(self.path, 'r') as f: on_disk = json.load(f)
+                except (OSError, ValueError):
+                    on_disk = None
+                if on_disk is not None: text = json.dumps(self.merge(json.loads(text), on_disk), indent=4)
+            atomic_write(self.path, text)
+            self.writes += 1
+        except Exception as e:
+            print(f"Config save error: {e}")
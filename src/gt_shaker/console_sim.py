@@ -0,0 +1,163 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import argparse, math, socket, struct, threading, time
+from .network_manager import encrypt_packet, PS5_PORT, RECV_PORT, PACKET_SIZE
+
+def build_packet(rpm=3000.0, speed_kmh=80.0, gear=3, throttle=50.0, brake=0.0, flags=1, susp=(0.1, 0.1, 0.1, 0.1),
+                 wheel_radius=0.33, car_code=1234, lap=1, max_rpm=8000, shift_rpm=7000, tire_temp=80.0, packet_id=0, last_lap_ms=0):
+    """ Plain (decrypted) telemetry packet with the fields GTData reads """
+    b = bytearray(PACKET_SIZE)
+    b[0:4] = b'G7S0'
+    struct.pack_into('<f', b, 0x3C, rpm)
+    struct.pack_into('<f', b, 0x4C, speed_kmh / 3.6)
+    for i in range(4):
+        struct.pack_into('<f', b, 0x60 + 4 * i, tire_temp)
+        struct.pack_into('<f', b, 0xA4 + 4 * i, (speed_kmh / 3.6) / wheel_radius)
+        struct.pack_into('<f', b, 0xB4 + 4 * i, wheel_radius)
+        struct.pack_into('<f', b, 0xC4 + 4 * i, susp[i])
+    struct.pack_into('<i', b, 0x70, packet_id)
+    struct.pack_into('<h', b, 0x74, lap)
+    struct.pack_into('<i', b, 0x7C, last_lap_ms)
+    struct.pack_into('<H', b, 0x88, shift_rpm); struct.pack_into('<H', b, 0x8A, max_rpm)
+    struct.pack_into('<H', b, 0x8E, flags)
+    b[0x90] = gear & 0x0F
+    b[0x91] = int(max(0.0, min(100.0, throttle)) * 2.55); b[0x92] = int(max(0.0, min(100.0, brake)) * 2.55)
+    struct.pack_into('<i', b, 0x124, car_code)
+    return bytes(b)
+
+def cruise(t):
+    """ Default scenario: 90 s laps with rpm sweeps, gear changes and a kerb every 4 s """
+    phase = (t % 8.0) / 8.0
+    lap = 1 + int(t // 90.0)
+    gear = 3 + int(phase * 3)
+    kerb = 0.015 * math.sin(t * 2 * math.pi * 12.0) if (t % 4.0) < 0.4 else 0.0
+    return {'rpm': 4000.0 + 2500.0 * ((phase * 3) % 1.0), 'speed_kmh': 90.0 + 60.0 * phase, 'gear': gear,
+            'throttle': 90.0, 'susp': (0.1 + kerb, 0.1 + kerb, 0.1, 0.1), 'lap': lap, 'last_lap_ms': 90000 if lap > 1 else 0}
+
+class ConsoleSim:
+    def __init__(self, bind_addr='127.0.0.1', port=PS5_PORT, reply_port=RECV_PORT, rate=60.0, stream_seconds=10.0, scenario=cruise,
+                 time_scale=1.0, replay=None):
+        """
+        Stand-in PS5 for discovery, soak and latency tests. Like GT7 it answers a heartbeat
+        on `port` by streaming encrypted packets to the sender's address on `reply_port`
+        at `rate` Hz, and stops when no heartbeat arrived for stream_seconds.
+        override() pins fields (e.g. a marker) on top of the scenario.
+        time_scale runs the scenario faster than the wall clock; replay (a capture.open_capture
+        record array) sends recorded datagrams in a loop instead. `paused` holds the stream.
+        """
+        self.bind_addr = bind_addr
+        self.port = port
+        self.reply_port = reply_port
+        self.rate = rate
+        self.stream_seconds = stream_seconds
+        self.scenario = scenario
+        self.time_scale = time_scale
+        self.replay = replay
+        self.paused = False
+        self.overrides = {}
+        self.listeners = {} # ip -> last heartbeat
+        self.heartbeats = 0
+        self.packets_sent = 0
+        self.running = False
+        self.lock = threading.Lock()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((bind_addr, port))
+        self.sock.settimeout(0.5)
+        self.on_send = None # Optional callback(packet_id, send time (time.monotonic), fields) for latency measurements
+
+    def override(self, **fields):
+        with self.lock: self.overrides.update(fields)
+
+    def clear(self, *names):
+        with self.lock:
+            for name in names or list(self.overrides): self.overrides.pop(name, None)
+
+    def start(self):
+        self.running = True
+        self.t0 = time.monotonic()
+        threading.Thread(target=self._run_listen, daemon=True).start()
+        threading.Thread(target=self._run_stream, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.running = False
+        try: self.sock.close()
+        except OSError: pass
+
+    def _run_listen(self):
+        while self.running:
+            try:
+                data, addr = self.sock.recvfrom(64)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if data[:1] in (b'A', b'B', b'~'):
+                self.heartbeats += 1
+                with self.lock: self.listeners[addr[0]] = time.monotonic()
+
+    def _run_stream(self):
+        period = 1.0 / self.rate
+        next_t = time.monotonic()
+        packet_id = 0
+        while self.running:
+            now = time.monotonic()
+            with self.lock:
+                targets = [ip for ip, seen in self.listeners.items() if now - seen < self.stream_seconds]
+                if self.paused: targets = []
+                fields = dict(self.scenario((now - self.t0) * self.time_scale), **self.overrides) if targets else None
+            if fields is not None:
+                packet_id += 1
+                if self.replay is not None and len(self.replay):
+                    rec = self.replay[(packet_id - 1) % len(self.replay)]
+                    data = rec['data'][:rec['length']].tobytes()
+                else:
+                    data = encrypt_packet(build_packet(packet_id=packet_id, **fields), packet_id * 7919 & 0xFFFFFFFF)
+                sent = time.monotonic()
+                for ip in targets:
+                    try:
+                        self.sock.sendto(data, (ip, self.reply_port))
+                        self.packets_sent += 1
+                    except OSError:
+                        pass
+                if self.on_send is not None: self.on_send(packet_id, sent, fields)
+            next_t += period
+            delay = next_t - time.monotonic()
+            if delay > 0: time.sleep(delay)
+            else: next_t = time.monotonic() # Fell behind; don't burst
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stand-in GT7 console: answers heartbeats with a simulated telemetry stream")
+    parser.add_argument('--bind', default='127.0.0.1', help="Address to listen on (default 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=PS5_PORT)
+    parser.add_argument('--reply-port', type=int, default=RECV_PORT)
+    parser.add_argument('--rate', type=float, default=60.0)
+    args = parser.parse_args(argv)
+    sim = ConsoleSim(args.bind, args.port, args.reply_port, args.rate).start()
+    print(f"Console stand-in on {args.bind}:{args.port}, streaming to <heartbeat sender>:{args.reply_port}")
+    try:
+        while True:
+            time.sleep(5.0)
+            print(f"heartbeats {sim.heartbeats}, packets sent {sim.packets_sent}")
+    except KeyboardInterrupt:
+        sim.stop()
+
+if __name__ == "__main__":
+    main()
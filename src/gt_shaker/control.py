@@ -0,0 +1,104 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import threading
+import numpy as np
+
+CONTROL_CHANNELS = ('rpm', 'speed', 'trig_f', 'trig_r', 'road_f', 'road_r')
+C_RPM, C_SPEED, C_TRIG_F, C_TRIG_R, C_ROAD_F, C_ROAD_R = range(len(CONTROL_CHANNELS))
+
+# Only smooth physical quantities are worth predicting; triggers/levels are held at the last packet
+EXTRAPOLATE = np.array([True, True, False, False, False, False])
+MAX_EXTRAPOLATION = 0.1 # s beyond the newest packet
+
+class ControlInterpolator:
+    def __init__(self, packet_rate=60.0, history=4):
+        """
+        Turns ~60 Hz telemetry into audio-rate control curves.
+        Packets are stamped on a de-jittered timeline; a block is rendered against
+        [now - one packet period + horizon, ...] so with horizon 0 every sample sits
+        between two real packets, and a positive horizon extrapolates ahead to
+        compensate for known network/output latency.
+        """
+        n_ch = len(CONTROL_CHANNELS)
+        self.period = 1.0 / packet_rate
+        self.times = np.zeros(history, dtype=np.float64)
+        self.values = np.zeros((history, n_ch), dtype=np.float64)
+        self.count = 0
+        self.t_est = None
+        self.lock = threading.Lock()
+
+        self.block_t = np.zeros(0, dtype=np.float64)
+        self.curves = np.zeros((n_ch, 0), dtype=np.float32)
+
+    def reset(self):
+        with self.lock:
+            self.count = 0
+            self.t_est = None
+
+    def push(self, t_recv, values):
+        """ Engine thread: one packet worth of values in CONTROL_CHANNELS order """
+        # De-jitter: follow the nominal packet clock, pulled gently towards the receive times
+        if self.t_est is None or abs(t_recv - (self.t_est + self.period)) > 0.05:
+            self.t_est = t_recv
+        else:
+            pred = self.t_est + self.period
+            err = t_recv - pred
+            self.period += 0.001 * err
+            self.t_est = pred + 0.1 * err
+        with self.lock:
+            self.times[:-1] = self.times[1:]; self.times[-1] = self.t_est
+            self.values[:-1] = self.values[1:]; self.values[-1] = values
+            self.count += 1
+
+    def render(self, now, frame_count, sample_rate, horizon=0.0, sub_block=1):
+        """
+        Audio thread: control curves (CONTROL_CHANNELS x frame_count, float32) for a block
+        starting at `now`. Computed every `sub_block` samples and held in between.
+        Returns None until at least one packet has arrived.
+        """
+        with self.lock:
+            n = min(self.count, len(self.times))
+            if n == 0: return None
+            times = self.times[-n:].copy(); values = self.values[-n:].copy()
+
+        if self.curves.shape[1] != frame_count:
+            self.curves = np.zeros((len(CONTROL_CHANNELS), frame_count), dtype=np.float32)
+        out = self.curves
+        if n == 1:
+            out[:] = values[0][:, None]
+            return out
+
+        sub_block = max(1, int(sub_block))
+        n_pts = -(-frame_count // sub_block)
+        if len(self.block_t) != n_pts:
+            self.block_t = np.arange(n_pts, dtype=np.float64) * (sub_block / sample_rate)
+        t = self.block_t + (now - self.period + horizon)
+
+        # Linear extrapolation from the last two packets, limited in reach
+        t_last = times[-1]
+        dt = max(times[-1] - times[-2], 1e-3)
+        slope = (values[-1] - values[-2]) / dt
+        ahead = np.clip(t - t_last, 0.0, MAX_EXTRAPOLATION)
+        for c in range(len(CONTROL_CHANNELS)):
+            pts = np.interp(t, times, values[:, c])
+            if EXTRAPOLATE[c]: pts = pts + ahead * slope[c]
+            if sub_block == 1: out[c] = pts
+            else: out[c] = np.repeat(pts, sub_block)[:frame_count]
+        np.maximum(out, 0.0, out=out)
+        return out
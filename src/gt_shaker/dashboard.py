@@ -0,0 +1,56 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import json, time
+from .tire_processor import process_tires
+
+def format_time(ms):
+    if ms <= 0 or ms == 0xFFFFFFFF: return "--:--.---"
+    m = ms // 60000
+    s = (ms % 60000) // 1000
+    ms_rem = ms % 1000
+    return f"{m}:{s:02d}.{ms_rem:03d}"
+
+def build_dashboard_snapshot(d, cfg, traction_triggers, live_debug, is_live):
+    """
+    Builds the /api/telemetry payload for one packet and returns it pre-encoded.
+    Runs in the engine thread, so the web thread only hands out the bytes.
+    """
+    red_start = d.car_max_rpm - 50
+    is_at_limit = (d.car_max_rpm > 0 and d.engine_rpm >= red_start) or bool(d.rev_limiter_active)
+    is_shift_point = (d.engine_rpm >= d.car_shift_rpm - 100 and d.engine_rpm < red_start - 100) and not is_at_limit
+
+    trig_f, trig_r = traction_triggers
+    if not cfg['effects']['traction'].get('enabled', True):
+        trig_f, trig_r = 0.0, 0.0
+
+    payload = {
+        'active': True, 'is_live': is_live, 'heartbeat': time.time(),
+        'units': cfg.get('units', 'metric'),
+        'rpm': round(d.engine_rpm), 'max_rpm': d.car_max_rpm or 8000,
+        'speed': d.speed_kmh, 'gear': d.gear, 'throttle': d.throttle, 'brake': d.brake,
+        'tires': process_tires(d), 'rev_limiter': is_at_limit, 'shift_indicator': is_shift_point,
+        'position': getattr(d, 'position', 0),
+        'best_lap': format_time(getattr(d, 'best_lap_ms', -1)),
+        'last_lap': format_time(getattr(d, 'last_lap_ms', -1)),
+        'analysis': {'road': live_debug['road_noise'], 'impact': live_debug['g_force'], 'sim_road': live_debug.get('sim_road', 0.0),
+                     'limiter_gr': round(live_debug.get('limiter_gr', 0.0), 1),
+                     'quality': live_debug.get('quality', 'full')},
+        'traction_triggers': {'front': round(trig_f, 2), 'rear': round(trig_r, 2)}
+    }
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
@@ -0,0 +1,128 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import threading, time
+import pyaudio
+
+try:
+    import pyudev
+except ImportError:
+    pyudev = None
+
+CANDIDATE_RATES = (44100, 48000, 96000)
+
+def _hw_signature():
+    """ Cheap fingerprint of the ALSA card list, used to detect hotplug without touching PortAudio """
+    parts = []
+    for path in ('/proc/asound/cards', '/proc/asound/pcm'):
+        try:
+            with open(path, 'r') as f: parts.append(f.read())
+        except OSError:
+            pass
+    return '\n'.join(parts) if parts else None
+
+class AudioDeviceRegistry:
+    def __init__(self, poll_interval=5.0, is_busy=None):
+        """
+        Enumerates output devices once and keeps the list cached.
+        is_busy: optional callable; while it returns True the refresh is postponed
+        so we never create a PyAudio instance next to a running engine stream.
+        """
+        self.poll_interval = poll_interval
+        self.is_busy = is_busy
+        self.devices = []
+        self.updated = 0.0
+        self.lock = threading.Lock()
+        self.signature = None
+        self.pending = False
+        self.running = False
+
+    def start(self):
+        """ Initial enumeration plus the background hotplug watcher """
+        if self.updated == 0.0: self.refresh()
+        if not self.running:
+            self.running = True
+            threading.Thread(target=self._run_watch, daemon=True).start()
+            if pyudev is not None:
+                threading.Thread(target=self._run_udev, daemon=True).start()
+
+    def stop(self):
+        self.running = False
+
+    def get_devices(self):
+        """ Returns the cached list (enumerates lazily if start() was never called) """
+        if self.updated == 0.0: self.refresh()
+        return self.devices
+
+    def to_dict(self):
+        return {'devices': self.get_devices(), 'updated': self.updated, 'pending': self.pending}
+
+    def refresh(self, force=False):
+        """ Re-enumerates through PortAudio. Returns False if postponed because the engine is busy """
+        if not force and self.is_busy and self.is_busy():
+            self.pending = True
+            return False
+        with self.lock:
+            self.signature = _hw_signature()
+            p = pyaudio.PyAudio(); devices = []
+            try:
+                for i in range(p.get_device_count()):
+                    try:
+                        info = p.get_device_info_by_index(i)
+                        channels = int(info['maxOutputChannels'])
+                        if channels <= 0: continue
+                        rates = []
+                        for rate in CANDIDATE_RATES:
+                            try:
+                                if p.is_format_supported(rate, output_device=i, output_channels=min(channels, 2), output_format=pyaudio.paFloat32):
+                                    rates.append(rate)
+                            except ValueError:
+                                pass
+                        devices.append({'id': i, 'name': info['name'], 'channels': channels, 'rates': rates})
+                    except: pass
+            finally:
+                p.terminate()
+            # Swap in a new list so readers always see a complete enumeration
+            self.devices = devices
+            self.updated = time.time()
+            self.pending = False
+        print(f"INFO: Audio device registry refreshed ({len(devices)} output devices).")
+        return True
+
+    def _run_watch(self):
+        """ Periodic diff of the ALSA card list; also retries postponed refreshes """
+        while self.running:
+            time.sleep(self.poll_interval)
+            try:
+                if self.pending or _hw_signature() != self.signature:
+                    self.refresh()
+            except Exception as e:
+                print(f"Device registry error: {e}")
+
+    def _run_udev(self):
+        """ Instant refresh on sound-card add/remove when pyudev is available """
+        try:
+            monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+            monitor.filter_by(subsystem='sound')
+            for device in iter(monitor.poll, None):
+                if not self.running: break
+                if device.action in ('add', 'remove'):
+                    time.sleep(1.0) # Let ALSA/PipeWire settle before asking PortAudio
+                    self.refresh()
+        except Exception as e:
+            print(f"Device registry udev watcher disabled: {e}")
@@ -0,0 +1,127 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import argparse, asyncio, ipaddress, json, socket, subprocess, time
+from .network_manager import decrypt_packet, GTData, HEARTBEAT, PS5_PORT, RECV_PORT
+
+def local_subnets(max_hosts=254):
+    """
+    IPv4 networks of the interfaces that are up (loopback excluded), from `ip -j addr`.
+    Networks larger than max_hosts are narrowed to the /24 around our own address;
+    without iproute2 we fall back to the /24 of the default-route address.
+    """
+    nets = []
+    try:
+        out = subprocess.run(['ip', '-4', '-j', 'addr', 'show', 'up'], capture_output=True, text=True, timeout=2.0).stdout
+        for iface in json.loads(out or '[]'):
+            for a in iface.get('addr_info', []):
+                if a.get('family') != 'inet' or a.get('scope') == 'host': continue
+                nets.append(ipaddress.ip_interface(f"{a['local']}/{a['prefixlen']}"))
+    except (OSError, ValueError, subprocess.SubprocessError):
+        pass
+    if not nets:
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+                s.connect(('192.0.2.1', 9)) # No packet is sent; just picks the outgoing address
+                nets.append(ipaddress.ip_interface(f"{s.getsockname()[0]}/24"))
+        except OSError:
+            pass
+    result = []
+    for iface in nets:
+        net = iface.network
+        if net.num_addresses - 2 > max_hosts: net = ipaddress.ip_interface(f"{iface.ip}/24").network
+        if net not in result: result.append(net)
+    return result
+
+class _ReplyListener(asyncio.DatagramProtocol):
+    def __init__(self, sent_at, found):
+        self.sent_at = sent_at
+        self.found = found
+
+    def datagram_received(self, data, addr):
+        ip = addr[0]
+        if ip in self.found: return
+        decrypted = decrypt_packet(data)
+        if decrypted is None: return
+        d = GTData(decrypted)
+        sent = self.sent_at.get(ip)
+        self.found[ip] = {'ip': ip, 'reply_ms': round((time.monotonic() - sent) * 1000.0, 1) if sent else None,
+                          'car_code': d.car_code, 'in_race': d.in_race}
+
+class _Sender(asyncio.DatagramProtocol):
+    def error_received(self, exc):
+        pass # ICMP unreachable from empty addresses is expected
+
+async def discover(subnets=None, hosts=None, port=PS5_PORT, recv_port=RECV_PORT, bind_addr='0.0.0.0',
+                   rate=400.0, rounds=2, timeout=1.0):
+    """
+    Heartbeats every host of the given subnets (default: local_subnets()) or the explicit
+    hosts list, at most `rate` probes per second, and collects the addresses that answer
+    with a valid encrypted telemetry packet. Hosts that stayed silent are probed again
+    for `rounds` rounds; each round waits `timeout` seconds for late replies.
+    Needs recv_port, so it can't run while an engine on the same port is receiving.
+    """
+    if hosts is None:
+        targets = []
+        for net in (subnets if subnets is not None else local_subnets()):
+            targets.extend(str(h) for h in ipaddress.ip_network(net, strict=False).hosts())
+    else:
+        targets = [str(h) for h in hosts]
+
+    loop = asyncio.get_running_loop()
+    sent_at = {}; found = {}
+    recv_transport, _ = await loop.create_datagram_endpoint(lambda: _ReplyListener(sent_at, found), local_addr=(bind_addr, recv_port))
+    send_transport, _ = await loop.create_datagram_endpoint(_Sender, local_addr=(bind_addr, 0))
+    batch = 16
+    try:
+        for _ in range(rounds):
+            pending = [h for h in targets if h not in found]
+            if not pending: break
+            for i, host in enumerate(pending):
+                sent_at.setdefault(host, time.monotonic())
+                try: send_transport.sendto(HEARTBEAT, (host, port))
+                except OSError: pass
+                if (i + 1) % batch == 0: await asyncio.sleep(batch / rate)
+            await asyncio.sleep(timeout)
+            if found and hosts is None: break # Consoles answer the first heartbeat; don't spend a second round
+    finally:
+        send_transport.close()
+        recv_transport.close()
+    return sorted(found.values(), key=lambda c: ipaddress.ip_address(c['ip']))
+
+def discover_consoles(**kwargs):
+    """ Blocking wrapper for threads without an event loop (Flask handlers) """
+    return asyncio.run(discover(**kwargs))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find GT7 consoles on the local network")
+    parser.add_argument('subnets', nargs='*', help="Networks to scan, e.g. 192.168.1.0/24 (default: local interfaces)")
+    parser.add_argument('--bind', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=PS5_PORT)
+    parser.add_argument('--recv-port', type=int, default=RECV_PORT)
+    parser.add_argument('--rate', type=float, default=400.0, help="Probes per second")
+    args = parser.parse_args(argv)
+    subnets = args.subnets or local_subnets()
+    print(f"Scanning {', '.join(str(n) for n in subnets)} ...")
+    t0 = time.monotonic()
+    consoles = discover_consoles(subnets=subnets, port=args.port, recv_port=args.recv_port, bind_addr=args.bind, rate=args.rate)
+    for c in consoles: print(f"  {c['ip']:15s} replied in {c['reply_ms']} ms (car {c['car_code']})")
+    print(f"{len(consoles)} console(s) found in {time.monotonic() - t0:.1f}s")
+
+if __name__ == "__main__":
+    main()
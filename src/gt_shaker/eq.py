@@ -0,0 +1,177 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import json
+import numpy as np
+from .jit import kernel
+
+# Shaker output order (see AudioProcessor: ch0 = rear, ch1 = front)
+EQ_CHANNELS = ('rear', 'front')
+
+DEFAULT_EQ = {
+    "enabled": True,
+    # 12 Hz high-pass keeps DC and sub-audio rumble (rectified impact tones) off the voice coils
+    "rear": {"highpass_hz": 12.0, "lowpass_hz": 0.0, "peaks": []},
+    "front": {"highpass_hz": 12.0, "lowpass_hz": 0.0, "peaks": []}
+}
+
+def design_biquad(kind, freq, rate, q=0.7071, gain_db=0.0):
+    """ RBJ cookbook biquad, normalised to (b0, b1, b2, a1, a2) """
+    w0 = 2.0 * np.pi * min(freq, 0.49 * rate) / rate
+    cos_w0 = np.cos(w0); alpha = np.sin(w0) / (2.0 * q)
+    if kind == 'highpass':
+        b = [(1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2]
+        a = [1 + alpha, -2 * cos_w0, 1 - alpha]
+    elif kind == 'lowpass':
+        b = [(1 - cos_w0) / 2, 1 - cos_w0, (1 - cos_w0) / 2]
+        a = [1 + alpha, -2 * cos_w0, 1 - alpha]
+    elif kind == 'peaking':
+        amp = 10.0 ** (gain_db / 40.0)
+        b = [1 + alpha * amp, -2 * cos_w0, 1 - alpha * amp]
+        a = [1 + alpha / amp, -2 * cos_w0, 1 - alpha / amp]
+    else:
+        raise ValueError(f"Unknown filter type '{kind}'")
+    return np.array([b[0] / a[0], b[1] / a[0], b[2] / a[0], a[1] / a[0], a[2] / a[0]], dtype=np.float64)
+
+def channel_sections(ch_cfg, rate):
+    """ Biquad cascade (n_sections, 5) for one channel's config """
+    sections = []
+    if float(ch_cfg.get('highpass_hz', 0.0)) > 0:
+        sections.append(design_biquad('highpass', float(ch_cfg['highpass_hz']), rate, float(ch_cfg.get('highpass_q', 0.7071))))
+    if float(ch_cfg.get('lowpass_hz', 0.0)) > 0:
+        sections.append(design_biquad('lowpass', float(ch_cfg['lowpass_hz']), rate, float(ch_cfg.get('lowpass_q', 0.7071))))
+    for peak in ch_cfg.get('peaks', []):
+        sections.append(design_biquad('peaking', float(peak['freq']), rate, float(peak.get('q', 2.0)), float(peak.get('gain_db', 0.0))))
+    if not sections: return np.zeros((0, 5), dtype=np.float64)
+    return np.ascontiguousarray(sections, dtype=np.float64)
+
+def _biquad_args(sig, rng, n):
+    """ Stable random cascades for parity/timing: HP + LP + two peaks """
+    rate = 48000.0
+    coefs = np.array([design_biquad('highpass', rng.uniform(8, 30), rate),
+                      design_biquad('lowpass', rng.uniform(80, 400), rate),
+                      design_biquad('peaking', rng.uniform(30, 80), rate, 3.0, rng.uniform(-9, 6)),
+                      design_biquad('peaking', rng.uniform(20, 120), rate, 1.5, rng.uniform(-9, 6))])
+    return [rng.uniform(-1.0, 1.0, n).astype(np.float32), coefs, rng.uniform(-0.1, 0.1, (4, 2))]
+
+SUB_BLOCK = 128 # samples per step of the block-recursive NumPy filter (fastest at 2-3k sample blocks)
+_section_cache = {}
+
+def _section_matrices(b0, b1, b2, a1, a2, L):
+    """
+    State-space form of one TDF-II section over L samples: with state s and input u,
+    y = O @ s + T @ u and the state after the L samples is P @ s + G @ u
+    (T is the lower-triangular impulse-response Toeplitz matrix)
+    """
+    key = (b0, b1, b2, a1, a2, L)
+    m = _section_cache.get(key)
+    if m is not None: return m
+    A = np.array([[-a1, 1.0], [-a2, 0.0]]); B = np.array([b1 - a1 * b0, b2 - a2 * b0])
+    powers = np.empty((L + 1, 2, 2)); powers[0] = np.eye(2)
+    for k in range(L): powers[k + 1] = A @ powers[k]
+    O = powers[:L, 0, :] # C A^k with C = [1, 0]
+    h = np.concatenate(([b0], O[:L - 1] @ B))
+    idx = np.arange(L)
+    lag = idx[:, None] - idx[None, :]
+    T = np.where(lag >= 0, h[np.clip(lag, 0, None)], 0.0)
+    G = (powers[L - 1 - idx] @ B).T # column j: A^(L-1-j) B
+    if len(_section_cache) > 64: _section_cache.clear() # only grows while EQ sliders move
+    m = _section_cache[key] = (O, T, G, powers)
+    return m
+
+def np_biquad_cascade(x, coefs, state):
+    """
+    NumPy twin of jit_biquad_cascade, block-recursive: every SUB_BLOCK-sample chunk is one
+    matrix product (zero-state response) plus the carried-in state's contribution, so the
+    Python-level loop only steps a 2-element state once per chunk
+    """
+    n = len(x)
+    if len(coefs) == 0 or n == 0: return
+    L = SUB_BLOCK; full = n - n % L
+    v = x.astype(np.float64)
+    for s in range(len(coefs)):
+        O, T, G, powers = _section_matrices(*(float(c) for c in coefs[s]), L)
+        st = state[s].copy()
+        if full:
+            U = v[:full].reshape(-1, L)
+            Y = U @ T.T; Z = U @ G.T
+            # The only sequential part: the 2-element state, stepped once per chunk with plain floats
+            (p00, p01), (p10, p11) = powers[L].tolist(); s0, s1 = st.tolist()
+            S = np.empty((len(U), 2))
+            for j, (z0, z1) in enumerate(Z.tolist()):
+                S[j, 0] = s0; S[j, 1] = s1
+                s0, s1 = p00 * s0 + p01 * s1 + z0, p10 * s0 + p11 * s1 + z1
+            st = np.array((s0, s1))
+            Y += S @ O.T
+            v[:full] = Y.ravel()
+        r = n - full
+        if r:
+            u = v[full:]
+            y = T[:r, :r] @ u + O[:r] @ st
+            st = powers[r] @ st + G[:, L - r:] @ u
+            v[full:] = y
+        state[s] = st
+    x[:] = v
+
+@kernel("(float32[::1], float64[:, ::1], float64[:, ::1])", fallback=np_biquad_cascade, sample=_biquad_args)
+def jit_biquad_cascade(x, coefs, state):
+    """ In-place biquad cascade (transposed direct form II); state (n_sections, 2) carries over between blocks """
+    n_sec = coefs.shape[0]
+    for i in range(x.shape[0]):
+        v = np.float64(x[i])
+        for s in range(n_sec):
+            y = coefs[s, 0] * v + state[s, 0]
+            state[s, 0] = coefs[s, 1] * v - coefs[s, 3] * y + state[s, 1]
+            state[s, 1] = coefs[s, 2] * v - coefs[s, 4] * y
+            v = y
+        x[i] = v
+
+class OutputEQ:
+    def __init__(self, sample_rate, channels=EQ_CHANNELS):
+        """ Per-channel filter stage; coefficients are only redesigned when the config changes """
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.key = None
+        self.version = None
+        self.coefs = [np.zeros((0, 5), dtype=np.float64) for _ in channels]
+        self.states = [np.zeros((0, 2), dtype=np.float64) for _ in channels]
+
+    def configure(self, eq_cfg, version=None):
+        """
+        version: the engine's config version. While it is unchanged the call returns at once,
+        so the audio thread doesn't serialise the EQ config every block
+        """
+        if version is not None and version == self.version: return
+        self.version = version
+        key = json.dumps(eq_cfg, sort_keys=True)
+        if key == self.key: return
+        self.key = key
+        for c, name in enumerate(self.channels):
+            coefs = channel_sections(eq_cfg.get(name, {}), self.sample_rate) if eq_cfg.get('enabled', True) else np.zeros((0, 5))
+            # Keep the running state when only gains/frequencies move, so slider drags don't click
+            if len(coefs) != len(self.states[c]): self.states[c] = np.zeros((len(coefs), 2), dtype=np.float64)
+            self.coefs[c] = coefs
+
+    def adopt(self, old):
+        """ Keeps the filter memories of an EQ at another sample rate (same sections, redesigned coefficients) """
+        for c in range(min(len(self.states), len(old.states))):
+            if self.states[c].shape == old.states[c].shape: self.states[c][:] = old.states[c]
+
+    def process(self, c, x):
+        """ Filters channel c (contiguous float32 array) in place """
+        if len(self.coefs[c]): jit_biquad_cascade(x, self.coefs[c], self.states[c])
@@ -0,0 +1,207 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import math
+import numpy as np
+from .jit import kernel
+
+# Transient event kinds and the output buses they are mixed on (each bus is a stereo pair
+# whose per-block gain - volume, ducking, balance - is applied by the AudioProcessor)
+EVENT_KINDS = ('shift', 'impact', 'kerb', 'bump')
+EV_SHIFT, EV_IMPACT, EV_KERB, EV_BUMP = range(len(EVENT_KINDS))
+BUSES = ('impact', 'shift', 'road')
+B_IMPACT, B_SHIFT, B_ROAD = range(len(BUSES))
+
+# Envelopes in seconds. The old effects decayed by a fixed step per audio callback, i.e. at
+# a rate tied to the 3072-frame / 48 kHz block; the release rates keep that feel at any block size.
+REF_BLOCK = 3072 / 48000.0
+SHIFT_DECAY = 0.15 / REF_BLOCK  # amplitude units per second
+IMPACT_DECAY = 0.5 / REF_BLOCK
+ENVELOPES = {
+    #            bus       freq  attack  decay  sustain hold   release
+    EV_SHIFT:  (B_SHIFT,  32.0, 0.002,  0.0,   1.0,    0.0,   None),
+    EV_IMPACT: (B_IMPACT, 30.0, 0.002,  0.0,   1.0,    0.0,   None),
+    EV_KERB:   (B_ROAD,   25.0, 0.003,  0.060, 0.3,    0.0,   0.120),
+    EV_BUMP:   (B_ROAD,   22.0, 0.003,  0.0,   1.0,    0.144, 0.003),
+}
+CUT_FADE = 0.005 # s; a retriggered voice fades out this fast under the new one
+MAX_LATE = 0.25  # s; older events (e.g. queued while muted) are dropped instead of played late
+MAX_VOICES = 32
+
+# Voice pool layout (one float64 row per voice; times in absolute samples)
+VOICE_FIELDS = ('on', 'start', 'end', 'cut', 'fade', 'step', 'amp', 'g0', 'g1', 'bus',
+                'attack', 'decay', 'sustain', 'hold', 'release', 'group')
+V_ON, V_START, V_END, V_CUT, V_FADE, V_STEP, V_AMP, V_G0, V_G1, V_BUS, \
+    V_ATTACK, V_DECAY, V_SUSTAIN, V_HOLD, V_RELEASE, V_GROUP = range(len(VOICE_FIELDS))
+
+def _voice_args(sig, rng, n):
+    """ A pool with finished, playing, not yet started and retriggered voices """
+    voices = np.zeros((8, len(VOICE_FIELDS)), dtype=np.float64)
+    block_start = float(rng.integers(0, 10000))
+    for v in range(6):
+        a, d, h, r = (float(x) for x in rng.integers(1, n, 4))
+        start = block_start + float(rng.integers(-2 * n, n))
+        voices[v, [V_ON, V_START, V_STEP, V_AMP, V_G0, V_G1, V_BUS]] = 1.0, start, rng.uniform(0.001, 0.1), rng.uniform(0.1, 3.0), 1.0, 0.5, v % 3
+        voices[v, [V_ATTACK, V_DECAY, V_SUSTAIN, V_HOLD, V_RELEASE]] = a, d, rng.uniform(0.2, 1.0), h, r
+        voices[v, V_END] = start + a + d + h + r
+        voices[v, V_CUT] = start + float(rng.integers(1, n)) if v == 5 else np.inf
+        voices[v, V_FADE] = 64.0
+        if v == 5: voices[v, V_END] = min(voices[v, V_END], voices[v, V_CUT] + 64.0)
+    return [np.zeros((len(BUSES) * 2, n), dtype=np.float32), voices, block_start]
+
+def np_render_voices(out, voices, block_start):
+    """ NumPy twin of jit_render_voices: one vectorised pass per active voice """
+    n = out.shape[1]; live = 0
+    for v in np.flatnonzero(voices[:, V_ON]):
+        p = voices[v]
+        i0 = max(0, int(p[V_START] - block_start)); i1 = min(n, int(p[V_END] - block_start))
+        if i1 > i0:
+            a = p[V_ATTACK]; ad = a + p[V_DECAY]; adh = ad + p[V_HOLD]; s = p[V_SUSTAIN]
+            abs_t = block_start + np.arange(i0, i1)
+            t = abs_t - p[V_START]
+            env = np.where(t < a, t / a,
+                  np.where(t < ad, 1.0 - (1.0 - s) * (t - a) / max(p[V_DECAY], 1.0),
+                  np.where(t < adh, s, s * (1.0 - (t - adh) / p[V_RELEASE]))))
+            env = env * np.clip(1.0 - (abs_t - p[V_CUT]) / p[V_FADE], 0.0, 1.0)
+            w = np.sin(t * p[V_STEP]) * p[V_AMP] * env
+            b = int(p[V_BUS]) * 2
+            out[b, i0:i1] += w * p[V_G0]; out[b + 1, i0:i1] += w * p[V_G1]
+        if block_start + n >= p[V_END]: p[V_ON] = 0.0
+        else: live += 1
+    return live
+
+@kernel("(float32[:, ::1], float64[:, ::1], float64)", fallback=np_render_voices, sample=_voice_args)
+def jit_render_voices(out, voices, block_start):
+    """
+    Adds every active voice into out[bus * 2 + channel] for the samples
+    [block_start, block_start + n). Voices carry their own onset sample and ADSR, so
+    they start mid-block and last the same time at any block size. Finished voices are
+    switched off; returns how many are still playing or waiting to start.
+    """
+    n = out.shape[1]; live = 0
+    for v in range(voices.shape[0]):
+        if voices[v, V_ON] == 0.0: continue
+        start = voices[v, V_START]
+        i0 = max(0, int(start - block_start)); i1 = min(n, int(voices[v, V_END] - block_start))
+        a = voices[v, V_ATTACK]; d = voices[v, V_DECAY]; s = voices[v, V_SUSTAIN]
+        ad = a + d; adh = ad + voices[v, V_HOLD]; r = voices[v, V_RELEASE]
+        cut = voices[v, V_CUT]; fade = voices[v, V_FADE]
+        step = voices[v, V_STEP]; amp = voices[v, V_AMP]; g0 = voices[v, V_G0]; g1 = voices[v, V_G1]
+        b = int(voices[v, V_BUS]) * 2
+        for i in range(i0, i1):
+            abs_t = block_start + i
+            t = abs_t - start
+            if t < a: env = t / a
+            elif t < ad: env = 1.0 - (1.0 - s) * (t - a) / max(d, 1.0)
+            elif t < adh: env = s
+            else: env = s * (1.0 - (t - adh) / r)
+            if abs_t >= cut: env *= max(0.0, 1.0 - (abs_t - cut) / fade)
+            w = math.sin(t * step) * amp * env
+            out[b, i] += w * g0; out[b + 1, i] += w * g1
+        if block_start + n >= voices[v, V_END]: voices[v, V_ON] = 0.0
+        else: live += 1
+    return live
+
+class EventScheduler:
+    def __init__(self, sample_rate, max_voices=MAX_VOICES):
+        """
+        Timestamped transients (shift, impact, kerb, bump) rendered from a preallocated
+        voice pool. Onsets are placed on the sample where the event falls inside the
+        block, envelopes are in seconds, and a finished voice costs nothing.
+        """
+        self.sample_rate = sample_rate
+        self.voices = np.zeros((max_voices, len(VOICE_FIELDS)), dtype=np.float64)
+        self.bus = np.zeros((len(BUSES) * 2, 0), dtype=np.float32)
+        self.pos = 0.0   # absolute sample index of the current block's first sample
+        self.t0 = None   # packet-timeline time of that sample
+        self.active = 0
+        self.stolen = 0
+
+    def begin(self, t0):
+        """ Called before posting for a block; t0 is the time its first sample represents """
+        self.t0 = t0
+
+    def adopt(self, old):
+        """
+        Takes over the voices of a scheduler running at another sample rate (governor rate
+        change): positions and lengths are rescaled, so ringing voices carry on unchanged.
+        Returns the function mapping old sample positions to ours.
+        """
+        r = self.sample_rate / old.sample_rate
+        pos = float(round(old.pos * r))
+        n = min(len(self.voices), len(old.voices))
+        v = self.voices; v[:] = 0.0; v[:n] = old.voices[:n]
+        v[:n, [V_START, V_END, V_CUT]] = (v[:n, [V_START, V_END, V_CUT]] - old.pos) * r + pos
+        v[:n, [V_FADE, V_ATTACK, V_DECAY, V_HOLD, V_RELEASE]] *= r
+        v[:n, V_STEP] /= r
+        old_pos = old.pos
+        self.pos = pos; self.t0 = old.t0; self.active = old.active; self.stolen = old.stolen
+        return lambda at: (at - old_pos) * r + pos
+
+    def post(self, kind, amp, g0=1.0, g1=1.0, t=None, delay=0.0, offset=0, group=-1, freq=None):
+        """
+        Starts a voice. Timestamped events (t) land at their sample inside the block (late
+        ones at its start); otherwise at `offset` samples into it. `delay` is added in
+        seconds. A new event in the same group (>= 0) fades the previous one out.
+        Returns False when the event was too old to play.
+        """
+        bus, base_freq, attack, decay, sustain, hold, release = ENVELOPES[kind]
+        if release is None: release = amp / (SHIFT_DECAY if kind == EV_SHIFT else IMPACT_DECAY)
+        sr = self.sample_rate
+        onset = self.pos + offset
+        if t is not None and self.t0 is not None:
+            if self.t0 - t > MAX_LATE: return False
+            onset = max(self.pos, self.pos + round((t - self.t0) * sr))
+        onset += round(delay * sr)
+
+        voices = self.voices
+        if group >= 0:
+            fade = max(1.0, round(CUT_FADE * sr))
+            for v in np.flatnonzero((voices[:, V_ON] != 0.0) & (voices[:, V_GROUP] == group)):
+                if voices[v, V_CUT] > onset:
+                    voices[v, V_CUT] = onset; voices[v, V_FADE] = fade
+                    voices[v, V_END] = min(voices[v, V_END], onset + fade)
+
+        free = np.flatnonzero(voices[:, V_ON] == 0.0)
+        if len(free): v = free[0]
+        else:
+            v = int(np.argmin(voices[:, V_END])) # steal the voice closest to its end
+            self.stolen += 1
+        a = max(1.0, round(attack * sr)); d = round(decay * sr); h = round(hold * sr); r = max(1.0, round(release * sr))
+        p = voices[v]
+        p[V_ON] = 1.0; p[V_START] = onset; p[V_END] = onset + a + d + h + r
+        p[V_CUT] = np.inf; p[V_FADE] = 1.0
+        p[V_STEP] = 2 * np.pi * (base_freq if freq is None else freq) / sr
+        p[V_AMP] = amp; p[V_G0] = g0; p[V_G1] = g1; p[V_BUS] = bus
+        p[V_ATTACK] = a; p[V_DECAY] = d; p[V_SUSTAIN] = sustain; p[V_HOLD] = h; p[V_RELEASE] = r
+        p[V_GROUP] = group
+        self.active += 1
+        return True
+
+    def render(self, frame_count):
+        """ Renders the block into the bus pairs (BUSES x 2, frame_count) and advances; None when idle """
+        if self.active == 0:
+            self.pos += frame_count
+            return None
+        if self.bus.shape[1] != frame_count:
+            self.bus = np.zeros((len(BUSES) * 2, frame_count), dtype=np.float32)
+        else:
+            self.bus[:] = 0.0
+        self.active = jit_render_voices(self.bus, self.voices, self.pos)
+        self.pos += frame_count
+        return self.bus
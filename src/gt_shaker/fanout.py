@@ -0,0 +1,193 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import os, select, socket, struct, threading, time
+from .paths import user_runtime_dir
+
+MULTICAST_GROUP = '239.255.77.40'
+MULTICAST_PORT = 33741
+SUBSCRIBER_TIMEOUT = 10.0 # Subscribers re-register like the console's own heartbeat
+
+# Compact pre-decoded frame: header, then fixed little-endian fields
+FRAME_MAGIC = b'GTSF'
+FRAME_VERSION = 1
+FRAME_FLOATS = ('engine_rpm', 'speed_kmh', 'throttle', 'brake', 'surge_g', 'sway_g',
+                'wheel_speed_FL', 'wheel_speed_FR', 'wheel_speed_RL', 'wheel_speed_RR',
+                'suspension_height_FL', 'suspension_height_FR', 'suspension_height_RL', 'suspension_height_RR',
+                'tire_temp_FL', 'tire_temp_FR', 'tire_temp_RL', 'tire_temp_RR')
+FRAME_STRUCT = struct.Struct('<4sBBIdiHhH' + 'f' * len(FRAME_FLOATS))
+# flags: bit 0 in race, 1 paused, 2 loading, 3 rev limiter
+
+def default_socket_path(bind_addr='0.0.0.0', recv_port=33740):
+    """ telemetry.sock for the main receiver; rigs on their own address/port get their own socket """
+    if (bind_addr, int(recv_port)) == ('0.0.0.0', 33740): return os.path.join(user_runtime_dir(), 'telemetry.sock')
+    return os.path.join(user_runtime_dir(), f"telemetry-{bind_addr}-{recv_port}.sock")
+
+def encode_frame(seq, now, d):
+    flags = int(d.in_race) | int(d.is_paused) << 1 | int(d.is_loading) << 2 | int(d.rev_limiter_active) << 3
+    return FRAME_STRUCT.pack(FRAME_MAGIC, FRAME_VERSION, flags, seq & 0xFFFFFFFF, now, d.car_code, d.gear,
+                             d.current_lap, d.car_max_rpm, *[getattr(d, name) for name in FRAME_FLOATS])
+
+def decode_frame(buf):
+    """ Frame bytes -> dict (for subscribers); None if it isn't one """
+    if len(buf) != FRAME_STRUCT.size or buf[:4] != FRAME_MAGIC: return None
+    values = FRAME_STRUCT.unpack(buf)
+    flags = values[2]
+    frame = {'seq': values[3], 'time': values[4], 'car_code': values[5], 'gear': values[6], 'current_lap': values[7],
+             'car_max_rpm': values[8], 'in_race': bool(flags & 1), 'is_paused': bool(flags & 2),
+             'is_loading': bool(flags & 4), 'rev_limiter_active': bool(flags & 8)}
+    frame.update(zip(FRAME_FLOATS, values[9:]))
+    return frame
+
+class FanoutServer:
+    def __init__(self, f_cfg, bind_addr='0.0.0.0', recv_port=33740):
+        """
+        Re-publishes every decrypted packet to local consumers (lap loggers, shift
+        lights, second dashboards) so the console stream is received and decrypted once.
+          unix      - datagram socket; a subscriber sends b'SUB raw' or b'SUB frame' from
+                      its own bound socket and gets packets until it stops re-registering
+          multicast - fire-and-forget to a local multicast group, no registration
+        Sends never block: a subscriber with a full queue simply misses that packet.
+        """
+        self.format = f_cfg.get('format', 'raw')
+        self.subscribers = {} # address -> [format, last seen]
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.sent = 0; self.dropped = 0
+        self.running = True
+        self.unix_sock = None
+        self.mcast_sock = None
+
+        if f_cfg.get('unix', True):
+            self.path = f_cfg.get('unix_path') or default_socket_path(bind_addr, recv_port)
+            try:
+                if os.path.exists(self.path): os.unlink(self.path)
+                self.unix_sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                self.unix_sock.bind(self.path)
+                # Non-blocking, not a timeout: with a timeout Python would wait on a full subscriber queue
+                self.unix_sock.setblocking(False)
+                threading.Thread(target=self._run_registrations, daemon=True).start()
+                print(f"FANOUT: Serving subscribers on {self.path}")
+            except OSError as e:
+                print(f"FANOUT: Unix socket unavailable: {e}")
+                self.unix_sock = None
+
+        group = f_cfg.get('multicast')
+        if group:
+            host, _, port = str(group).partition(':')
+            self.mcast_addr = (host or MULTICAST_GROUP, int(port or MULTICAST_PORT))
+            self.mcast_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.mcast_sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, int(f_cfg.get('ttl', 0)))
+            self.mcast_sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+            self.mcast_sock.setblocking(False)
+            print(f"FANOUT: Multicasting to {self.mcast_addr[0]}:{self.mcast_addr[1]}")
+
+    def _run_registrations(self):
+        sock = self.unix_sock
+        while self.running:
+            try:
+                if not select.select([sock], [], [], 1.0)[0]: continue
+                msg, addr = sock.recvfrom(64)
+            except BlockingIOError:
+                continue
+            except (OSError, ValueError):
+                break
+            if not addr: continue # Unbound sender: nowhere to reply to
+            parts = msg.decode('ascii', 'replace').split()
+            with self.lock:
+                if parts and parts[0] == 'SUB':
+                    fmt = parts[1] if len(parts) > 1 and parts[1] in ('raw', 'frame') else 'raw'
+                    if addr not in self.subscribers: print(f"FANOUT: Subscriber {addr} ({fmt})")
+                    self.subscribers[addr] = [fmt, time.time()]
+                elif parts and parts[0] == 'UNSUB':
+                    self.subscribers.pop(addr, None)
+
+    def publish(self, decrypted, d, now):
+        """ Called by the receive thread once per valid packet """
+        self.seq += 1
+        frame = None
+        if self.unix_sock is not None and self.subscribers:
+            with self.lock: subs = list(self.subscribers.items())
+            for addr, (fmt, seen) in subs:
+                if now - seen > SUBSCRIBER_TIMEOUT:
+                    self._drop(addr, 'timed out'); continue
+                if fmt == 'frame' and frame is None: frame = encode_frame(self.seq, now, d)
+                try:
+                    self.unix_sock.sendto(frame if fmt == 'frame' else decrypted, addr)
+                    self.sent += 1
+                except BlockingIOError:
+                    self.dropped += 1 # Slow consumer: skip, it gets the next one
+                except OSError:
+                    self._drop(addr, 'gone')
+        if self.mcast_sock is not None:
+            if self.format == 'frame' and frame is None: frame = encode_frame(self.seq, now, d)
+            try: self.mcast_sock.sendto(frame if self.format == 'frame' else decrypted, self.mcast_addr)
+            except OSError: self.dropped += 1
+
+    def _drop(self, addr, reason):
+        with self.lock:
+            if self.subscribers.pop(addr, None) is not None: print(f"FANOUT: Subscriber {addr} {reason}")
+
+    def stats(self):
+        return {'subscribers': len(self.subscribers), 'sent': self.sent, 'dropped': self.dropped}
+
+    def close(self):
+        self.running = False
+        if self.unix_sock is not None:
+            self.unix_sock.close()
+            try: os.unlink(self.path)
+            except OSError: pass
+        if self.mcast_sock is not None: self.mcast_sock.close()
+
+class FanoutSubscriber:
+    def __init__(self, path=None, fmt='frame'):
+        """
+        Consumer side for the Unix socket: registers, keeps re-registering, and
+        latest() drains the socket so the caller always sees the newest packet.
+        The kernel queues only a few datagrams (net.unix.max_dgram_qlen), so poll
+        at least a few times per second or packets after the queue fills are lost.
+        """
+        self.server = path or default_socket_path()
+        self.fmt = fmt
+        self.path = os.path.join(os.path.dirname(self.server), f"sub-{os.getpid()}-{id(self):x}.sock")
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(self.path)
+        self.sock.setblocking(False)
+        self.last_register = 0.0
+
+    def register(self):
+        try: self.sock.sendto(f"SUB {self.fmt}".encode('ascii'), self.server)
+        except OSError: pass # Server not up yet; the next call retries
+        self.last_register = time.time()
+
+    def latest(self):
+        """ Newest packet since the last call (decoded dict for 'frame', bytes for 'raw') or None """
+        if time.time() - self.last_register > SUBSCRIBER_TIMEOUT / 3: self.register()
+        newest = None
+        while True:
+            try: newest = self.sock.recv(4096)
+            except BlockingIOError: break
+        if newest is None or self.fmt == 'raw': return newest
+        return decode_frame(newest)
+
+    def close(self):
+        try: self.sock.sendto(b'UNSUB', self.server)
+        except OSError: pass
+        self.sock.close()
+        try: os.unlink(self.path)
+        except OSError: pass
@@ -0,0 +1,200 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import threading
+import numpy as np
+from .road_texture import RoadTextureAnalyzer
+from .events import EV_SHIFT, EV_IMPACT, EV_KERB, IMPACT_DECAY
+from .jit import kernel
+
+# Feature frame layout (one float32 slot per feature)
+FEATURES = ('road_f', 'road_r', 'impact_f', 'impact_r', 'obstacle_f', 'obstacle_r',
+            'tc_f', 'tc_r', 'abs_f', 'abs_r', 'heave', 'braking', 'texture_f', 'texture_r', 'texture_hz')
+F_ROAD_F, F_ROAD_R, F_IMPACT_F, F_IMPACT_R, F_OBSTACLE_F, F_OBSTACLE_R, \
+    F_TC_F, F_TC_R, F_ABS_F, F_ABS_R, F_HEAVE, F_BRAKING, F_TEX_F, F_TEX_R, F_TEX_HZ = range(len(FEATURES))
+
+# Transient features; several packets may land in one audio block, so the block gets their peak
+PEAK_SLOTS = np.array([F_IMPACT_F, F_IMPACT_R, F_OBSTACLE_F, F_OBSTACLE_R])
+
+# Events carry the output channel they play on (0, 1, or -1 for both)
+MAX_PENDING_EVENTS = 64
+KERB_ON, KERB_OFF = 0.5, 0.25 # texture amount hysteresis for kerb strikes
+
+def np_suspension_step(curr, pos, vel, road_thresh, impact_thresh):
+    """ Vectorised NumPy twin of jit_suspension_step (used when numba is unavailable) """
+    v = curr[:4] - pos[:4]
+    a = np.abs(v - vel[:4]).astype(np.float64)
+    vel[:4] = v; pos[:4] = curr[:4]
+    road_val = (np.maximum(0.0, a - road_thresh) * 400.0)**1.2
+    imp_val = np.maximum(0.0, a - impact_thresh) * 180.0
+    return float(road_val[0] + road_val[1]), float(road_val[2] + road_val[3]), float(imp_val[:2].max()), float(imp_val[2:].max())
+
+@kernel("(float32[::1], float32[::1], float32[::1], float64, float64)", fallback=np_suspension_step)
+def jit_suspension_step(curr, pos, vel, road_thresh, impact_thresh):
+    """ Per-packet suspension velocity/acceleration; updates pos and vel in place """
+    r_f, r_r, i_f, i_r = 0.0, 0.0, 0.0, 0.0
+    for i in range(4):
+        v = curr[i] - pos[i]
+        a = np.abs(v - vel[i])
+        vel[i] = v; pos[i] = curr[i]
+        road_val = (max(0.0, a - road_thresh) * 400.0)**1.2
+        imp_val = max(0.0, a - impact_thresh) * 180.0
+        if i < 2: r_f += road_val; i_f = max(i_f, imp_val)
+        else: r_r += road_val; i_r = max(i_r, imp_val)
+    return r_f, r_r, i_f, i_r
+
+class FeatureExtractor:
+    def __init__(self, tire_processor=None):
+        """
+        Runs the car physics exactly once per received packet (engine thread) and
+        publishes a compact float32 frame that the audio thread only has to read.
+        """
+        self.tire_processor = tire_processor
+        self.susp = np.zeros(4, dtype=np.float32)
+        self.susp_pos = np.zeros(4, dtype=np.float32)
+        self.susp_vel = np.zeros(4, dtype=np.float32)
+        self.last_vel_y = 0.0
+        self.primed = False
+        self.texture = RoadTextureAnalyzer()
+
+        self.work = np.zeros(len(FEATURES), dtype=np.float32)
+        self.frame = np.zeros(len(FEATURES), dtype=np.float32)
+        self.peak = np.zeros(len(FEATURES), dtype=np.float32)
+        self.out = np.zeros(len(FEATURES), dtype=np.float32)
+        self.lock = threading.Lock()
+        self.packets = 0
+
+        # Transient events (kind, time, channel, amplitude) for the audio thread's EventScheduler
+        self.events = []
+        self.last_gear = None
+        self.impact_level = [0.0, 0.0]; self.impact_time = [0.0, 0.0] # per output channel
+        self.on_kerb = [False, False]
+
+    def reset(self):
+        """ Forget motion state (pause, car change, track change) so the next packet doesn't read as a jolt """
+        self.primed = False
+        self.texture.reset()
+        self.last_gear = None
+        self.impact_level = [0.0, 0.0]; self.on_kerb = [False, False]
+        with self.lock:
+            self.frame[:] = 0.0; self.peak[:] = 0.0
+
+    def _event(self, kind, t, channel, amp):
+        with self.lock:
+            if len(self.events) >= MAX_PENDING_EVENTS: del self.events[0]
+            self.events.append((kind, t, channel, amp))
+
+    def update(self, d, cfg, active=True, t=None):
+        """
+        Extracts features from one packet; inactive packets (pause, menus) publish silence.
+        t is the packet's receive time, used to timestamp shift/impact/kerb events.
+        """
+        w = self.work
+        w[:] = 0.0
+        if not active:
+            self.reset()
+            return w
+
+        s = self.susp
+        s[0] = d.suspension_height_FL; s[1] = d.suspension_height_FR
+        s[2] = d.suspension_height_RL; s[3] = d.suspension_height_RR
+        if not self.primed:
+            self.susp_pos[:] = s; self.susp_vel[:] = 0.0
+            self.last_vel_y = d.vel_y
+            self.primed = True
+
+        # --- Suspension + body heave ---
+        susp_cfg = cfg['effects']['suspension']
+        r_f, r_r, i_f, i_r = jit_suspension_step(
+            s, self.susp_pos, self.susp_vel,
+            float(susp_cfg.get('threshold', 0.5)) * 0.012,
+            (float(susp_cfg.get('impact_threshold', 3.0)) / 40.0) * 0.040
+        )
+        heave = abs(d.vel_y - self.last_vel_y); self.last_vel_y = d.vel_y
+        if d.speed_kmh > 4.0:
+            if heave > 0.05: i_f += heave * 15.0; i_r += heave * 15.0
+            w[F_ROAD_F] = r_f; w[F_ROAD_R] = r_r; w[F_IMPACT_F] = i_f; w[F_IMPACT_R] = i_r
+        w[F_HEAVE] = heave
+
+        # --- Surface texture spectrum (rumble strips, cobbles, grass) ---
+        self.texture.push(s)
+        w[F_TEX_F], w[F_TEX_R], w[F_TEX_HZ] = self.texture.texture(float(cfg['effects']['sim_road'].get('texture_gain', 300.0)))
+
+        # --- Obstacle impacts (walls, cars) from body G ---
+        obs_cfg = cfg['effects'].get('obstacle_impact', {})
+        thresh = float(obs_cfg.get('threshold', 50.0))
+        surge = getattr(d, 'surge_g', 0.0); sway = getattr(d, 'sway_g', 0.0)
+        if surge < -thresh: w[F_OBSTACLE_F] = min(5.0, (abs(surge) - thresh) * 0.05)
+        elif surge > thresh: w[F_OBSTACLE_R] = min(5.0, (abs(surge) - thresh) * 0.05)
+        if abs(sway) > thresh:
+            side_val = min(5.0, (abs(sway) - thresh) * 0.05)
+            w[F_OBSTACLE_F] = max(w[F_OBSTACLE_F], side_val); w[F_OBSTACLE_R] = max(w[F_OBSTACLE_R], side_val)
+
+        # --- Transient events ---
+        if t is not None:
+            if obs_cfg.get('enabled', True):
+                # Retrigger only when the hit is stronger than what is still ringing
+                # Front hits have always played on channel 0, rear hits on channel 1
+                for ch, slot in ((0, F_OBSTACLE_F), (1, F_OBSTACLE_R)):
+                    v = float(w[slot])
+                    if v > 0 and v > self.impact_level[ch] - IMPACT_DECAY * (t - self.impact_time[ch]):
+                        self.impact_level[ch] = v; self.impact_time[ch] = t
+                        self._event(EV_IMPACT, t, ch, v)
+            if cfg['effects'].get('gear_shift', {}).get('enabled') and self.last_gear is not None and d.gear != self.last_gear:
+                self._event(EV_SHIFT, t, -1, 2.5)
+            kerb_vol = float(cfg['effects']['sim_road'].get('kerb_volume', 0.0))
+            for ch, slot in ((0, F_TEX_R), (1, F_TEX_F)): # same routing as the road signal
+                if not self.on_kerb[ch] and w[slot] > KERB_ON:
+                    self.on_kerb[ch] = True
+                    if kerb_vol > 0 and d.speed_kmh > 4.0: self._event(EV_KERB, t, ch, kerb_vol)
+                elif self.on_kerb[ch] and w[slot] < KERB_OFF:
+                    self.on_kerb[ch] = False
+        self.last_gear = d.gear
+
+        # --- Slip (traction / ABS), including autocalibration ---
+        if self.tire_processor is not None:
+            try:
+                w[F_TC_F], w[F_TC_R], w[F_ABS_F], w[F_ABS_R] = self.tire_processor.get_traction_triggers(d)
+            except Exception:
+                pass
+        w[F_BRAKING] = 1.0 if d.brake > 0 else 0.0
+
+        with self.lock:
+            self.frame[:] = w
+            np.maximum(self.peak, w, out=self.peak)
+        self.packets += 1
+        return w
+
+    def consume(self):
+        """
+        Audio thread: latest frame with transients replaced by their peak since the last call.
+        A transient is delivered once; blocks without a new packet get zero in those slots.
+        Returns an internal buffer that stays valid until the next consume().
+        """
+        with self.lock:
+            self.out[:] = self.frame
+            self.out[PEAK_SLOTS] = self.peak[PEAK_SLOTS]
+            self.peak[PEAK_SLOTS] = 0.0
+        return self.out
+
+    def consume_events(self):
+        """ Audio thread: events queued since the last call (oldest first) """
+        with self.lock:
+            if not self.events: return ()
+            events = self.events; self.events = []
+        return events
@@ -0,0 +1,111 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import bisect, time
+from collections import deque
+
+# Cumulative quality levels, cheapest cut first
+QUALITY_LEVELS = ('full', 'no_texture', 'simple_engine', 'reduced_rate', 'large_block')
+Q_FULL, Q_NO_TEXTURE, Q_SIMPLE_ENGINE, Q_REDUCED_RATE, Q_LARGE_BLOCK = range(len(QUALITY_LEVELS))
+
+REDUCED_RATE = 4000 # Synthesis rate target at Q_REDUCED_RATE (everything we render is below ~200 Hz)
+
+class CpuGovernor:
+    def __init__(self, g_cfg=None, window=48):
+        """
+        Watches render time as a fraction of the block deadline over a sliding window
+        of blocks. Steps quality down one level when the 90th percentile exceeds `high`
+        (or a block overran), and back up after `up_after` seconds below `low`.
+        A step up that has to be undone within a window doubles the wait for the
+        next one, so a board on the edge settles instead of bouncing.
+        record() runs on the audio thread: the window is kept sorted as it slides
+        (no percentile over an array per block), and transition messages are queued
+        for the engine loop to print (drain_messages()).
+        """
+        self.window = window
+        self.recent = deque(maxlen=window) # arrival order
+        self.sorted = []                   # the same values, sorted
+        self.count = 0
+        self.level = Q_FULL
+        self.last_change = time.time()
+        self.backoff = 1.0
+        self.stepped_up = False
+        self.overruns = 0
+        self.transitions = deque(maxlen=20)
+        self.messages = deque(maxlen=20)
+        self.configure(g_cfg or {})
+
+    def configure(self, g_cfg):
+        self.enabled = bool(g_cfg.get('enabled', True))
+        self.high = float(g_cfg.get('high', 0.7))
+        self.low = float(g_cfg.get('low', 0.3))
+        self.up_after = float(g_cfg.get('up_after', 10.0))
+        self.max_level = min(int(g_cfg.get('max_level', Q_LARGE_BLOCK)), len(QUALITY_LEVELS) - 1)
+
+    @property
+    def name(self):
+        return QUALITY_LEVELS[self.level]
+
+    def load(self):
+        """ 90th percentile of the window (linear interpolation, like numpy.percentile) """
+        s = self.sorted
+        if not s: return 0.0
+        pos = 0.9 * (len(s) - 1); i = int(pos)
+        return s[i] if i + 1 >= len(s) else s[i] + (s[i + 1] - s[i]) * (pos - i)
+
+    def record(self, render_s, budget_s, now):
+        """ Feeds one block's render time; returns the new level when it changes, else None """
+        ratio = render_s / budget_s
+        if len(self.recent) == self.window: del self.sorted[bisect.bisect_left(self.sorted, self.recent[0])]
+        self.recent.append(ratio); bisect.insort(self.sorted, ratio)
+        self.count += 1
+        if ratio >= 1.0: self.overruns += 1
+        if not self.enabled:
+            return self._change(Q_FULL, now, 0.0, 'governor disabled') if self.level != Q_FULL else None
+        if self.count < self.window // 4: return None # Not enough history since the last change
+
+        load = self.load()
+        if (load > self.high or ratio >= 1.0) and self.level < self.max_level:
+            if self.stepped_up and now - self.last_change < self.up_after: self.backoff = min(self.backoff * 2.0, 32.0) # Stepped up too early
+            return self._change(self.level + 1, now, load, 'overrun' if ratio >= 1.0 else 'load')
+        if load < self.low and self.level > Q_FULL and now - self.last_change >= self.up_after * self.backoff:
+            return self._change(self.level - 1, now, load, 'headroom')
+        if self.level == Q_FULL and now - self.last_change > 60.0: self.backoff = 1.0
+        return None
+
+    def _change(self, level, now, load, reason):
+        old = self.level
+        self.stepped_up = level < old
+        self.level = level
+        self.last_change = now
+        self.count = 0 # Judge the new level on its own blocks
+        self.recent.clear(); self.sorted.clear()
+        self.transitions.append({'time': round(now, 1), 'from': QUALITY_LEVELS[old], 'to': QUALITY_LEVELS[level],
+                                 'load': round(load, 2), 'reason': reason})
+        self.messages.append(f"GOVERNOR: {reason}, render at {load * 100:.0f}% of the block budget -> quality '{QUALITY_LEVELS[level]}' (level {level})")
+        return level
+
+    def drain_messages(self):
+        """ Transition messages queued by record(); printed from the engine loop, not the audio thread """
+        out = []
+        while self.messages: out.append(self.messages.popleft())
+        return out
+
+    def status(self):
+        return {'enabled': self.enabled, 'level': self.level, 'name': self.name, 'load': round(self.load(), 3),
+                'overruns': self.overruns, 'transitions': list(self.transitions)}
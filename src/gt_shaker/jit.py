@@ -0,0 +1,186 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+# Central numba setup for every kernel in the package.
+# The cache lives in the user's state dir because system/.deb installs are read-only,
+# and every kernel declares its signatures so warmup() can load or compile all of them
+# before the audio stream opens (never inside the first callback).
+# Every kernel also has a vectorised NumPy implementation that is used when numba is
+# missing (or GT_SHAKER_NO_JIT=1). Which one runs is fixed at import: numba, unless the
+# kernel is declared prefer="numpy" or listed in GT_SHAKER_NUMPY_KERNELS (comma separated);
+# `python -m gt_shaker.bench kernels` shows the timings behind those choices.
+# check_parity() compares the two.
+
+import os, sys, time
+import numpy as np
+from .paths import user_state_dir
+
+CACHE_DIR = os.environ.get("NUMBA_CACHE_DIR") or os.path.join(user_state_dir(), "numba")
+os.environ["NUMBA_CACHE_DIR"] = CACHE_DIR
+
+try:
+    import numba
+    numba.config.CACHE_DIR = CACHE_DIR
+    HAVE_NUMBA = True
+except ImportError:
+    numba = None
+    HAVE_NUMBA = False
+
+USE_JIT = HAVE_NUMBA and os.environ.get("GT_SHAKER_NO_JIT", "") in ("", "0")
+NUMPY_KERNELS = {k.strip() for k in os.environ.get("GT_SHAKER_NUMPY_KERNELS", "").split(",") if k.strip()}
+
+KERNELS = [] # (name, dispatcher or None, signatures, numpy implementation, module name, input generator)
+BOUND = {}   # kernel name -> 'numba' or 'numpy', as bound at import
+_warm = False
+
+def kernel(*signatures, fallback=None, sample=None, fastmath=True, prefer="numba"):
+    """
+    Decorator for hot-path kernels: njit with the on-disk cache and declared argument
+    signatures, e.g. @kernel("(float32[::1], float64)"). Without numba the NumPy
+    `fallback` is used instead; kernels that are already written as whole-array
+    NumPy expressions are their own fallback. `sample(sig, rng, n)` builds realistic
+    inputs for timing/parity when random values derived from the signature won't do
+    (e.g. filter coefficients). prefer="numpy" binds the NumPy version even with numba,
+    for whole-array kernels where it measured faster.
+    """
+    def decorator(func):
+        disp = numba.njit(fastmath=fastmath, cache=True)(func) if HAVE_NUMBA else None
+        # Whole-array kernels run as-is under NumPy; keep the undecorated function for that
+        np_impl = fallback or func
+        KERNELS.append((func.__name__, disp, signatures, np_impl, func.__module__, sample or _random_args))
+        jit = USE_JIT and prefer == "numba" and func.__name__ not in NUMPY_KERNELS
+        BOUND[func.__name__] = "numba" if jit else "numpy"
+        return disp if jit else np_impl
+    return decorator
+
+def _load_kernel_modules():
+    """ Kernels register on import; pull in every module that defines some """
+    from . import audio_processor, features, tire_processor, Simulated_Road, eq, limiter, events # noqa: F401
+
+def warmup(verbose=True):
+    """ Loads (or compiles and caches) every kernel signature bound to numba; returns total seconds """
+    global _warm
+    if not USE_JIT:
+        if verbose and not _warm:
+            why = "disabled by GT_SHAKER_NO_JIT" if HAVE_NUMBA else "numba not installed"
+            print(f"JIT: {why}, using the vectorised NumPy kernels.")
+        _warm = True
+        return 0.0
+    _load_kernel_modules()
+
+    total = 0.0; ready = 0
+    for name, disp, signatures, _, _, _ in KERNELS:
+        if BOUND[name] == "numpy": continue # never called; compiling it would only cost startup time
+        for sig in signatures:
+            hits = sum(disp.stats.cache_hits.values())
+            t0 = time.perf_counter()
+            try:
+                disp.compile(sig)
+            except Exception as e:
+                print(f"JIT ERROR: {name}{sig}: {e}")
+                continue
+            dt = time.perf_counter() - t0
+            total += dt; ready += 1
+            if verbose and not _warm:
+                how = "loaded" if sum(disp.stats.cache_hits.values()) > hits else "compiled"
+                print(f"JIT: {name}{sig} {how} in {dt * 1000:.1f} ms")
+    if verbose and not _warm:
+        print(f"JIT: {ready} kernel signatures ready in {total * 1000:.0f} ms (cache: {CACHE_DIR})")
+        on_numpy = sorted(name for name, how in BOUND.items() if how == "numpy")
+        if on_numpy: print(f"JIT: running as NumPy: {', '.join(on_numpy)}")
+    _warm = True
+    return total
+
+def _random_args(sig, rng, n=256):
+    """ Random inputs matching a signature string like "(float32[::1], int64, boolean)" """
+    args = []
+    for t in sig.strip("()").split(","):
+        t = t.strip()
+        if t.endswith("[::1]"):
+            dtype = np.dtype(t[:-5])
+            # Magnitudes like the real inputs (phases of a few cycles, heights, wheel speeds)
+            args.append((rng.uniform(-10.0, 10.0, n) * rng.choice([0.01, 1.0])).astype(dtype))
+        elif t == "boolean": args.append(bool(rng.integers(0, 2)))
+        elif t.startswith("int"): args.append(int(rng.integers(0, 3)))
+        else: args.append(float(rng.uniform(0.0, 2.0) * rng.choice([0.01, 1.0, 10.0])))
+    return args
+
+def compare_outputs(x, y, rtol=1e-4, atol=1e-5):
+    """ Mismatch string for two outputs of the same kernel, or None if they agree """
+    x = np.asarray(x, dtype=np.float64); y = np.asarray(y, dtype=np.float64)
+    if x.shape != y.shape: return f"shapes differ {x.shape} vs {y.shape}"
+    finite = np.isfinite(x)
+    if not np.array_equal(finite, np.isfinite(y)): return "non-finite values differ"
+    if not finite.any(): return None
+    # float32 signal paths: tolerance relative to the signal's scale, not per sample
+    diff = np.abs(x[finite] - y[finite]).max()
+    if diff > atol + rtol * max(1.0, np.abs(x[finite]).max()): return f"max diff {diff:.3g}"
+    return None
+
+def compare_calls(disp, np_impl, a_jit, a_np, rtol=1e-4, atol=1e-5):
+    """
+    Calls the numba and NumPy versions on their own argument lists (state arrays are
+    updated in place, so the lists can be fed block after block) and compares the
+    return values and every array argument. Returns a mismatch string or None.
+    """
+    with np.errstate(all="ignore"):
+        r_jit = disp(*a_jit); r_np = np_impl(*a_np)
+    outs = list(zip(r_jit, r_np)) if isinstance(r_jit, tuple) else [(r_jit, r_np)]
+    outs += [(x, y) for x, y in zip(a_jit, a_np) if isinstance(x, np.ndarray)]
+    for k, (x, y) in enumerate(outs):
+        err = compare_outputs(x, y, rtol, atol)
+        if err is not None: return f"output {k}: {err}"
+    return None
+
+def compare(disp, np_impl, args, rtol=1e-4, atol=1e-5):
+    """ compare_calls() on copies of the same inputs """
+    copies = lambda: [a.copy() if isinstance(a, np.ndarray) else a for a in args]
+    return compare_calls(disp, np_impl, copies(), copies(), rtol, atol)
+
+def check_parity(trials=200, rtol=1e-4, atol=1e-5, seed=0):
+    """ compare() for every kernel and signature on `trials` random inputs; returns a list of mismatch strings """
+    if not HAVE_NUMBA: return ["numba not installed, nothing to compare against"]
+    _load_kernel_modules()
+    rng = np.random.default_rng(seed)
+    failures = []
+    for name, disp, signatures, np_impl, _, sample in KERNELS:
+        for sig in signatures:
+            for trial in range(trials):
+                err = compare(disp, np_impl, sample(sig, rng, 256), rtol, atol)
+                if err is not None:
+                    failures.append(f"{name}{sig} trial {trial} {err}")
+                    break
+    return failures
+
+def main(argv=None):
+    """
+    gt-shaker-warmup: fill the JIT cache ahead of time (e.g. from a package postinst).
+    With --parity, compare the numba kernels against their NumPy versions instead.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if "--parity" in argv:
+        failures = check_parity()
+        for f in failures: print(f"PARITY: {f}")
+        print(f"PARITY: {len(KERNELS)} kernels, {'OK' if not failures else str(len(failures)) + ' mismatches'}")
+        sys.exit(1 if failures else 0)
+    warmup()
+
+if __name__ == "__main__":
+    # Run through the package module: that is where the kernels register
+    from gt_shaker.jit import main as package_main
+    package_main()
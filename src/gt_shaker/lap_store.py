@@ -0,0 +1,212 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+
+import json, os, queue, threading, time
+import numpy as np
+from .config_store import atomic_write
+
+LAP_CHANNELS = ('time', 'distance', 'speed', 'rpm', 'throttle', 'brake', 'slip_front', 'slip_rear',
+                'susp_FL', 'susp_FR', 'susp_RL', 'susp_RR', 'surge_g', 'sway_g', 'gear')
+CHUNK_SAMPLES = 4096 # ~68 s at 60 Hz; buffers grow in whole chunks
+
+class LapBuffer:
+    """ Preallocated columnar buffer (one contiguous row per channel) for the lap being driven """
+    def __init__(self):
+        self.data = np.zeros((len(LAP_CHANNELS), CHUNK_SAMPLES), dtype=np.float32)
+        self.n = 0
+
+    def append(self, row):
+        if self.n == self.data.shape[1]:
+            grown = np.zeros((self.data.shape[0], self.data.shape[1] + CHUNK_SAMPLES), dtype=np.float32)
+            grown[:, :self.n] = self.data
+            self.data = grown
+        self.data[:, self.n] = row
+        self.n += 1
+
+class LapStore:
+    def __init__(self, root):
+        """
+        On-disk lap library: <root>/<session>/lap_<n>.npy holds a (channels, samples) float32
+        array that can be opened with mmap_mode='r'; <root>/index.json lists every lap.
+        """
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.index_path = os.path.join(root, 'index.json')
+        self.lock = threading.Lock()
+        self.index = []
+        self.index_mtime = None
+        self._sync()
+
+    def _sync(self):
+        """ Re-reads index.json if another process (an engine process) has rewritten it """
+        try:
+            mtime = os.stat(self.index_path).st_mtime_ns
+            if mtime == self.index_mtime: return
+            with open(self.index_path, 'r') as f: self.index = json.load(f)
+            self.index_mtime = mtime
+        except (OSError, ValueError):
+            pass
+
+    def save_lap(self, entry, columns):
+        session_dir = os.path.join(self.root, entry['session'])
+        os.makedirs(session_dir, exist_ok=True)
+        # Never overwrite a saved lap: a session name can repeat (same second) and so can its lap numbers
+        base = f"lap_{entry['lap']:03d}"
+        path = os.path.join(session_dir, base + '.npy'); n = 1
+        while os.path.exists(path):
+            n += 1; path = os.path.join(session_dir, f"{base}_{n}.npy")
+        if n > 1: entry['id'] = f"{entry['id']}_{n}"
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f: np.save(f, columns)
+        os.replace(tmp_path, path)
+        entry['file'] = os.path.relpath(path, self.root)
+        with self.lock:
+            self._sync()
+            self.index.append(entry)
+            atomic_write(self.index_path, json.dumps(self.index, indent=1))
+            self.index_mtime = os.stat(self.index_path).st_mtime_ns
+
+    def list_laps(self, session=None, track=None, car=None):
+        """ Index lookup, fastest lap first """
+        with self.lock:
+            self._sync()
+            laps = list(self.index)
+        if session: laps = [e for e in laps if e['session'] == session]
+        if track: laps = [e for e in laps if e['track'] == track]
+        if car is not None: laps = [e for e in laps if e['car'] == car]
+        return sorted(laps, key=lambda e: e['lap_time_ms'])
+
+    def get(self, lap_id):
+        with self.lock:
+            self._sync()
+            for e in self.index:
+                if e['id'] == lap_id: return e
+        return None
+
+    def load(self, lap_id):
+        """ Memory-mapped (channels, samples) array; nothing is read until it is touched """
+        entry = self.get(lap_id)
+        if entry is None: raise KeyError(lap_id)
+        return np.load(os.path.join(self.root, entry['file']), mmap_mode='r')
+
+    def compare(self, lap_a, lap_b, step_m=2.0, channels=('speed', 'rpm', 'throttle', 'brake', 'slip_front', 'slip_rear')):
+        """ Resamples two laps onto a common distance grid; 'delta' is lap B time minus lap A time in seconds """
+        a = self.load(lap_a); b = self.load(lap_b)
+        d_col = LAP_CHANNELS.index('distance'); t_col = LAP_CHANNELS.index('time')
+        end = min(float(a[d_col, -1]), float(b[d_col, -1]))
+        grid = np.arange(0.0, end, step_m, dtype=np.float32)
+        # Distance is monotonic per lap, so interp over it is well defined
+        out = {'distance': grid.tolist(), 'delta': (np.interp(grid, b[d_col], b[t_col]) - np.interp(grid, a[d_col], a[t_col])).round(3).tolist()}
+        for name in channels:
+            c = LAP_CHANNELS.index(name)
+            out[name] = {'a': np.interp(grid, a[d_col], a[c]).round(3).tolist(), 'b': np.interp(grid, b[d_col], b[c]).round(3).tolist()}
+        return out
+
+class LapRecorder:
+    def __init__(self, store, track='unknown'):
+        """
+        Splits the packet stream into laps on lap-counter changes.
+        add() only writes floats into the preallocated LapBuffer; finished laps
+        are saved by a background thread so the engine loop never blocks on disk.
+        close() stops that thread once the queued laps are written.
+        """
+        self.store = store
+        self.track = track
+        self.session_stamp = None; self.session_seq = 0
+        self.session = self._session_name()
+        self.buffer = LapBuffer()
+        self.spare = LapBuffer()
+        self.row = np.zeros(len(LAP_CHANNELS), dtype=np.float32)
+        self.lap = None
+        self.car = None
+        self.complete = False
+        self.lap_start = 0.0; self.last_time = 0.0; self.distance = 0.0
+        self.queue = queue.Queue()
+        self.writer = threading.Thread(target=self._run_writer, daemon=True)
+        self.writer.start()
+
+    def _session_name(self):
+        """ Timestamped session name; a second session within the same second gets a -2, -3... suffix """
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        self.session_seq = self.session_seq + 1 if stamp == self.session_stamp else 1
+        self.session_stamp = stamp
+        return stamp if self.session_seq == 1 else f"{stamp}-{self.session_seq}"
+
+    def close(self, timeout=5.0):
+        """ Lets the writer finish the queued laps and stop (engine shutdown) """
+        self.queue.put(None)
+        self.writer.join(timeout)
+
+    def add(self, now, d, traction_triggers):
+        if d.car_code != self.car:
+            # New car -> new session so laps from different cars never share an index entry
+            if self.car is not None: self.session = self._session_name()
+            self.car = d.car_code; self._reset(d.current_lap, complete=False, now=now)
+        elif self.lap is not None and d.current_lap < self.lap:
+            # Lap counter went backwards: the race was restarted, and its lap numbers start over
+            self.session = self._session_name()
+            self._reset(d.current_lap, complete=False, now=now)
+        elif d.current_lap != self.lap:
+            if d.current_lap == self.lap + 1 and self.complete and d.last_lap_ms > 0:
+                self._finish_lap(d.last_lap_ms)
+            self._reset(d.current_lap, complete=self.lap is not None and d.current_lap == self.lap + 1, now=now)
+
+        if not d.in_race or d.is_paused: return
+        dt = min(max(now - self.last_time, 0.0), 0.1)
+        self.last_time = now
+        self.distance += (d.speed_kmh / 3.6) * dt
+
+        r = self.row
+        r[0] = now - self.lap_start; r[1] = self.distance; r[2] = d.speed_kmh; r[3] = d.engine_rpm
+        r[4] = d.throttle; r[5] = d.brake; r[6], r[7] = traction_triggers
+        r[8] = d.suspension_height_FL; r[9] = d.suspension_height_FR; r[10] = d.suspension_height_RL; r[11] = d.suspension_height_RR
+        r[12] = d.surge_g; r[13] = d.sway_g; r[14] = d.gear
+        self.buffer.append(r)
+
+    def _reset(self, lap, complete, now):
+        self.buffer.n = 0
+        self.lap = lap
+        self.complete = complete and lap > 0
+        self.lap_start = now; self.last_time = now; self.distance = 0.0
+
+    def _finish_lap(self, lap_time_ms):
+        if self.buffer.n < 2: return
+        entry = {
+            'id': f"{self.session}/{self.lap}", 'session': self.session, 'track': self.track,
+            'car': self.car, 'lap': self.lap, 'lap_time_ms': int(lap_time_ms),
+            'samples': self.buffer.n, 'distance': round(self.distance, 1), 'recorded': time.time()
+        }
+        # Hand the full buffer to the writer and keep driving into the spare one
+        done = self.buffer
+        self.buffer = self.spare if self.spare is not None else LapBuffer()
+        self.spare = None
+        self.queue.put((entry, done))
+
+    def _run_writer(self):
+        while True:
+            item = self.queue.get()
+            if item is None: return
+            entry, buf = item
+            try:
+                self.store.save_lap(entry, np.ascontiguousarray(buf.data[:, :buf.n]))
+                print(f"INFO: Lap {entry['lap']} saved ({entry['samples']} samples).")
+            except Exception as e:
+                print(f"Lap store error: {e}")
+            buf.n = 0
+            if self.spare is None: self.spare = buf
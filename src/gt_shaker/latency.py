@@ -0,0 +1,223 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+# End-to-end latency: a stand-in console injects marker events (a gear change or a one-packet
+# suspension spike) into a steady stream; the engine's output is tapped at the backend and the
+# marker's onset located in the rendered samples. Reports per-stage latency distributions for
+# every combination of block size, backend, render-ahead and receive mode.
+# Usage: python -m gt_shaker.latency --block 512 1024 3072 --receive poll event [--report latency.json]
+
+import argparse, copy, itertools, json, math, sys, tempfile, threading, time
+import numpy as np
+
+STAGES = ('network', 'pickup', 'buffer', 'onset', 'total')
+MARKERS = {
+    # marker -> the only effect left enabled, so its onset is the first sound after silence
+    'shift': 'gear_shift',
+    'bump': 'suspension',
+}
+SPIKE = 0.06 # metres of suspension travel in the single spike packet
+
+def steady(t):
+    """
+    Scenario without anything for the effects to react to: constant speed, gear and ride height.
+    The rpm wanders slightly, or the engine would take the frozen values for a paused game and mute.
+    """
+    return {'rpm': 4000.0 + 50.0 * math.sin(t), 'speed_kmh': 100.0, 'gear': 3, 'throttle': 50.0, 'susp': (0.1, 0.1, 0.1, 0.1)}
+
+def percentiles(values):
+    v = np.asarray(values, dtype=np.float64) * 1000.0
+    if not len(v): return {'n': 0}
+    return {'n': int(len(v)), 'p50': round(float(np.percentile(v, 50)), 2), 'p90': round(float(np.percentile(v, 90)), 2),
+            'p99': round(float(np.percentile(v, 99)), 2), 'max': round(float(v.max()), 2)}
+
+class MarkerProbe:
+    def __init__(self, marker, sample_rate, threshold):
+        """
+        Follows one marker at a time through the pipeline, all times on time.monotonic():
+        sent (console), received (socket thread), picked up (engine loop), first output sample.
+        """
+        self.marker = marker
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.wall_offset = time.time() - time.monotonic() # client receive stamps are wall clock
+        self.lock = threading.Lock()
+        self.current = None
+        self.results = []
+        self.missed = 0
+        self.noise = 0.0
+        self.armed = 0
+        self.quiet = threading.Event() # the last block stayed below the threshold
+        self.render_t = 0.0
+        self.last_gear = None
+
+    def arm(self, sim):
+        """ Starts the next marker; the console sends it with its next packet """
+        with self.lock:
+            if self.current is not None: self.missed += 1
+            self.current = {'armed': time.monotonic()}
+            self.armed += 1
+        if self.marker == 'shift': sim.override(gear=4 if self.armed % 2 else 3)
+        else: sim.override(susp=(0.1 + SPIKE,) * 4)
+
+    def on_send(self, sim, packet_id, sent, fields):
+        with self.lock:
+            m = self.current
+            if m is None or 'sent' in m: return
+            m['sent'] = sent; m['packet_id'] = packet_id
+        if self.marker == 'bump': sim.clear('susp') # a spike lasts exactly one packet; a shift holds the new gear
+
+    def on_packet(self, d, client):
+        """ Called from the engine loop for each packet it picks up """
+        hit = (self.marker == 'shift' and self.last_gear is not None and d.gear != self.last_gear) or \
+              (self.marker == 'bump' and d.suspension_height_FL > 0.1 + SPIKE / 2)
+        self.last_gear = d.gear
+        if not hit: return
+        with self.lock:
+            m = self.current
+            if m is None or 'picked' in m: return # may beat on_send: the console reports after sendto returns
+            m['received'] = client.last_packet_time - self.wall_offset; m['picked'] = time.monotonic()
+
+    def on_block(self, block, play_start):
+        peak = float(np.abs(block).max()) if len(block) else 0.0
+        if peak > self.threshold: self.quiet.clear()
+        else: self.quiet.set()
+        with self.lock:
+            m = self.current
+            if m is None or 'picked' not in m or 'sent' not in m or self.render_t < m['picked']:
+                # Before the first marker: the idle floor the onset has to stand out from
+                if not self.armed: self.noise = max(self.noise, peak)
+                return
+            loud = np.flatnonzero(np.abs(block) > self.threshold)
+            if not len(loud):
+                if time.monotonic() - m['picked'] > 2.0: self.current = None; self.missed += 1
+                return
+            onset = play_start + (loud[0] // 2) / float(self.sample_rate) # interleaved stereo
+            self.results.append({'network': m['received'] - m['sent'], 'pickup': m['picked'] - m['received'],
+                                 'buffer': play_start - m['picked'], 'onset': onset - play_start, 'total': onset - m['sent']})
+            self.current = None
+
+    def summary(self):
+        return {stage: percentiles([r[stage] for r in self.results]) for stage in STAGES}
+
+def _config(marker, block, backend, render_ahead, receive, recv_port, device):
+    from .paths import use_scratch_dirs
+    if 'gt_shaker.web_app' not in sys.modules: use_scratch_dirs(tempfile.mkdtemp(prefix='gt7-latency-'))
+    from . import web_app
+    cfg = copy.deepcopy(web_app.default_config)
+    cfg['ps5_ip'] = '127.0.0.1'; cfg['recv_port'] = recv_port
+    cfg['receive_mode'] = receive
+    cfg['governor']['enabled'] = False # a fixed block size for the whole run
+    cfg['control']['compensate_output'] = render_ahead
+    cfg['audio'].update({'backend': backend, 'block_size': block, 'null_realtime': True, 'idle_policy': 'warm'})
+    if device is not None: cfg['audio']['alsa_device'] = device
+    for name, eff in cfg['effects'].items(): eff['enabled'] = name == MARKERS[marker]
+    if marker == 'bump': cfg['effects']['suspension']['road_volume'] = 0.0 # only the impact part
+    return cfg
+
+def measure(marker='shift', block=3072, backend='null', render_ahead=False, receive='poll', count=20, spacing=1.0,
+            threshold=0.01, recv_port=35740, sim_port=33739, device=None):
+    """ Runs one configuration: `count` markers `spacing` seconds apart; returns the per-stage summary """
+    from .main import ShakerEngine
+    from .console_sim import ConsoleSim
+    from .tire_processor import TireProcessor
+
+    cfg = _config(marker, block, backend, render_ahead, receive, recv_port, device)
+    sim = ConsoleSim('127.0.0.1', port=sim_port, reply_port=recv_port, scenario=steady).start()
+    engine = ShakerEngine(cfg)
+    engine.tire_processor = TireProcessor()
+    probe = MarkerProbe(marker, int(cfg['audio'].get('sample_rate', 48000)), threshold)
+    sim.on_send = lambda packet_id, sent, fields: probe.on_send(sim, packet_id, sent, fields)
+    render = engine.render
+    def timed_render(frame_count, xrun=False):
+        probe.render_t = time.monotonic()
+        return render(frame_count, xrun)
+    engine.render = timed_render # picked up when the backend opens the stream
+    threading.Thread(target=engine.run, args=('127.0.0.1',), daemon=True).start()
+
+    try:
+        deadline = time.monotonic() + 10.0
+        while (engine.features is None or engine.backend is None or not engine.backend.is_active()) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if engine.features is None or engine.backend is None or not engine.backend.is_active():
+            return {'error': "engine did not start streaming"}
+        probe.sample_rate = engine.chosen_rate or probe.sample_rate
+        update = engine.features.update
+        def traced_update(d, cfg, active=True, t=None):
+            probe.on_packet(d, engine.client)
+            return update(d, cfg, active, t)
+        engine.features.update = traced_update
+        engine.backend.on_block = probe.on_block
+        time.sleep(1.0) # warm-up: stream settled, idle floor measured
+        for _ in range(count):
+            probe.quiet.clear()
+            if not probe.quiet.wait(5.0): break # the previous marker is still ringing (or the output never goes quiet)
+            probe.arm(sim)
+            time.sleep(spacing)
+        time.sleep(0.5)
+    finally:
+        engine.running = False
+        sim.stop()
+        deadline = time.monotonic() + 3.0
+        while engine.thread_active and time.monotonic() < deadline: time.sleep(0.05)
+    if probe.current is not None: probe.missed += 1
+    if probe.noise > threshold:
+        print(f"LATENCY: idle output peaks at {probe.noise:.4f} above the onset threshold {threshold}; results are unreliable")
+    out = probe.summary()
+    out.update({'missed': probe.missed, 'noise_floor': round(probe.noise, 5), 'block_ms': round(block * 1000.0 / probe.sample_rate, 2)})
+    return out
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure telemetry-to-vibration latency per output configuration")
+    parser.add_argument('--marker', default='shift', choices=sorted(MARKERS), help="Gear change or one-packet suspension spike")
+    parser.add_argument('--block', type=int, nargs='+', default=[3072], help="Block sizes in frames")
+    parser.add_argument('--backend', nargs='+', default=['null'], choices=('null', 'alsa'),
+                        help="Output backends (alsa plays on the real device; PyAudio has no per-block timing)")
+    parser.add_argument('--render-ahead', nargs='+', default=['off'], choices=('off', 'on'),
+                        help="control.compensate_output: render the control timeline one buffer ahead")
+    parser.add_argument('--receive', nargs='+', default=['poll'], choices=('poll', 'event'), help="Engine receive mode")
+    parser.add_argument('--count', type=int, default=20, help="Markers per configuration")
+    parser.add_argument('--spacing', type=float, default=1.0, help="Seconds between markers")
+    parser.add_argument('--threshold', type=float, default=0.01, help="Sample magnitude that counts as the onset")
+    parser.add_argument('--recv-port', type=int, default=35740, help="Local telemetry port (keep clear of a running app)")
+    parser.add_argument('--sim-port', type=int, default=33739, help="Console stand-in heartbeat port")
+    parser.add_argument('--device', help="ALSA device for the alsa backend")
+    parser.add_argument('--report', help="Write all results as JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    for i, (block, backend, ahead, receive) in enumerate(itertools.product(args.block, args.backend, args.render_ahead, args.receive)):
+        name = f"{backend} block {block} ahead {ahead} recv {receive}"
+        print(f"LATENCY: {name} ...")
+        r = measure(args.marker, block, backend, ahead == 'on', receive, args.count, args.spacing, args.threshold,
+                    args.recv_port + i, args.sim_port, args.device)
+        r.update({'block': block, 'backend': backend, 'render_ahead': ahead == 'on', 'receive': receive})
+        results.append(r)
+        if 'error' in r:
+            print(f"LATENCY ERROR: {r['error']}")
+            continue
+        for stage in STAGES:
+            s = r[stage]
+            if s['n']: print(f"  {stage:8s} p50 {s['p50']:7.2f}  p90 {s['p90']:7.2f}  p99 {s['p99']:7.2f}  max {s['max']:7.2f} ms")
+        print(f"  {r['total']['n']} markers, {r['missed']} missed")
+    if args.report:
+        with open(args.report, 'w') as f: json.dump({'marker': args.marker, 'results': results}, f, indent=1)
+    return 1 if any('error' in r or not r['total']['n'] for r in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
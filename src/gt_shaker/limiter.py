@@ -0,0 +1,157 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from .jit import kernel
+
+DEFAULT_LIMITER = {"ceiling": 0.85, "attack_ms": 2.0, "release_ms": 80.0}
+
+# state slots: delay write pos, peak ring pos, gain, held peak, held peak age
+S_POS, S_PPOS, S_GAIN, S_HELD, S_AGE = range(5)
+
+def new_state():
+    state = np.zeros(5, dtype=np.float64)
+    state[S_GAIN] = 1.0
+    return state
+
+def _limiter_args(sig, rng, n):
+    """ Fresh limiter state and a signal that regularly exceeds the ceiling """
+    lookahead = int(rng.integers(4, 97))
+    x = (rng.uniform(-1.0, 1.0, n) * rng.uniform(0.5, 3.0)).astype(np.float32)
+    return [x, np.zeros(lookahead, dtype=np.float32), np.zeros(lookahead + 1, dtype=np.float32), new_state(),
+            0.85, 1.0 - math.exp(-4.6 / lookahead), 1.0 - math.exp(-1.0 / rng.uniform(100, 5000))]
+
+def np_lookahead_limiter(x, delay, peaks, state, ceiling, attack, release):
+    """ NumPy twin of jit_lookahead_limiter: vectorised window maxima, Python loop only for the gain smoother """
+    n = len(x); L = len(delay); M = len(peaks)
+    if n == 0: return 1.0
+    pos = int(state[S_POS]); ppos = int(state[S_PPOS]); gain = state[S_GAIN]
+    a = np.abs(x)
+    hist = np.concatenate((np.roll(peaks, -ppos)[1:], a)) # oldest first
+    held = sliding_window_view(hist, M).max(axis=1).astype(np.float64)
+    target = np.where(held > ceiling, ceiling / np.maximum(held, 1e-12), 1.0)
+    gains = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        t = target[i]
+        gain += (t - gain) * (attack if t < gain else release)
+        gains[i] = gain
+    delayed = np.concatenate((np.roll(delay, -pos), x))[:n]
+
+    # Same ring layout as the kernel leaves behind
+    k0 = max(0, n - L); delay[(pos + np.arange(k0, n)) % L] = x[k0:]
+    k0 = max(0, n - M); peaks[(ppos + np.arange(k0, n)) % M] = a[k0:]
+    window = hist[-M:]
+    state[S_POS] = (pos + n) % L; state[S_PPOS] = (ppos + n) % M; state[S_GAIN] = gain
+    state[S_HELD] = window.max(); state[S_AGE] = M - 1 - np.flatnonzero(window == window.max())[-1]
+
+    np.clip(delayed * gains, -ceiling, ceiling, out=delayed)
+    x[:] = delayed
+    return min(1.0, float(gains.min())) if n else 1.0
+
+@kernel("(float32[::1], float32[::1], float32[::1], float64[::1], float64, float64, float64)",
+        fallback=np_lookahead_limiter, sample=_limiter_args)
+def jit_lookahead_limiter(x, delay, peaks, state, ceiling, attack, release):
+    """
+    In-place look-ahead peak limiter. The input runs through a delay line of len(delay)
+    samples while the gain already follows the peak of the window that is about to
+    come out, so peaks are caught without clipping. Returns the lowest gain applied.
+    """
+    L = delay.shape[0]; M = peaks.shape[0]
+    pos = int(state[0]); ppos = int(state[1]); gain = state[2]; held = state[3]; age = int(state[4])
+    min_gain = 1.0
+    for i in range(x.shape[0]):
+        v = x[i]; a = abs(v)
+        peaks[ppos] = a
+        if a >= held:
+            held = a; age = 0
+        else:
+            age += 1
+            if age >= M:
+                # The held peak left the window; find the newest maximum of what's left
+                held = 0.0; age = 0
+                for k in range(M):
+                    p = peaks[(ppos - k) % M]
+                    if p > held: held = p; age = k
+        ppos = (ppos + 1) % M
+
+        target = ceiling / held if held > ceiling else 1.0
+        if target < gain: gain += (target - gain) * attack
+        else: gain += (target - gain) * release
+        if gain < min_gain: min_gain = gain
+
+        y = delay[pos] * gain
+        delay[pos] = v; pos = (pos + 1) % L
+        # Exponential attack lands within ~1% of target; catch the remainder
+        if y > ceiling: y = ceiling
+        elif y < -ceiling: y = -ceiling
+        x[i] = y
+    state[0] = pos; state[1] = ppos; state[2] = gain; state[3] = held; state[4] = age
+    return min_gain
+
+class LookaheadLimiter:
+    def __init__(self, sample_rate, channels=2):
+        """ Independent look-ahead limiter per shaker with gain-reduction metering """
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.key = None
+        self.gr_db = [0.0] * channels # Deepest gain reduction in the last block
+        self.hold_db = 0.0            # Peak-hold for the meter, decays ~20 dB/s
+
+    def configure(self, lim_cfg):
+        key = (lim_cfg.get('ceiling', 0.85), lim_cfg.get('attack_ms', 2.0), lim_cfg.get('release_ms', 80.0))
+        if key == self.key: return
+        ceiling, attack_ms, release_ms = float(key[0]), float(key[1]), float(key[2])
+        lookahead = max(1, int(round(attack_ms * self.sample_rate / 1000.0)))
+        if self.key is None or lookahead != len(self.delays[0]):
+            self.delays = [np.zeros(lookahead, dtype=np.float32) for _ in range(self.channels)]
+            self.peaks = [np.zeros(lookahead + 1, dtype=np.float32) for _ in range(self.channels)]
+            self.states = [new_state() for _ in range(self.channels)]
+        self.key = key
+        self.ceiling = ceiling
+        self.attack = 1.0 - math.exp(-4.6 / lookahead)
+        self.release = 1.0 - math.exp(-1.0 / max(1.0, release_ms * self.sample_rate / 1000.0))
+
+    def adopt(self, old):
+        """
+        Continues from a limiter at another sample rate (configured already): the pending
+        look-ahead audio is resampled into our delay line and the gain carries over
+        """
+        if old.key is None or self.key is None: return
+        for c in range(min(self.channels, old.channels)):
+            L = len(self.delays[c]); o = old.states[c]
+            src = np.roll(old.delays[c], -int(o[S_POS])) # oldest first
+            self.delays[c][:] = np.interp(np.linspace(0.0, len(src) - 1, L), np.arange(len(src)), src)
+            self.peaks[c][:L] = np.abs(self.delays[c]); self.peaks[c][L:] = 0.0
+            st = self.states[c]
+            st[S_POS] = 0.0; st[S_PPOS] = L % len(self.peaks[c]); st[S_GAIN] = o[S_GAIN]
+            st[S_HELD] = self.peaks[c].max(); st[S_AGE] = 0.0
+        self.gr_db = list(old.gr_db); self.hold_db = old.hold_db
+
+    def process(self, c, x):
+        """ Limits channel c (contiguous float32 array) in place """
+        g = jit_lookahead_limiter(x, self.delays[c], self.peaks[c], self.states[c], self.ceiling, self.attack, self.release)
+        self.gr_db[c] = -20.0 * math.log10(max(g, 1e-6))
+        return g
+
+    def meter(self, block_seconds):
+        """ Gain reduction for the dashboard (dB, positive = reducing) """
+        now = max(self.gr_db)
+        self.hold_db = max(now, self.hold_db - 20.0 * block_seconds)
+        return self.hold_db
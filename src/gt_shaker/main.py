@@ -15,9 +15,21 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <https://www.gnu.org/licenses/>.
 
-import time, threading, numpy as np, pyaudio
+import os, time, threading, numpy as np
 from .network_manager import TurismoClient
+from .fanout import FanoutServer
+from .capture import CaptureWriter
+from .paths import user_data_dir
 from .audio_processor import AudioProcessor
+from .features import FeatureExtractor, F_TC_F, F_TC_R, F_ABS_F, F_ABS_R, F_ROAD_F, F_ROAD_R
+from .control import ControlInterpolator
+from .dashboard import build_dashboard_snapshot
+from .telemetry_history import TelemetryHistory
+from .lap_store import LapRecorder
+from .audio_backends import create_backend
+from .jit import warmup
+from .resample import Upsampler, internal_factor
+from .governor import CpuGovernor, Q_REDUCED_RATE, Q_LARGE_BLOCK, REDUCED_RATE
 
 BUFFER_SIZE = 3072
 CHANNELS = 2
@@ -30,7 +42,17 @@ class ShakerEngine:
         self.thread_active = False
 
         self.chosen_rate = int(self.cfg['audio'].get('sample_rate', 48000))
-        self.processor = AudioProcessor(self.chosen_rate)
+
+        # Decimated synthesis: effects render at ~internal_rate and are upsampled once per block
+        internal_rate = int(self.cfg['audio'].get('internal_rate', 0) or 0)
+        self.base_factor = internal_factor(self.chosen_rate, internal_rate) if internal_rate > 0 else 1
+        self._set_synthesis(self.base_factor)
+
+        # Steps effect quality down (and block size up) when rendering gets close to the deadline
+        self.governor = CpuGovernor(self.cfg.get('governor'))
+        self.base_block_size = int(self.cfg['audio'].get('block_size', BUFFER_SIZE) or BUFFER_SIZE)
+        self.block_size = self.base_block_size
+        self.open_block_size = None
 
         self.current_data = None
         self.live_debug = {'road_noise': 0.0, 'g_force': 0.0, 'sim_road': 0.0}
@@ -38,6 +60,17 @@ class ShakerEngine:
         # Shared triggers for the web API
         self.last_traction_triggers = (0.0, 0.0)
 
+        # Dashboard snapshot cache: (packet_seq, pre-encoded JSON bytes)
+        self.packet_seq = 0
+        self.dashboard_snapshot = None
+        self.snapshot_live = False
+        self.snapshot_dirty = False
+        self.cfg_version = 0 # bumped on every config change; lets the audio thread skip unchanged settings
+
+        # Rolling per-packet history for the live trace graphs
+        self.history = TelemetryHistory(seconds=float(self.cfg.get('history_seconds', 300)))
+        self.history_frame = np.zeros(len(self.history.channels), dtype=np.float32)
+
         # Timers
         self.last_packet_time = time.time()
         self.last_rpm_val = -1.0
@@ -48,42 +81,228 @@ class ShakerEngine:
         # Watchdog Timer init
         self.last_audio_callback_time = time.time()
 
+        # Idle policy / wake + recovery measurements (exposed via /api/engine/stats)
+        self.idle = False
+        self.wake_started = None       # Set when the first packet after idle arrives
+        self.recovery_started = None   # Set when the watchdog kicks the stream
+        self.watchdog_strikes = 0
+        self.next_open_attempt = 0.0
+        self.audio_stats = {
+            'idle_policy': self.cfg['audio'].get('idle_policy', 'warm'), 'state': 'starting',
+            'stream_opens': 0, 'wake_latency_ms': None, 'recoveries': 0, 'recovery_ms': None, 'xruns': 0,
+            'render_errors': 0
+        }
+
+        # Output backend (PyAudio / ALSA / null sink), created in run()
+        self.backend = None
+
         # Placeholder for external processors injected via web_app
         self.tire_processor = None
-
-    def _start_audio_stream(self, pa):
+        self.lap_store = None
+        self.lap_recorder = None
+        self.features = None
+        self.publisher = None # shm_ring.ShmPublisher when running in an engine process
+        self.fanout = None
+        self.capture = None
+
+        # Packet -> audio-rate control curves (interpolation + optional latency compensation)
+        self.control = ControlInterpolator()
+        self.control_frame = np.zeros(6, dtype=np.float64)
+
+    def _set_synthesis(self, factor):
+        """ Builds the synthesis chain for chosen_rate / factor (before the stream runs) """
+        self.upsampler, self.processor = self._build_synthesis(factor)
+        self.synth_rate = self.chosen_rate / factor
+        self.pending_factor = None # Rate the governor asked for; built by the engine loop
+        self.prepared = None       # (factor, upsampler, processor) ready for render() to swap in
+        self.carry = None          # Device-rate frames left over from a dropped upsampler
+        self.last_synth = np.zeros((CHANNELS, 1), dtype=np.float32)
+
+    def _build_synthesis(self, factor):
+        return Upsampler(factor, CHANNELS) if factor > 1 else None, AudioProcessor(self.chosen_rate / factor)
+
+    def _prepare_synthesis(self):
+        """ Engine loop: builds the chain the governor asked for off the audio thread """
+        want = self.pending_factor
+        if want is None or (self.prepared is not None and self.prepared[0] == want): return
+        up, proc = self._build_synthesis(want)
+        proc.configure(self.cfg, self.cfg_version)
+        self.prepared = (want, up, proc)
+
+    def _swap_synthesis(self, prepared):
+        """ Audio thread, between two blocks: switches to the prepared chain and carries its state over """
+        factor, up, proc = prepared
+        proc.adopt(self.processor)
+        old = self.upsampler
+        if up is not None:
+            # Interpolation history: hold the last internal sample instead of starting from zero
+            up.history[:] = old.history[:, -1:] if old is not None else self.last_synth
+            if old is not None: up.fifo = old.fifo # Frames already rendered at the device rate
+        elif old is not None and len(old.fifo):
+            self.carry = old.fifo
+        self.upsampler, self.processor, self.synth_rate = up, proc, self.chosen_rate / factor
+        self.prepared = None; self.pending_factor = None
+
+    def _start_audio_stream(self, backend):
         """ Helper to start/restart the audio stream cleanly """
         try:
-            idx = self.cfg['audio'].get('device_index', -1)
-            stream = pa.open(
-                format=pyaudio.paFloat32,
-                channels=CHANNELS,
-                rate=self.chosen_rate,
-                output=True,
-                output_device_index=None if idx == -1 else idx,
-                stream_callback=self.audio_callback,
-                frames_per_buffer=BUFFER_SIZE
-            )
-            stream.start_stream()
+            backend.open(self.chosen_rate, CHANNELS, self.block_size, render=self.render)
+            self.open_block_size = self.block_size
+            backend.start()
             # Reset watchdog on start
             self.last_audio_callback_time = time.time()
-            print("INFO: Audio stream started (Fresh Connection).")
-            return stream
+            self.audio_stats['stream_opens'] += 1
+            print(f"INFO: Audio stream started (Fresh Connection, {backend.name}).")
+            return True
         except Exception as e:
             print(f"ERROR: Failed to start audio stream: {e}")
-            return None
+            if backend.is_open(): backend.close()
+            return False
+
+    def request_snapshot(self):
+        """ Asks the engine thread to rebuild the dashboard snapshot (e.g. after a config change) """
+        self.cfg_version += 1
+        self.snapshot_dirty = True
+
+    def _update_snapshot(self, now):
+        """ Rebuilds the cached dashboard JSON once per packet or when liveness/config changes """
+        d = self.current_data
+        if d is None: return
+        is_live = (now - self.client.last_packet_time) < 2.5
+        cached = self.dashboard_snapshot
+        if cached is not None and cached[0] == self.packet_seq and is_live == self.snapshot_live and not self.snapshot_dirty:
+            return
+        self.snapshot_dirty = False
+        self.snapshot_live = is_live
+        try:
+            self.dashboard_snapshot = (self.packet_seq, build_dashboard_snapshot(d, self.cfg, self.last_traction_triggers, self.live_debug, is_live))
+        except Exception as e:
+            print(f"Dashboard snapshot error: {e}")
+
+    def _record_history(self, now, d):
+        """ Feeds the history ring once per packet (same channel order as HISTORY_CHANNELS) """
+        f = self.history_frame
+        f[0] = d.engine_rpm; f[1] = d.speed_kmh; f[2] = d.throttle; f[3] = d.brake
+        f[4] = self.live_debug['road_noise']; f[5] = self.live_debug['g_force']; f[6] = self.live_debug.get('sim_road', 0.0)
+        f[7], f[8] = self.last_traction_triggers
+        self.history.push(now, f)
+
+    def _manage_stream(self, backend, now):
+        """
+        Keeps the output stream in the state the idle policy asks for:
+          warm  - stream keeps running and plays silence while idle (instant wake)
+          pause - stream is stopped but stays open; resuming costs one buffer
+          close - legacy behaviour, device is released and reopened on wake
+        """
+        policy = self.cfg['audio'].get('idle_policy', 'warm')
+        idle_timeout = float(self.cfg['audio'].get('idle_timeout', 10.0))
+        self.audio_stats['idle_policy'] = policy
+
+        if now - self.last_packet_time >= idle_timeout:
+            # SITUATION B: No data -> Idle Mode
+            if not self.idle:
+                self.idle = True
+                self.audio_stats['state'] = 'idle'
+                print(f"No data for {idle_timeout:g}s. Idle mode ({policy}).")
+                if backend.is_open() and policy == 'close':
+                    backend.close()
+                elif backend.is_open() and policy == 'pause':
+                    try: backend.stop()
+                    except Exception as e: print(f"Audio pause error: {e}")
+            return
+
+        # SITUATION A: We are "Live"
+        if self.idle:
+            self.idle = False
+            self.wake_started = now
+            if backend.is_open() and policy == 'pause':
+                try:
+                    backend.start()
+                    self.last_audio_callback_time = now
+                except Exception as e:
+                    print(f"Audio resume error: {e}")
+                    backend.close()
+
+        # 1. Ensure stream exists (back off if the device refuses to open)
+        if not backend.is_open():
+            if now < self.next_open_attempt: return
+            print("Creating new audio stream (Wake Up)...")
+            if not self._start_audio_stream(backend):
+                self.next_open_attempt = now + 2.0
+                return
+        elif self.open_block_size != self.block_size:
+            # The governor changed the block size; only a reopen applies it
+            print(f"INFO: Reopening audio stream with {self.block_size}-frame blocks (quality '{self.governor.name}').")
+            backend.close()
+            if not self._start_audio_stream(backend):
+                self.next_open_attempt = now + 2.0
+                return
+        self.audio_stats['state'] = 'live'
+
+        # 2. WATCHDOG CHECK
+        # If stream SHOULD be running but hasn't called back in 2.0s
+        time_since_audio = now - self.last_audio_callback_time
+        if time_since_audio > 2.0 or not backend.is_active():
+            self.recovery_started = now
+            self.audio_stats['recoveries'] += 1
+            self.last_audio_callback_time = now
+            if self.watchdog_strikes == 0:
+                # First try: restart the existing stream in place (no device reopen)
+                print(f"WATCHDOG: Audio froze for {time_since_audio:.2f}s! Restarting stream in place...")
+                self.watchdog_strikes += 1
+                try:
+                    backend.stop()
+                    backend.start()
+                    return
+                except Exception as e:
+                    print(f"WATCHDOG: In-place restart failed: {e}")
+            # Second strike: reopen the stream, but keep the backend (e.g. the PyAudio instance)
+            print("WATCHDOG: Reopening audio stream...")
+            self.watchdog_strikes += 1
+            backend.close()
+            if not self._start_audio_stream(backend): self.next_open_attempt = now + 2.0
+
+    def _note_callback(self, now, xrun):
+        """ Audio-thread bookkeeping: xruns, watchdog recovery time and wake latency (packet -> first block) """
+        self.last_audio_callback_time = now
+        if xrun: self.audio_stats['xruns'] += 1
+        if self.recovery_started is not None:
+            self.audio_stats['recovery_ms'] = round((now - self.recovery_started) * 1000.0, 1)
+            self.recovery_started = None
+            self.watchdog_strikes = 0
+        if self.wake_started is not None:
+            self.audio_stats['wake_latency_ms'] = round((now - self.wake_started) * 1000.0, 1)
+            self.wake_started = None
 
     def run(self, target_ip):
         """ Main engine loop with Dynamic Stream Management """
         self.thread_active = True
         self.running = True
 
-        pa = pyaudio.PyAudio()
-        stream = None
-
-        self.client = TurismoClient(target_ip)
+        # Load/compile every kernel now so the first audio callback never waits on numba
+        warmup()
+
+        self.backend = create_backend(self.cfg['audio'])
+        self.audio_stats['backend'] = self.backend.name
+
+        recv_port = int(self.cfg.get('recv_port', 33740)); bind_addr = self.cfg.get('bind_addr', '0.0.0.0')
+        # Optional re-publishing of the decrypted stream to other local tools
+        f_cfg = self.cfg.get('fanout', {})
+        if f_cfg.get('enabled', False): self.fanout = FanoutServer(f_cfg, bind_addr, recv_port)
+        # Optional raw capture of the session for gt_shaker.bulk_decode
+        c_cfg = self.cfg.get('capture', {})
+        if c_cfg.get('enabled', False):
+            c_dir = c_cfg.get('dir') or os.path.join(user_data_dir(), 'captures')
+            self.capture = CaptureWriter(os.path.join(c_dir, time.strftime('%Y%m%d-%H%M%S') + '.gtcap'))
+        self.client = TurismoClient(target_ip, recv_port=recv_port, bind_addr=bind_addr, fanout=self.fanout, capture=self.capture)
         self.client.start()
 
+        # Packet-rate physics (slip, suspension, impacts); the audio thread only reads its frames
+        self.features = FeatureExtractor(self.tire_processor)
+
+        if self.lap_store is not None and self.cfg.get('lap_recording', True):
+            self.lap_recorder = LapRecorder(self.lap_store, track=self.cfg.get('track_name', 'unknown'))
+
         # Initialize timers
         self.last_packet_time = time.time()
 
@@ -98,6 +317,16 @@ class ShakerEngine:
                     self.last_packet_time = now
                     self.current_data = new_telem
                     self.client.telemetry = None # Clear buffer
+                    self.packet_seq += 1
+                    active = not self._should_be_silent(new_telem)
+                    w = self.features.update(new_telem, self.cfg, active=active, t=self.client.last_packet_time or now)
+                    self.last_traction_triggers = (float(max(w[F_TC_F], w[F_ABS_F])), float(max(w[F_TC_R], w[F_ABS_R])))
+                    if active: self._push_control(new_telem, w)
+                    else: self.control.reset() # Pause/menu/loading: curves restart from the next live packets
+                    self._record_history(now, new_telem)
+                    if self.publisher is not None: self.publisher.packet(now, self.history_frame, w)
+                    if self.lap_recorder is not None:
+                        self.lap_recorder.add(now, new_telem, self.last_traction_triggers)
 
                     # Stagnation check (Track change / Pause menu detection)
                     if abs(new_telem.engine_rpm - self.last_rpm_val) > 0.1 or abs(new_telem.speed_kmh - self.last_speed_val) > 0.1:
@@ -105,130 +334,143 @@ class ShakerEngine:
                         self.last_speed_val = new_telem.speed_kmh
                         self.last_data_change_time = now
 
-                # --- DYNAMIC STREAM LOGIC ---
-                time_since_data = now - self.last_packet_time
-
-                if time_since_data < 10.0:
-                    # SITUATION A: We are "Live" (Data is less than 10s old)
-
-                    # 1. Ensure stream is running
-                    if stream is None or not stream.is_active():
-                        print("Creating new audio stream (Wake Up)...")
-                        if stream:
-                            try: stream.close()
-                            except: pass
-                        stream = self._start_audio_stream(pa)
-
-                    # 2. WATCHDOG CHECK
-                    # If stream SHOULD be running but hasn't called back in 2.0s
-                    time_since_audio = now - self.last_audio_callback_time
-                    if stream is not None and time_since_audio > 2.0:
-                        print(f"WATCHDOG: Audio froze for {time_since_audio:.2f}s! Force restarting...")
-                        try:
-                            stream.stop_stream()
-                            stream.close()
-                        except: pass
-                        stream = self._start_audio_stream(pa)
+                self._update_snapshot(now)
+                if self.publisher is not None: self.publisher.snapshot(self.dashboard_snapshot)
 
+                # --- DYNAMIC STREAM LOGIC ---
+                self._manage_stream(self.backend, now)
+                self._prepare_synthesis()
+                for msg in self.governor.drain_messages(): print(msg)
+
+                # Short sleep to save CPU in main loop; in 'event' receive mode a new packet ends it early
+                if self.cfg.get('receive_mode', 'poll') == 'event':
+                    self.client.packet_event.wait(0.01)
+                    self.client.packet_event.clear()
                 else:
-                    # SITUATION B: No data for 10s -> Sleep Mode
-                    if stream is not None:
-                        print("No data for 10s. Closing audio stream (Sleep Mode).")
-                        try:
-                            stream.stop_stream()
-                            stream.close()
-                        except: pass
-                        stream = None
-
-                # Short sleep to save CPU in main loop
-                time.sleep(0.01)
+                    time.sleep(0.01)
 
         except Exception as e:
             print(f"AUDIO ENGINE CRITICAL ERROR: {e}")
         finally:
             self.running = False
-            if stream:
-                try: stream.stop_stream(); stream.close()
-                except: pass
             if hasattr(self, 'client') and self.client:
                 self.client.stop()
-            pa.terminate()
+            if self.fanout is not None: self.fanout.close()
+            if self.capture is not None: self.capture.close()
+            if self.lap_recorder is not None: self.lap_recorder.close()
+            if self.tire_processor is not None: self.tire_processor.save() # learned since the last periodic put
+            try: self.backend.terminate()
+            except Exception as e: print(f"Audio backend shutdown error: {e}")
             self.thread_active = False
 
-    def audio_callback(self, in_data, frame_count, time_info, status):
-        """ Callback runs only when stream is open (i.e., when we have data) """
+    def _push_control(self, d, w):
+        """ Feeds the interpolator with this packet's values (CONTROL_CHANNELS order) """
+        c = self.control_frame
+        c[0] = d.engine_rpm; c[1] = d.speed_kmh
+        c[2], c[3] = self.last_traction_triggers
+        c[4] = w[F_ROAD_F]; c[5] = w[F_ROAD_R]
+        self.control.push(self.client.last_packet_time or time.time(), c)
+
+    def _control_horizon(self, frame_count):
+        """ How far ahead of the packet timeline a block is rendered (latency compensation) """
+        c_cfg = self.cfg.get('control', {})
+        horizon = float(c_cfg.get('horizon_ms', 0.0)) / 1000.0
+        if c_cfg.get('compensate_output', False):
+            # This block starts playing roughly one buffer from now
+            horizon += frame_count / float(self.chosen_rate)
+        return horizon
+
+    def _control_curves(self, now, frame_count, n_synth):
+        """ Per-sample control curves (n_synth samples at the synthesis rate), or None to hold packet values per block """
+        c_cfg = self.cfg.get('control', {})
+        if not c_cfg.get('interpolate', True): return None
+        horizon = self._control_horizon(frame_count)
+        sub_block = max(1, int(c_cfg.get('sub_block', 16)) * n_synth // frame_count)
+        return self.control.render(now, n_synth, self.synth_rate, horizon, sub_block)
+
+    def _should_be_silent(self, d):
+        """ Mute logic shared by the packet stage and the audio thread """
+        if not self.running or d is None or getattr(d, 'is_loading', False):
+            return True
+        if self.cfg.get('allow_replays', False):
+            # REPLAY MODE (Permissive): ignore 'Paused' and 'In Race', only mute on loading (black screen)
+            return False
+        # NORMAL MODE (Strict): mute on Pause, Menu, Replay or Loading
+        return d.is_paused or not d.in_race
+
+    def render(self, frame_count, xrun=False):
+        """ Renders one interleaved float32 block; called by the output backend's audio thread """
         try:
             now = time.time()
-            self.last_audio_callback_time = now
+            self._note_callback(now, xrun)
 
             d = self.current_data
-            allow_replays = self.cfg.get('allow_replays', False)
-
-            # --- MUTE LOGIC ---
-            if allow_replays:
-                # REPLAY MODE (Permissive)
-                # If replays are allowed, we ignore 'Paused' and 'In Race' flags.
-                # We only mute if the engine stops or game is loading (black screen).
-                should_be_silent = (
-                    not self.running or
-                    d is None or
-                    getattr(d, 'is_loading', False)
-                )
-            else:
-                # NORMAL MODE (Strict)
-                # Standard racing behavior: Mute on Pause, Menu, Replay or Loading.
-                should_be_silent = (
-                    not self.running or
-                    d is None or
-                    d.is_paused or
-                    getattr(d, 'is_loading', False) or
-                    not d.in_race
-                )
 
             # If silence is required, return empty buffer immediately
-            if should_be_silent:
-                return (np.zeros(frame_count * CHANNELS, dtype=np.float32).tobytes(), pyaudio.paContinue)
+            if self._should_be_silent(d) or self.features is None:
+                return self._silence(frame_count)
 
             # Stagnation Check (Safety: If data values haven't changed for 1.5s, mute)
             # This handles the case where you pause the replay (values stop changing).
             is_stagnant = (now - self.last_data_change_time > self.stagnation_timeout)
 
             if is_stagnant:
-                return (np.zeros(frame_count * CHANNELS, dtype=np.float32).tobytes(), pyaudio.paContinue)
-
-            # --- DATA PROCESSING ---
-
-            # 1. Tire Physics (Get TC and ABS values)
-            tc_f, tc_r, abs_f, abs_r = 0.0, 0.0, 0.0, 0.0
-
-            if hasattr(self, 'tire_processor') and self.tire_processor:
-                try:
-                    # Expects 4 values now (TC_F, TC_R, ABS_F, ABS_R)
-                    tc_f, tc_r, abs_f, abs_r = self.tire_processor.get_traction_triggers(d)
-                except Exception:
-                    tc_f, tc_r, abs_f, abs_r = 0.0, 0.0, 0.0, 0.0
-
-                # Save for Web API (Combine TC and ABS for simple visualization)
-                self.last_traction_triggers = (max(tc_f, abs_f), max(tc_r, abs_r))
-
-            # Combine triggers for the audio engine
-            trig_f = max(tc_f, abs_f)
-            trig_r = max(tc_r, abs_r)
-
-            # Determine braking state for ABS sound logic
-            is_braking = d.brake > 0
-
-            # 2. Audio Generation
-            ch0, ch1 = self.processor.process(
-                self.current_data, self.cfg, frame_count, self.live_debug,
-                is_muted=False, # Mute is handled by returns above
-                traction_triggers=(trig_f, trig_r),
-                is_braking=is_braking
-            )
-
-            # Interleave stereo channels
-            return (np.column_stack((ch0, ch1)).flatten().astype(np.float32).tobytes(), pyaudio.paContinue)
+                return self._silence(frame_count)
+
+            # --- AUDIO GENERATION (physics already ran once per packet in the engine loop) ---
+            t_start = time.perf_counter()
+            prepared = self.prepared
+            if prepared is not None and prepared[0] == self.pending_factor: self._swap_synthesis(prepared)
+            up = self.upsampler; carry = self.carry
+            n_synth = (frame_count - (len(carry) if carry is not None else 0)) if up is None else up.needed(frame_count)
+            if n_synth > 0:
+                ch0, ch1 = self.processor.process(
+                    d, self.cfg, n_synth, self.live_debug, self.features.consume(),
+                    is_muted=False, # Mute is handled by returns above
+                    controls=self._control_curves(now, frame_count, n_synth),
+                    # Transients sit on the same timeline as the control curves
+                    events=self.features.consume_events(), t0=now - self.control.period + self._control_horizon(frame_count),
+                    cfg_version=self.cfg_version
+                )
+                if up is None:
+                    # Interleave stereo channels
+                    out = np.column_stack((ch0, ch1)).flatten().astype(np.float32)
+                    if carry is not None:
+                        out = np.concatenate((carry.reshape(-1), out)); self.carry = None
+                    out = out.tobytes()
+                    self.last_synth[0, 0] = ch0[-1]; self.last_synth[1, 0] = ch1[-1]
+                else:
+                    up.process(np.column_stack((ch0, ch1)))
+            if up is not None:
+                # The interpolation filter can overshoot the limiter slightly
+                out = np.clip(up.pull(frame_count), -0.98, 0.98).astype(np.float32).tobytes()
+            self._govern(time.perf_counter() - t_start, frame_count, now)
+            return out
 
         except Exception as e:
-            # Failsafe silence
-            return (np.zeros(frame_count * CHANNELS, dtype=np.float32).tobytes(), pyaudio.paContinue)
+            # Failsafe silence; counted (and the first one logged) so a failing block can't hide
+            self.audio_stats['render_errors'] += 1
+            if self.audio_stats['render_errors'] == 1: print(f"AUDIO RENDER ERROR: {e!r}")
+            # The block missed its content entirely: the governor counts it as an overrun
+            try: self._govern(frame_count / float(self.chosen_rate), frame_count, time.time())
+            except Exception: pass
+            return self._silence(frame_count)
+
+    def _govern(self, elapsed, frame_count, now):
+        """ Feeds the CPU governor; quality changes are applied here, between two blocks """
+        gov = self.governor
+        gov.configure(self.cfg.get('governor', {}))
+        level = gov.record(elapsed, frame_count / float(self.chosen_rate), now)
+        self.live_debug['quality'] = gov.name
+        if level is None: return
+        factor = max(self.base_factor, internal_factor(self.chosen_rate, REDUCED_RATE)) if level >= Q_REDUCED_RATE else self.base_factor
+        # A new rate means a new chain; the engine loop builds it and the next block swaps it in
+        current = self.upsampler.factor if self.upsampler is not None else 1
+        self.pending_factor = factor if factor != current else None
+        self.processor.quality = level
+        self.block_size = self.base_block_size * 2 if level >= Q_LARGE_BLOCK else self.base_block_size
+
+    def _silence(self, frame_count):
+        if self.upsampler is not None: self.upsampler.reset()
+        self.carry = None
+        return np.zeros(frame_count * CHANNELS, dtype=np.float32).tobytes()
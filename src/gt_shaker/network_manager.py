@@ -30,9 +30,32 @@ except ImportError:
     print("ERROR: Missing pycryptodome. Run: pip install pycryptodome")
     sys.exit()
 
+GT7_KEY = b'Simulator Interface Packet GT7 v'
+PS5_PORT = 33739       # Console listens for heartbeats here
+RECV_PORT = 33740      # ...and streams telemetry back to this port
+HEARTBEAT = b'A'
+PACKET_SIZE = 0x128
+
+def decrypt_packet(data):
+    """ Decrypted telemetry packet, or None if data isn't a valid GT7 packet """
+    if len(data) < PACKET_SIZE: return None
+    iv1 = struct.unpack('<I', data[0x40:0x44])[0]
+    nonce = (iv1 ^ 0xDEADBEAF).to_bytes(4, 'little') + iv1.to_bytes(4, 'little')
+    decrypted = Salsa20.new(key=GT7_KEY, nonce=nonce).decrypt(data)
+    if decrypted[0:4] not in (b'G7S0', b'\x30\x53\x37\x47'): return None
+    return decrypted
+
+def encrypt_packet(plain, iv1):
+    """ Inverse of decrypt_packet (stand-in consoles); the IV travels unencrypted at 0x40 """
+    nonce = (iv1 ^ 0xDEADBEAF).to_bytes(4, 'little') + iv1.to_bytes(4, 'little')
+    data = bytearray(Salsa20.new(key=GT7_KEY, nonce=nonce).encrypt(bytes(plain)))
+    data[0x40:0x44] = struct.pack('<I', iv1)
+    return bytes(data)
+
 class GTData:
     def __init__(self, data):
         # --- LØBS-DATA ---
+        self.packet_id = struct.unpack('<i', data[0x70:0x74])[0]
         self.current_lap = struct.unpack('<h', data[0x74:0x74 + 2])[0]
         self.best_lap_ms = struct.unpack('<i', data[0x78:0x78 + 4])[0]
         self.last_lap_ms = struct.unpack('<i', data[0x7C:0x7C + 4])[0]
@@ -48,7 +71,13 @@ class GTData:
         # Bit 2: Loading/Processing (4) - NYT: Sikrer stilhed under load
         self.is_loading = bool(raw_flags & 4)
 
+        # Car code (identifies the car model)
+        self.car_code = struct.unpack('<i', data[0x124:0x128])[0]
+
         # --- VEKTORER ---
+        self.position_x = struct.unpack('<f', data[0x04:0x08])[0]
+        self.position_y = struct.unpack('<f', data[0x08:0x0C])[0]
+        self.position_z = struct.unpack('<f', data[0x0C:0x10])[0]
         self.velocity_x = struct.unpack('<f', data[0x10:0x14])[0]
         self.vel_y      = struct.unpack('<f', data[0x14:0x18])[0]
         self.velocity_z = struct.unpack('<f', data[0x18:0x1C])[0]
@@ -90,10 +119,11 @@ class GTData:
 
 
 class TurismoClient:
-    def __init__(self, ip_addr='192.168.1.116'):
+    def __init__(self, ip_addr='192.168.1.116', recv_port=RECV_PORT, bind_addr='0.0.0.0', fanout=None, capture=None):
         self.ip_addr = ip_addr
-        self.ps5_port = 33739
-        self.recv_port = 33740
+        self.ps5_port = PS5_PORT
+        self.recv_port = recv_port
+        self.bind_addr = bind_addr
 
         self.sock_send = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.sock_recv = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -101,13 +131,19 @@ class TurismoClient:
         self.sock_recv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
 
         try:
-            self.sock_recv.bind(('0.0.0.0', self.recv_port))
+            # The console answers the address the heartbeat came from, so with a
+            # dedicated local address (one per rig) both sockets must use it
+            if bind_addr != '0.0.0.0': self.sock_send.bind((bind_addr, 0))
+            self.sock_recv.bind((bind_addr, self.recv_port))
         except Exception as e:
             print(f"Socket bind warning: {e}")
 
         self.running = False
         self.telemetry = None
+        self.fanout = fanout # fanout.FanoutServer: hands every decrypted packet to local consumers
+        self.capture = capture # capture.CaptureWriter: raw datagrams for offline bulk decoding
         self.last_packet_time = 0.0
+        self.packet_event = threading.Event() # Set per decoded packet (engine 'event' receive mode)
         self.rpm_history = deque(maxlen=10)
 
         # State variabler til G-kraft
@@ -134,9 +170,9 @@ class TurismoClient:
     def _run_heartbeat(self):
         while self.running:
             try:
-                self.sock_send.sendto(b'A', (self.ip_addr, self.ps5_port))
+                self.sock_send.sendto(HEARTBEAT, (self.ip_addr, self.ps5_port))
                 if time.time() - self.last_packet_time > 5.0:
-                    self.sock_send.sendto(b'A', (self.ip_addr, self.ps5_port))
+                    self.sock_send.sendto(HEARTBEAT, (self.ip_addr, self.ps5_port))
                 time.sleep(1.0)
             except Exception as e:
                 print(f"Heartbeat error: {e}")
@@ -147,62 +183,62 @@ class TurismoClient:
         while self.running:
             try:
                 data, _ = self.sock_recv.recvfrom(4096)
-                if len(data) >= 0x128:
-                    iv1 = struct.unpack('<I', data[0x40:0x44])[0]
-                    nonce = (iv1 ^ 0xDEADBEAF).to_bytes(4, 'little') + iv1.to_bytes(4, 'little')
-                    key = b'Simulator Interface Packet GT7 v'
-                    cipher = Salsa20.new(key=key, nonce=nonce)
-                    decrypted = cipher.decrypt(data)
-
-                    if decrypted[0:4] in [b'G7S0', b'\x30\x53\x37\x47']:
-                        now = time.time()
-                        self.last_packet_time = now
-
-                        new_data = GTData(decrypted)
-
-                        # --- 2D FYSIK MOTOR ---
-                        dt = now - self.last_calc_time
-
-                        if dt > 0.010:
-                            ax_world = (new_data.velocity_x - self.last_v_x) / dt
-                            az_world = (new_data.velocity_z - self.last_v_z) / dt
-
-                            sin_y = math.sin(new_data.yaw)
-                            cos_y = math.cos(new_data.yaw)
-
-                            # 1. Surge (Frem/Tilbage)
-                            raw_surge = (az_world * cos_y) + (ax_world * sin_y)
-
-                            # 2. Sway (Højre/Venstre) - NY BEREGNING
-                            raw_sway = (ax_world * cos_y) - (az_world * sin_y)
-
-                            # Peak Hold / Decay for BEGGE retninger
-                            # Surge
-                            if abs(raw_surge) > abs(self.last_surge_g):
-                                self.last_surge_g = raw_surge
-                            else:
-                                self.last_surge_g *= 0.90
-
-                            # Sway
-                            if abs(raw_sway) > abs(self.last_sway_g):
-                                self.last_sway_g = raw_sway
-                            else:
-                                self.last_sway_g *= 0.90
-
-                            new_data.surge_g = self.last_surge_g
-                            new_data.sway_g  = self.last_sway_g
-
-                            self.last_v_x = new_data.velocity_x
-                            self.last_v_z = new_data.velocity_z
-                            self.last_calc_time = now
+                if self.capture is not None: self.capture.write(time.time(), data)
+                decrypted = decrypt_packet(data)
+                if decrypted is not None:
+                    now = time.time()
+                    self.last_packet_time = now
+
+                    new_data = GTData(decrypted)
+
+                    # --- 2D FYSIK MOTOR ---
+                    dt = now - self.last_calc_time
+
+                    if dt > 0.010:
+                        ax_world = (new_data.velocity_x - self.last_v_x) / dt
+                        az_world = (new_data.velocity_z - self.last_v_z) / dt
+
+                        sin_y = math.sin(new_data.yaw)
+                        cos_y = math.cos(new_data.yaw)
+
+                        # 1. Surge (Frem/Tilbage)
+                        raw_surge = (az_world * cos_y) + (ax_world * sin_y)
+
+                        # 2. Sway (Højre/Venstre) - NY BEREGNING
+                        raw_sway = (ax_world * cos_y) - (az_world * sin_y)
+
+                        # Peak Hold / Decay for BEGGE retninger
+                        # Surge
+                        if abs(raw_surge) > abs(self.last_surge_g):
+                            self.last_surge_g = raw_surge
+                        else:
+                            self.last_surge_g *= 0.90
+
+                        # Sway
+                        if abs(raw_sway) > abs(self.last_sway_g):
+                            self.last_sway_g = raw_sway
                         else:
-                            new_data.surge_g = self.last_surge_g
-                            new_data.sway_g = self.last_sway_g
+                            self.last_sway_g *= 0.90
+
+                        new_data.surge_g = self.last_surge_g
+                        new_data.sway_g  = self.last_sway_g
+
+                        self.last_v_x = new_data.velocity_x
+                        self.last_v_z = new_data.velocity_z
+                        self.last_calc_time = now
+                    else:
+                        new_data.surge_g = self.last_surge_g
+                        new_data.sway_g = self.last_sway_g
+
+                    self.rpm_history.append(new_data.engine_rpm)
+                    new_data.engine_rpm = sum(self.rpm_history) / len(self.rpm_history)
 
-                        self.rpm_history.append(new_data.engine_rpm)
-                        new_data.engine_rpm = sum(self.rpm_history) / len(self.rpm_history)
+                    if self.fanout is not None:
+                        try: self.fanout.publish(decrypted, new_data, now)
+                        except Exception as e: print(f"Fanout error: {e}")
 
-                        self.telemetry = new_data
+                    self.telemetry = new_data
+                    self.packet_event.set()
 
             except socket.timeout:
                 continue
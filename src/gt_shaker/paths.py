@@ -0,0 +1,51 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import os
+
+APP_NAME = "gt7-shaker"
+
+def _xdg_dir(env_var, fallback):
+    base = os.environ.get(env_var) or os.path.join(os.path.expanduser("~"), fallback)
+    path = os.path.join(base, APP_NAME)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def user_data_dir():
+    """ ~/.local/share/gt7-shaker (recorded laps etc.) """
+    return _xdg_dir("XDG_DATA_HOME", os.path.join(".local", "share"))
+
+def user_state_dir():
+    """ ~/.local/state/gt7-shaker (caches that should survive restarts) """
+    return _xdg_dir("XDG_STATE_HOME", os.path.join(".local", "state"))
+
+def user_runtime_dir():
+    """ $XDG_RUNTIME_DIR/gt7-shaker (sockets); falls back to the state dir without a session """
+    if not os.environ.get("XDG_RUNTIME_DIR"): return user_state_dir()
+    return _xdg_dir("XDG_RUNTIME_DIR", os.path.join(".local", "state"))
+
+def use_scratch_dirs(root):
+    """
+    Points the config file and the data/state/runtime dirs at `root` for this process, so a
+    tool that imports web_app (soak, latency) doesn't read the user's config.json, register
+    their rigs or write to their lap store and calibration cache. Call before importing web_app.
+    """
+    os.environ.setdefault("NUMBA_CACHE_DIR", os.path.join(user_state_dir(), "numba")) # keep the compiled kernels
+    for var in ("XDG_DATA_HOME", "XDG_STATE_HOME", "XDG_RUNTIME_DIR"):
+        os.environ[var] = os.path.join(root, var.split("_")[1].lower())
+    os.environ["GT_SHAKER_CONFIG"] = os.path.join(root, "config.json")
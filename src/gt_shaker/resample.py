@@ -0,0 +1,81 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+def internal_factor(output_rate, target_rate):
+    """ Integer upsampling factor that puts the internal rate closest to target_rate """
+    return max(1, int(round(output_rate / float(target_rate))))
+
+def design_interpolator(factor, taps_per_phase=16, cutoff=0.45, beta=8.0):
+    """
+    Kaiser-windowed sinc low-pass for x`factor` interpolation, split into polyphase
+    form: row p holds the taps that produce output phase p. cutoff is relative to
+    the internal (input) rate; DC gain per phase is 1.
+    """
+    n = factor * taps_per_phase
+    k = np.arange(n) - (n - 1) / 2.0
+    h = 2.0 * cutoff * np.sinc(2.0 * cutoff * k / factor) * np.kaiser(n, beta)
+    phases = h.reshape(taps_per_phase, factor).T
+    phases /= phases.sum(axis=1, keepdims=True)
+    # Reverse so a forward sliding window over the input is a plain dot product
+    return np.ascontiguousarray(phases[:, ::-1], dtype=np.float32)
+
+class Upsampler:
+    def __init__(self, factor, channels=2, taps_per_phase=16):
+        """
+        Streaming polyphase interpolator from the internal synthesis rate to the device rate.
+        Keeps taps_per_phase-1 input samples of history and a small output FIFO, so the
+        device block size never has to be a multiple of the factor (e.g. 44.1 kHz / 15).
+        """
+        self.factor = factor
+        self.channels = channels
+        self.taps = taps_per_phase
+        self.bank = design_interpolator(factor, taps_per_phase)
+        self.bank_t = np.ascontiguousarray(self.bank.T)
+        self.history = np.zeros((channels, taps_per_phase - 1), dtype=np.float32)
+        self.fifo = np.zeros((0, channels), dtype=np.float32)
+
+    def reset(self):
+        self.history[:] = 0.0
+        self.fifo = self.fifo[:0]
+
+    def needed(self, frame_count):
+        """ Internal-rate samples to render so that pull(frame_count) can be served """
+        return max(0, -(-(frame_count - len(self.fifo)) // self.factor))
+
+    def process(self, block):
+        """ block: (n, channels) float32 at the internal rate; appends n*factor output frames """
+        n = len(block)
+        if n == 0: return
+        x = np.concatenate((self.history, block.T.astype(np.float32, copy=False)), axis=1) # (channels, taps-1+n)
+        self.history[:] = x[:, n:]
+        y = np.empty((n, self.factor, self.channels), dtype=np.float32)
+        step = x.strides[1]
+        for c in range(self.channels):
+            # (n, taps) sliding windows x (taps, phases) -> every output phase of every input sample
+            windows = as_strided(x[c], shape=(n, self.taps), strides=(step, step), writeable=False)
+            np.matmul(windows, self.bank_t, out=y[:, :, c])
+        self.fifo = np.concatenate((self.fifo, y.reshape(n * self.factor, self.channels)))
+
+    def pull(self, frame_count):
+        """ Interleaved float32 output for the device """
+        out = self.fifo[:frame_count]
+        self.fifo = self.fifo[frame_count:]
+        return out.reshape(-1)
@@ -0,0 +1,271 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+
+import copy, os, sys, threading, time
+import multiprocessing as mp
+from .shm_ring import EngineChannels, ShmPublisher, ShmSubscriber
+from .telemetry_history import TelemetryHistory
+
+# Spawn (not fork): the web process is full of threads and sockets we must not clone
+_ctx = mp.get_context('spawn')
+
+def make_rig_config(base_cfg, data):
+    """ New rig = copy of the main config (effects, profiles, ...) plus the rig specific fields """
+    cfg = copy.deepcopy({k: v for k, v in base_cfg.items() if k != 'rigs'})
+    cfg['name'] = str(data.get('name', 'Rig')).strip()[:20] or 'Rig'
+    cfg['ps5_ip'] = data.get('ps5_ip', cfg['ps5_ip'])
+    cfg['recv_port'] = int(data.get('recv_port', 33740))
+    cfg['bind_addr'] = data.get('bind_addr', '0.0.0.0')
+    if 'audio' in data:
+        cfg['audio']['device_index'] = int(data['audio'].get('device_index', -1))
+        cfg['audio']['sample_rate'] = int(data['audio'].get('sample_rate', 48000))
+    if data.get('cpu') is not None: cfg['cpu'] = int(data['cpu'])
+    return cfg
+
+def rig_worker(rig_id, conn, channel_names, calib_path=None, lap_root=None):
+    """
+    Child process: one ShakerEngine per rig with its own interpreter and GIL.
+    Config snapshots come in and telemetry, features, dashboard and metrics go out
+    through the shared memory rings; the pipe only carries 'stop'.
+    """
+    from .main import ShakerEngine
+    from .tire_processor import TireProcessor, CalibrationCache
+    from .lap_store import LapStore
+    from .paths import user_data_dir, user_state_dir
+
+    channels = EngineChannels(channel_names)
+    publisher = ShmPublisher(channels)
+    cfg = publisher.poll_params()
+
+    if cfg.get('cpu') is not None and hasattr(os, 'sched_setaffinity'):
+        try: os.sched_setaffinity(0, {int(cfg['cpu'])})
+        except OSError as e: print(f"Rig {rig_id}: CPU pinning failed: {e}")
+
+    engine = ShakerEngine(cfg)
+    engine.publisher = publisher
+    calib_cache = CalibrationCache(calib_path or os.path.join(user_state_dir(), f'traction_calib_{rig_id}.json'))
+    engine.tire_processor = TireProcessor(calib_cache)
+    engine.tire_processor.configure(cfg['effects']['traction'])
+    engine.lap_store = LapStore(lap_root or os.path.join(cfg.get('lap_store_dir') or os.path.join(user_data_dir(), 'laps'), rig_id))
+    runner = threading.Thread(target=engine.run, args=(cfg['ps5_ip'],), daemon=True)
+    runner.start()
+
+    last_metrics = 0.0
+    try:
+        while True:
+            if conn.poll(0.05) and conn.recv()[0] == 'stop': break
+            new_cfg = publisher.poll_params()
+            if new_cfg is not None:
+                engine.cfg = new_cfg
+                engine.tire_processor.configure(new_cfg['effects']['traction'])
+                if engine.lap_recorder is not None: engine.lap_recorder.track = new_cfg.get('track_name', 'unknown')
+                engine.request_snapshot()
+            if not runner.is_alive():
+                print(f"Rig {rig_id}: engine thread died.")
+                sys.exit(1)
+            now = time.time()
+            if now - last_metrics >= 1.0:
+                last_metrics = now
+                publisher.metrics({'connected': getattr(engine, 'client', None) is not None, 'packets': engine.packet_seq,
+                                   'audio': engine.audio_stats, 'calibration': engine.tire_processor.calibration_status(),
+                                   'fanout': engine.fanout.stats() if engine.fanout is not None else None,
+                                   'governor': engine.governor.status()})
+    except (EOFError, BrokenPipeError):
+        pass # Parent went away
+    finally:
+        engine.running = False
+        runner.join(3.0)
+        engine.tire_processor.save()
+        calib_cache.flush()
+        channels.close()
+
+class RigHandle:
+    def __init__(self, rig_id, cfg, calib_path=None, lap_root=None):
+        """ Parent side of one engine process """
+        self.rig_id = rig_id
+        self.cfg = cfg
+        self.calib_path = calib_path
+        self.lap_root = lap_root
+        self.proc = None
+        self.conn = None
+        self.wanted = False
+        self.restarts = 0
+        self.next_restart = 0.0
+        self.started = 0.0
+        # Filled by the reader thread from the shm rings; routes only read these
+        self.snapshot = None
+        self.metrics = None
+        self.subscriber = None
+        self.params_lock = threading.Lock()
+        self.history = TelemetryHistory(seconds=float(cfg.get('history_seconds', 300)))
+
+    def is_alive(self):
+        return self.proc is not None and self.proc.is_alive()
+
+    def start(self):
+        self.wanted = True
+        self.restarts = 0
+        if not self.is_alive(): self._spawn()
+
+    def stop(self):
+        self.wanted = False
+        if self.proc is None: return
+        try: self.conn.send(('stop',))
+        except (OSError, BrokenPipeError): pass
+        self.proc.join(3.0)
+        if self.proc.is_alive(): self.proc.terminate()
+        self.proc = None
+        self.subscriber = None # Reader thread exits and releases the rings
+        self.snapshot = None
+        self.metrics = None
+
+    def update_config(self, cfg):
+        self.cfg = cfg
+        sub = self.subscriber
+        if sub is not None and self.is_alive():
+            # One producer per ring: request threads take turns
+            with self.params_lock: sub.push_params(cfg)
+
+    def _spawn(self):
+        if self.conn is not None: self.conn.close()
+        sub = ShmSubscriber(EngineChannels(), self.history)
+        sub.push_params(self.cfg) # The child reads its initial config from the ring as well
+        parent_conn, child_conn = _ctx.Pipe()
+        self.proc = _ctx.Process(target=rig_worker, args=(self.rig_id, child_conn, sub.channels.names(), self.calib_path, self.lap_root),
+                                 name=f"rig-{self.rig_id}", daemon=True)
+        self.proc.start()
+        child_conn.close()
+        self.conn = parent_conn
+        self.started = time.time()
+        self.subscriber = sub
+        threading.Thread(target=self._run_reader, args=(sub,), daemon=True).start()
+        print(f"INFO: Rig {self.rig_id} started (pid {self.proc.pid}).")
+
+    def _run_reader(self, sub):
+        """ Drains the rings at 20 Hz until this subscriber is replaced (respawn) or dropped (stop) """
+        try:
+            while self.subscriber is sub:
+                sub.drain()
+                self.snapshot = sub.dashboard()
+                self.metrics = sub.metrics()
+                time.sleep(0.05)
+        finally:
+            sub.channels.close()
+
+    def status(self):
+        return {'id': self.rig_id, 'name': self.cfg.get('name', self.rig_id), 'ps5_ip': self.cfg.get('ps5_ip'),
+                'running': self.is_alive(), 'wanted': self.wanted, 'restarts': self.restarts,
+                'pid': self.proc.pid if self.is_alive() else None,
+                'audio_device': self.cfg.get('audio', {}).get('device_index', -1),
+                'shm_dropped': self.subscriber.dropped if self.subscriber is not None else 0}
+
+class EngineProcess(RigHandle):
+    """
+    The main engine in its own process (config 'engine_process'), so Flask traffic
+    never competes with receive/render for the GIL. Offers the ShakerEngine
+    attributes the web routes use.
+    """
+    lap_recorder = None # Track name changes reach the child with the config
+
+    def __init__(self, cfg, calib_path, lap_root):
+        super().__init__('main', cfg, calib_path, lap_root)
+
+    @property
+    def running(self):
+        return self.is_alive()
+
+    @running.setter
+    def running(self, value):
+        if not value: self.stop()
+
+    @property
+    def thread_active(self):
+        return self.is_alive()
+
+    @property
+    def client(self):
+        return True if (self.metrics or {}).get('connected') else None
+
+    @property
+    def dashboard_snapshot(self):
+        return None if self.snapshot is None else (0, self.snapshot)
+
+    @property
+    def audio_stats(self):
+        return (self.metrics or {}).get('audio', {})
+
+    @property
+    def calibration(self):
+        return (self.metrics or {}).get('calibration')
+
+    @property
+    def fanout_stats(self):
+        return (self.metrics or {}).get('fanout')
+
+    @property
+    def governor_status(self):
+        return (self.metrics or {}).get('governor')
+
+    def request_snapshot(self):
+        self.update_config(self.cfg)
+
+class RigSupervisor:
+    def __init__(self, check_interval=1.0):
+        """ Keeps every wanted rig process alive, restarting crashed ones with backoff """
+        self.rigs = {}
+        self.check_interval = check_interval
+        self.running = False
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def add(self, rig_id, cfg):
+        self.rigs[rig_id] = RigHandle(rig_id, cfg)
+        return self.rigs[rig_id]
+
+    def remove(self, rig_id):
+        handle = self.rigs.pop(rig_id, None)
+        if handle: handle.stop()
+
+    def any_running(self):
+        return any(h.is_alive() for h in self.rigs.values())
+
+    def device_in_use(self, device_index, exclude=None):
+        return any(h.is_alive() and h.rig_id != exclude and h.cfg['audio'].get('device_index', -1) == device_index
+                   for h in self.rigs.values())
+
+    def stop_all(self):
+        for handle in list(self.rigs.values()): handle.stop()
+
+    def _run(self):
+        while self.running:
+            now = time.time()
+            for handle in list(self.rigs.values()):
+                if handle.wanted and not handle.is_alive() and now >= handle.next_restart:
+                    code = handle.proc.exitcode if handle.proc is not None else None
+                    delay = min(30.0, 2.0 ** handle.restarts)
+                    handle.restarts += 1
+                    handle.next_restart = now + delay
+                    print(f"SUPERVISOR: Rig {handle.rig_id} exited (code {code}). Restart #{handle.restarts}, next backoff {delay:.0f}s.")
+                    handle._spawn()
+                elif handle.is_alive() and now - handle.started > 60.0:
+                    handle.restarts = 0 # Stable again
+            time.sleep(self.check_interval)
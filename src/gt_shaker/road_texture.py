@@ -0,0 +1,84 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import numpy as np
+
+TEXTURE_MIN_HZ = 4.0 # Below this it is body motion (heave, pitch), not surface
+
+class RoadTextureAnalyzer:
+    def __init__(self, window=64, packet_rate=60.0, resync_every=4096):
+        """
+        Short-time spectrum of the per-corner suspension motion, updated per packet
+        with a sliding DFT (every bin moves by one twiddle multiply), so one packet
+        costs O(4 x window/2) no matter how long we drive. The exact spectrum is
+        recomputed with rfft every `resync_every` packets to cancel float drift.
+        """
+        self.window = window
+        self.packet_rate = packet_rate
+        self.resync_every = resync_every
+        n_bins = window // 2 + 1
+        self.freqs = np.arange(n_bins) * (packet_rate / window)
+        self.band = self.freqs >= TEXTURE_MIN_HZ
+        self.band_freqs = self.freqs[self.band]
+        self.twiddle = np.exp(2j * np.pi * np.arange(n_bins) / window)
+
+        self.ring = np.zeros((4, window), dtype=np.float64)
+        self.spec = np.zeros((4, n_bins), dtype=np.complex128)
+        self.power = np.zeros((4, len(self.band_freqs)), dtype=np.float64)
+        self.last_h = np.zeros(4, dtype=np.float64)
+        self.pos = 0
+        self.count = 0
+        self.primed = False
+
+        # Latest result: per-corner band RMS and spectral centroid (Hz)
+        self.level = np.zeros(4, dtype=np.float64)
+        self.centroid = 0.0
+
+    def reset(self):
+        self.ring[:] = 0.0; self.spec[:] = 0.0; self.level[:] = 0.0
+        self.centroid = 0.0; self.primed = False
+
+    def push(self, heights):
+        """ Adds one packet of suspension heights (FL, FR, RL, RR) """
+        if not self.primed:
+            self.last_h[:] = heights; self.primed = True
+        # Analyse suspension velocity: flat for rumble/cobbles, free of the static ride height
+        x = heights - self.last_h
+        self.last_h[:] = heights
+
+        old = self.ring[:, self.pos]
+        self.spec += (x - old)[:, None]
+        self.spec *= self.twiddle
+        self.ring[:, self.pos] = x
+        self.pos = (self.pos + 1) % self.window
+        self.count += 1
+        if self.count % self.resync_every == 0:
+            # rfft of the window in chronological order equals the sliding state up to the twiddle phase
+            self.spec[:] = np.fft.rfft(np.roll(self.ring, -self.pos, axis=1), axis=1)
+
+        np.square(np.abs(self.spec[:, self.band]), out=self.power)
+        band_power = self.power.sum(axis=1)
+        self.level[:] = np.sqrt(2.0 * band_power) / self.window
+        total = band_power.sum()
+        self.centroid = float((self.power.sum(axis=0) * self.band_freqs).sum() / total) if total > 1e-18 else 0.0
+
+    def texture(self, gain):
+        """ (front amount 0-1, rear amount 0-1, centroid Hz) """
+        f = np.tanh(max(self.level[0], self.level[1]) * gain)
+        r = np.tanh(max(self.level[2], self.level[3]) * gain)
+        return float(f), float(r), self.centroid
@@ -0,0 +1,221 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import json, os, secrets
+import numpy as np
+from multiprocessing import shared_memory
+from .telemetry_history import HISTORY_CHANNELS
+from .features import FEATURES
+
+HEADER = 32     # write seq, slot payload size, slot count, spare (uint64 each)
+SLOT_HEADER = 16 # slot seq (2*seq while valid, odd while being written), payload length
+
+class ShmRing:
+    def __init__(self, name=None, slot_size=4096, slots=8, create=True):
+        """
+        Single-producer ring of variable length records (up to slot_size bytes) in a
+        shared memory segment. Every slot carries a seqlock-style sequence number, so
+        readers in another process copy records out without locks or pickling and can
+        tell a torn or overwritten slot from a good one. There are no memory barriers: the
+        protocol assumes stores become visible to other cores in program order, which
+        holds on x86 but is not guaranteed on ARM boards.
+        """
+        if create:
+            size = HEADER + slots * (SLOT_HEADER + slot_size)
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self.shm.buf[:size] = bytes(size)
+            hdr = np.ndarray(4, dtype=np.uint64, buffer=self.shm.buf)
+            hdr[1] = slot_size; hdr[2] = slots
+        else:
+            self.shm = _attach(name)
+        self.owner = create
+        self.name = self.shm.name
+        self.hdr = np.ndarray(4, dtype=np.uint64, buffer=self.shm.buf)
+        self.slot_size = int(self.hdr[1]); self.slots = int(self.hdr[2])
+        self.stride = SLOT_HEADER + self.slot_size
+        self.slot_hdr = np.ndarray((self.slots, 2), dtype=np.uint64, buffer=self.shm.buf, offset=HEADER,
+                                   strides=(self.stride, 8))
+        self.data = np.ndarray((self.slots, self.slot_size), dtype=np.uint8, buffer=self.shm.buf,
+                               offset=HEADER + SLOT_HEADER, strides=(self.stride, 1))
+
+    @property
+    def seq(self):
+        """ Sequence number of the newest complete record (0 = nothing written yet) """
+        return int(self.hdr[0])
+
+    def write(self, payload):
+        """ Publishes bytes or a contiguous array; never blocks, overwrites the oldest record """
+        raw = np.frombuffer(payload, dtype=np.uint8) if isinstance(payload, (bytes, bytearray, memoryview)) \
+            else np.ascontiguousarray(payload).view(np.uint8).reshape(-1)
+        n = raw.shape[0]
+        if n > self.slot_size: raise ValueError(f"Record of {n} bytes exceeds the {self.slot_size} byte slot")
+        seq = int(self.hdr[0]) + 1
+        i = seq % self.slots
+        slot = self.slot_hdr[i]
+        slot[0] = 2 * seq - 1
+        self.data[i, :n] = raw
+        slot[1] = n
+        slot[0] = 2 * seq
+        self.hdr[0] = seq
+        return seq
+
+    def read(self, seq):
+        """ Copy of record seq, or None if it was never written or has been overwritten since """
+        if seq <= 0: return None
+        i = seq % self.slots
+        slot = self.slot_hdr[i]
+        if int(slot[0]) != 2 * seq: return None
+        n = int(slot[1])
+        out = self.data[i, :n].tobytes()
+        return out if int(slot[0]) == 2 * seq else None
+
+    def latest(self):
+        """ (seq, bytes) of the newest record that could be read consistently, (0, None) if none """
+        seq = self.seq
+        while seq > 0 and seq > self.seq - self.slots:
+            rec = self.read(seq)
+            if rec is not None: return seq, rec
+            seq -= 1
+        return 0, None
+
+    def read_since(self, seq):
+        """ Every record after seq that is still in the ring: (new seq, [bytes], records lost to overwrites) """
+        head = self.seq
+        start = max(seq + 1, head - self.slots + 2) # The slot after head may be mid-write
+        out = []
+        for s in range(start, head + 1):
+            rec = self.read(s)
+            if rec is not None: out.append(rec)
+        return head, out, max(0, start - seq - 1) + (head - start + 1 - len(out))
+
+    def close(self):
+        self.hdr = self.slot_hdr = self.data = None
+        self.shm.close()
+        if self.owner:
+            try: self.shm.unlink()
+            except FileNotFoundError: pass
+
+def _attach(name):
+    """
+    Opens an existing segment without taking ownership. Before 3.13 attaching also
+    registers with the resource tracker, which spawned children share with the
+    creator, so the creator's unlink still balances it.
+    """
+    try: return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError: return shared_memory.SharedMemory(name=name)
+
+# Record layouts; numeric rings carry raw float64 rows
+TELEMETRY_WIDTH = 1 + len(HISTORY_CHANNELS) # time + history channels
+FEATURE_WIDTH = 1 + len(FEATURES)           # time + feature frame
+
+CHANNEL_LAYOUT = {
+    # name: (slot bytes, slots, direction)
+    'dashboard': (16384, 4, 'engine'),    # Pre-encoded /api/telemetry JSON
+    'metrics': (16384, 4, 'engine'),      # Audio stats + calibration JSON, ~1 Hz
+    'telemetry': (8 * TELEMETRY_WIDTH, 1024, 'engine'),
+    'features': (8 * FEATURE_WIDTH, 1024, 'engine'),
+    'params': (1 << 20, 2, 'web'),        # Config snapshot JSON
+}
+
+class EngineChannels:
+    def __init__(self, names=None):
+        """
+        The set of rings between the web process and one engine process. The web side
+        creates them (names=None) and hands names() to the engine process, which attaches.
+        """
+        self.rings = {}
+        if names is None:
+            prefix = f"gtshk_{os.getpid()}_{secrets.token_hex(4)}"
+            for key, (size, slots, _) in CHANNEL_LAYOUT.items():
+                self.rings[key] = ShmRing(f"{prefix}_{key}", size, slots, create=True)
+        else:
+            for key, name in names.items():
+                self.rings[key] = ShmRing(name, create=False)
+
+    def names(self):
+        return {key: ring.name for key, ring in self.rings.items()}
+
+    def __getitem__(self, key):
+        return self.rings[key]
+
+    def close(self):
+        for ring in self.rings.values(): ring.close()
+        self.rings = {}
+
+class ShmPublisher:
+    def __init__(self, channels):
+        """ Engine side: per-packet rows, dashboard snapshots and metrics into the rings """
+        self.channels = channels
+        self.telemetry_row = np.zeros(TELEMETRY_WIDTH, dtype=np.float64)
+        self.feature_row = np.zeros(FEATURE_WIDTH, dtype=np.float64)
+        self.last_snapshot = None
+        self.params_seq = 0
+
+    def packet(self, now, history_frame, features_frame):
+        """ Called from the engine loop once per packet; two small copies, no allocation """
+        r = self.telemetry_row; r[0] = now; r[1:] = history_frame
+        self.channels['telemetry'].write(r)
+        f = self.feature_row; f[0] = now; f[1:] = features_frame
+        self.channels['features'].write(f)
+
+    def snapshot(self, snap):
+        if snap is None or snap is self.last_snapshot: return
+        self.last_snapshot = snap
+        try: self.channels['dashboard'].write(snap[1])
+        except ValueError as e: print(f"SHM: {e}")
+
+    def metrics(self, stats):
+        try: self.channels['metrics'].write(json.dumps(stats, separators=(',', ':')).encode('utf-8'))
+        except ValueError as e: print(f"SHM: {e}")
+
+    def poll_params(self):
+        """ Newest config snapshot from the web process, or None if unchanged """
+        seq, raw = self.channels['params'].latest()
+        if seq == 0 or seq == self.params_seq: return None
+        self.params_seq = seq
+        return json.loads(raw)
+
+class ShmSubscriber:
+    def __init__(self, channels, history):
+        """ Web side: drains the numeric rings into a local TelemetryHistory and caches the latest JSON records """
+        self.channels = channels
+        self.history = history
+        self.telemetry_seq = 0
+        self.features_seq = 0
+        self.features = np.zeros(len(FEATURES), dtype=np.float64)
+        self.dropped = 0
+
+    def drain(self):
+        seq, records, lost = self.channels['telemetry'].read_since(self.telemetry_seq)
+        self.telemetry_seq = seq; self.dropped += lost
+        for rec in records:
+            row = np.frombuffer(rec, dtype=np.float64)
+            self.history.push(row[0], row[1:])
+        seq, records, lost = self.channels['features'].read_since(self.features_seq)
+        self.features_seq = seq
+        if records: self.features[:] = np.frombuffer(records[-1], dtype=np.float64)[1:]
+
+    def dashboard(self):
+        return self.channels['dashboard'].latest()[1]
+
+    def metrics(self):
+        raw = self.channels['metrics'].latest()[1]
+        return json.loads(raw) if raw is not None else None
+
+    def push_params(self, cfg):
+        self.channels['params'].write(json.dumps(cfg, separators=(',', ':')).encode('utf-8'))
@@ -0,0 +1,242 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+# Long-running soak test: drives the full engine (network receive, features, rendering,
+# idle close/reopen, dashboard endpoints) for N simulated hours into the null sink and
+# fails on growth trends.
+# Usage: python -m gt_shaker.soak --hours 2 --speed 20 [--replay session.gtcap] [--report soak.json]
+
+import argparse, copy, json, os, sys, tempfile, threading, time, tracemalloc
+import numpy as np
+
+DEFAULT_LIMITS = {
+    'rss_mb_per_h': 4.0,      # resident memory growth per simulated hour
+    'rss_floor_mb': 4.0,      # ...ignored while the growth over the run stays below this
+    'traced_mb_per_h': 2.0,   # Python heap growth per simulated hour (tracemalloc)
+    'traced_floor_mb': 1.0,
+    'threads': 0,             # extra threads allowed after warm-up
+    'fds': 0,                 # extra open file descriptors allowed after warm-up
+    'p99_ratio': 1.5,         # render p99 at the end vs. after warm-up
+    'p99_floor_ms': 2.0,      # ...ignored while the p99 stays below this
+}
+
+def rss_bytes():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+def fd_count():
+    return len(os.listdir('/proc/self/fd'))
+
+def native_threads():
+    return len(os.listdir('/proc/self/task'))
+
+class RenderTimer:
+    def __init__(self, render, size=65536):
+        """ Wraps ShakerEngine.render and keeps the call durations of the current interval """
+        self.render = render
+        self.samples = np.zeros(size, dtype=np.float64)
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, frame_count, xrun=False):
+        t0 = time.perf_counter()
+        out = self.render(frame_count, xrun)
+        dt = time.perf_counter() - t0
+        with self.lock:
+            self.samples[self.count % len(self.samples)] = dt
+            self.count += 1
+        return out
+
+    def drain(self):
+        with self.lock:
+            n = min(self.count, len(self.samples))
+            out = self.samples[:n].copy(); self.count = 0
+        return out
+
+def _slope(x, y):
+    """
+    Theil-Sen growth of y per unit of x (median of the pairwise slopes): a steady leak
+    shows up, a one-off step such as a lazily allocated buffer does not
+    """
+    x = np.asarray(x, dtype=np.float64); y = np.asarray(y, dtype=np.float64)
+    i, j = np.triu_indices(len(x), 1)
+    dx = x[j] - x[i]; keep = dx > 0
+    if not keep.any(): return 0.0
+    return float(np.median((y[j] - y[i])[keep] / dx[keep]))
+
+def check_trends(samples, limits=DEFAULT_LIMITS, warmup=0.2):
+    """ Failure messages for the samples after the warm-up fraction (empty list = pass) """
+    if not samples: return ["no samples"]
+    end = samples[-1]['sim_h']
+    steady = [s for s in samples if s['sim_h'] >= end * warmup]
+    failures = []
+    if steady and steady[-1]['render_errors'] > 0:
+        failures.append(f"{steady[-1]['render_errors']} render callbacks failed (see the first AUDIO RENDER ERROR)")
+    if len(steady) < 6:
+        return failures + [f"only {len(steady)} samples after warm-up; run longer or sample more often"]
+    h = np.array([s['sim_h'] for s in steady]); span = h[-1] - h[0]
+    for key, name, unit in (('rss', 'RSS', 'rss_mb'), ('traced', 'Python heap', 'traced_mb')):
+        slope = _slope(h, [s[unit] for s in steady])
+        if slope > limits[f'{key}_mb_per_h'] and slope * span > limits[f'{key}_floor_mb']:
+            failures.append(f"{name} grows {slope:.2f} MB/h, {slope * span:.1f} MB over the run (limit {limits[f'{key}_mb_per_h']} MB/h)")
+
+    third = max(2, len(steady) // 3)
+    first, last = steady[:third], steady[-third:]
+    for key in ('threads', 'fds'):
+        base = min(s[key] for s in first); peak = max(s[key] for s in last)
+        if peak - base > limits[key]: failures.append(f"{key} grew from {base} to {peak}")
+    p_first = float(np.median([s['p99_ms'] for s in first])); p_last = float(np.median([s['p99_ms'] for s in last]))
+    if p_last > limits['p99_floor_ms'] and p_last > p_first * limits['p99_ratio']:
+        failures.append(f"render p99 drifted from {p_first:.2f} ms to {p_last:.2f} ms")
+    return failures
+
+def _poll_web(client, stop, stats):
+    """ Dashboard-like traffic: telemetry at 20 Hz, the page itself every few seconds """
+    n = 0
+    while not stop.is_set():
+        try:
+            client.get('/api/telemetry')
+            if n % 100 == 0: client.get('/'); client.get('/api/engine/stats')
+            stats['requests'] += 1
+        except Exception as e:
+            stats['errors'] += 1
+            if stats['errors'] == 1: print(f"SOAK: web request failed: {e!r}")
+        n += 1
+        stop.wait(0.05)
+
+def soak(hours=1.0, speed=20.0, interval=5.0, replay=None, cycle_minutes=10.0, idle_policy='close',
+         web=True, trace=True, recv_port=34740, limits=DEFAULT_LIMITS, top=10):
+    """
+    Runs the engine for `hours` of rendered audio at `speed` times real time and returns the
+    report (samples, top allocators, failures). Telemetry comes from a ConsoleSim on
+    127.0.0.1 (scenario or a replayed capture) at 60 Hz x speed; every `cycle_minutes` of
+    simulated time the stream pauses long enough for the engine to go idle and wake again.
+    """
+    from .paths import use_scratch_dirs
+    scratch = tempfile.mkdtemp(prefix='gt7-soak-')
+    if 'gt_shaker.web_app' in sys.modules: print("SOAK: WARNING: web_app is already loaded with the real user config")
+    use_scratch_dirs(scratch)
+    from . import web_app
+    from .main import ShakerEngine
+    from .console_sim import ConsoleSim
+    from .capture import open_capture
+    from .lap_store import LapStore
+    from .tire_processor import TireProcessor, CalibrationCache
+
+    if trace: tracemalloc.start() # one frame per trace keeps the overhead tolerable
+    cfg = copy.deepcopy(web_app.default_config)
+    cfg['ps5_ip'] = '127.0.0.1'; cfg['recv_port'] = recv_port
+    cfg['audio'].update({'backend': 'null', 'null_realtime': True, 'null_speed': speed,
+                         'idle_policy': idle_policy, 'idle_timeout': 1.0})
+    for name in ('sim_road', 'obstacle_impact', 'gear_shift'): cfg['effects'][name]['enabled'] = True
+
+    sim = ConsoleSim('127.0.0.1', reply_port=recv_port, rate=60.0 * speed, time_scale=speed,
+                     replay=open_capture(replay) if replay else None).start()
+    engine = ShakerEngine(cfg)
+    engine.tire_processor = TireProcessor(CalibrationCache(os.path.join(scratch, 'calibration.json')))
+    engine.lap_store = LapStore(os.path.join(scratch, 'laps'))
+    timer = RenderTimer(engine.render)
+    engine.render = timer # the backend picks the callback up when it opens the stream
+    threading.Thread(target=engine.run, args=('127.0.0.1',), daemon=True).start()
+
+    stop = threading.Event(); web_stats = {'requests': 0, 'errors': 0}
+    if web:
+        web_app.engine = engine
+        threading.Thread(target=_poll_web, args=(web_app.app.test_client(), stop, web_stats), daemon=True).start()
+
+    samples = []; baseline = None; next_cycle = cycle_minutes / 60.0
+    frames = lambda: engine.backend.frames_written if engine.backend is not None else 0
+    t_start = time.monotonic()
+    print(f"SOAK: {hours:g} h simulated at {speed:g}x ({hours * 3600 / speed / 60:.1f} min wall), sampling every {interval:g}s")
+    try:
+        while True:
+            time.sleep(interval)
+            sim_h = frames() / float(engine.chosen_rate or 48000) / 3600.0
+            lat = timer.drain() * 1000.0
+            traced = tracemalloc.get_traced_memory()[0] if trace else 0
+            overhead = tracemalloc.get_tracemalloc_memory() if trace else 0
+            s = {'wall_s': round(time.monotonic() - t_start, 1), 'sim_h': round(sim_h, 4),
+                 'rss_mb': round((rss_bytes() - overhead) / 1e6, 2), 'traced_mb': round(traced / 1e6, 3),
+                 'threads': threading.active_count(), 'native_threads': native_threads(), 'fds': fd_count(),
+                 'packets': sim.packets_sent, 'blocks': len(lat),
+                 'p50_ms': round(float(np.percentile(lat, 50)), 3) if len(lat) else 0.0,
+                 'p99_ms': round(float(np.percentile(lat, 99)), 3) if len(lat) else 0.0,
+                 'max_ms': round(float(lat.max()), 3) if len(lat) else 0.0,
+                 'stream_opens': engine.audio_stats['stream_opens'], 'xruns': engine.audio_stats['xruns'],
+                 'render_errors': engine.audio_stats['render_errors']}
+            samples.append(s)
+            print(f"SOAK: {s['sim_h']:6.3f} h  rss {s['rss_mb']:7.1f} MB  heap {s['traced_mb']:7.2f} MB  threads {s['threads']:3d}"
+                  f"  fds {s['fds']:3d}  render p50 {s['p50_ms']:6.2f} p99 {s['p99_ms']:6.2f} max {s['max_ms']:6.2f} ms"
+                  f"  opens {s['stream_opens']}  errors {s['render_errors']}")
+            if trace and baseline is None and sim_h >= hours * 0.2: baseline = tracemalloc.take_snapshot()
+            if sim_h >= hours: break
+            if cycle_minutes > 0 and sim_h >= next_cycle:
+                # Let the engine go idle (closing/pausing the stream per idle_policy), then wake it
+                next_cycle += cycle_minutes / 60.0
+                sim.paused = True; time.sleep(1.5); sim.paused = False
+    finally:
+        stop.set()
+        engine.running = False
+        sim.stop()
+        time.sleep(0.5)
+
+    allocators = []
+    if trace:
+        snap = tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+        stats = snap.compare_to(baseline, 'lineno') if baseline is not None else snap.statistics('lineno')
+        for st in stats[:top]:
+            frame = st.traceback[0]
+            allocators.append({'where': f"{frame.filename}:{frame.lineno}", 'size_kb': round(st.size / 1024, 1),
+                               'growth_kb': round(getattr(st, 'size_diff', 0) / 1024, 1), 'count': st.count})
+        tracemalloc.stop()
+    failures = check_trends(samples, limits)
+    if web_stats['errors']: failures.append(f"{web_stats['errors']} web requests failed")
+    wall = time.monotonic() - t_start
+    achieved = samples[-1]['sim_h'] * 3600.0 / wall if samples and wall > 0 else 0.0
+    if achieved < speed * 0.8: print(f"SOAK: reached only {achieved:.1f}x of the requested {speed:g}x (CPU bound)")
+    return {'hours': hours, 'speed': speed, 'achieved_speed': round(achieved, 2), 'idle_policy': idle_policy, 'replay': replay, 'limits': limits,
+            'web': web_stats, 'samples': samples, 'top_allocators': allocators, 'failures': failures}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soak the engine for hours of simulated driving and fail on memory/thread/fd/latency growth")
+    parser.add_argument('--hours', type=float, default=1.0, help="Simulated hours of rendered audio")
+    parser.add_argument('--speed', type=float, default=20.0, help="Acceleration over real time (audio and telemetry)")
+    parser.add_argument('--interval', type=float, default=5.0, help="Seconds between samples (wall clock)")
+    parser.add_argument('--replay', help="Send a recorded capture (.gtcap) in a loop instead of the synthetic scenario")
+    parser.add_argument('--cycle', type=float, default=10.0, metavar='MIN', help="Idle/wake cycle every MIN simulated minutes (0 = never)")
+    parser.add_argument('--idle-policy', default='close', choices=('warm', 'pause', 'close'))
+    parser.add_argument('--recv-port', type=int, default=34740, help="Local telemetry port (keep clear of a running app)")
+    parser.add_argument('--no-web', action='store_true', help="Don't poll the dashboard endpoints")
+    parser.add_argument('--no-tracemalloc', action='store_true', help="Skip Python heap tracing (lower overhead)")
+    parser.add_argument('--report', help="Write the full report as JSON")
+    args = parser.parse_args(argv)
+
+    report = soak(args.hours, args.speed, args.interval, args.replay, args.cycle, args.idle_policy,
+                  web=not args.no_web, trace=not args.no_tracemalloc, recv_port=args.recv_port)
+    if report['top_allocators']:
+        print("SOAK: top allocators (growth since warm-up):")
+        for a in report['top_allocators']:
+            print(f"  {a['growth_kb']:+9.1f} KB  {a['size_kb']:9.1f} KB  {a['count']:7d}  {a['where']}")
+    if args.report:
+        with open(args.report, 'w') as f: json.dump(report, f, indent=1)
+    for msg in report['failures']: print(f"SOAK FAIL: {msg}")
+    if not report['failures']: print("SOAK: PASS")
+    return 1 if report['failures'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
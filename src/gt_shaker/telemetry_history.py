@@ -0,0 +1,129 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+import numpy as np
+
+HISTORY_CHANNELS = ('rpm', 'speed', 'throttle', 'brake', 'road', 'impact', 'sim_road', 'traction_front', 'traction_rear')
+
+class TelemetryHistory:
+    def __init__(self, seconds=300, packet_rate=60, channels=HISTORY_CHANNELS):
+        """
+        Rolling per-packet history in preallocated ring arrays.
+        Next to the raw ring we keep a min/max pyramid (level k = blocks of 2^k packets),
+        updated in amortised O(1) per push, so a decimated query costs O(width).
+        """
+        self.channels = channels
+        self.packet_rate = packet_rate
+        cap = 1
+        while cap < seconds * packet_rate: cap <<= 1
+        self.capacity = cap
+        self.mask = cap - 1
+        self.count = 0
+
+        n_ch = len(channels)
+        self.times = np.zeros(cap, dtype=np.float64)
+        raw = np.zeros((cap, n_ch), dtype=np.float32)
+        self.mins = [raw]; self.maxs = [raw]
+        size = cap >> 1
+        while size >= 1:
+            self.mins.append(np.zeros((size, n_ch), dtype=np.float32))
+            self.maxs.append(np.zeros((size, n_ch), dtype=np.float32))
+            size >>= 1
+
+    def push(self, t, values):
+        """ Appends one packet worth of values (sequence in channel order) """
+        i = self.count & self.mask
+        self.mins[0][i] = values
+        self.times[i] = t
+        self.count += 1
+
+        # Close every pyramid block that this packet completes
+        n = self.count; k = 1
+        while k < len(self.mins) and (n & ((1 << k) - 1)) == 0:
+            j = (n >> k) - 1
+            lo = self.mins[k - 1]; hi = self.maxs[k - 1]
+            a = (2 * j) % len(lo); b = (2 * j + 1) % len(lo)
+            dst = j % len(self.mins[k])
+            np.minimum(lo[a], lo[b], out=self.mins[k][dst])
+            np.maximum(hi[a], hi[b], out=self.maxs[k][dst])
+            k += 1
+
+    def _tail(self, start, stop):
+        """ Min/max over packets [start, stop) via at most one block per level """
+        lo = None; hi = None
+        pos = start
+        for k in range(len(self.mins) - 1, -1, -1):
+            size = 1 << k
+            if pos + size <= stop and pos % size == 0:
+                j = (pos >> k) % len(self.mins[k])
+                lo = self.mins[k][j].copy() if lo is None else np.minimum(lo, self.mins[k][j])
+                hi = self.maxs[k][j].copy() if hi is None else np.maximum(hi, self.maxs[k][j])
+                pos += size
+        return lo, hi
+
+    def query(self, seconds, width):
+        """ Returns the last `seconds` of history min/max-decimated to `width` columns """
+        width = max(1, int(width))
+        n = min(self.count, int(seconds * self.packet_rate), self.capacity)
+        if n == 0:
+            return {'t': [], 'channels': {name: {'min': [], 'max': []} for name in self.channels}}
+        start = self.count - n
+        latest = self.times[(self.count - 1) & self.mask]
+
+        # Pick the pyramid level whose block size fits 1-2 times into one column
+        k = 0
+        while k + 1 < len(self.mins) and (1 << (k + 1)) <= n / width: k += 1
+        size = 1 << k
+        b0 = -(-start // size); b1 = self.count // size
+        if b1 <= b0:
+            k, size, b0, b1 = 0, 1, start, self.count
+        idx = np.arange(b0, b1) % len(self.mins[k])
+        lo = self.mins[k][idx]; hi = self.maxs[k][idx]
+        m = len(idx)
+        width = min(width, m)
+        edges = (np.arange(width) * m) // width
+        col_lo = np.minimum.reduceat(lo, edges, axis=0)
+        col_hi = np.maximum.reduceat(hi, edges, axis=0)
+
+        # Fold the packets not covered by whole blocks into the first/last column
+        if start < b0 * size:
+            t_lo, t_hi = self._tail_unaligned(start, b0 * size)
+            np.minimum(col_lo[0], t_lo, out=col_lo[0]); np.maximum(col_hi[0], t_hi, out=col_hi[0])
+        if b1 * size < self.count:
+            t_lo, t_hi = self._tail(b1 * size, self.count)
+            np.minimum(col_lo[-1], t_lo, out=col_lo[-1]); np.maximum(col_hi[-1], t_hi, out=col_hi[-1])
+
+        t = self.times[((b0 + edges) * size) & self.mask] - latest
+        t[0] = self.times[start & self.mask] - latest
+        return {
+            't': np.round(t, 3).tolist(),
+            'channels': {name: {'min': col_lo[:, c].tolist(), 'max': col_hi[:, c].tolist()} for c, name in enumerate(self.channels)}
+        }
+
+    def _tail_unaligned(self, start, stop):
+        """ Like _tail but for a range ending on a block boundary, walking down from the end """
+        lo = None; hi = None
+        pos = stop
+        for k in range(len(self.mins) - 1, -1, -1):
+            size = 1 << k
+            if pos - size >= start and pos % size == 0:
+                j = ((pos - size) >> k) % len(self.mins[k])
+                lo = self.mins[k][j].copy() if lo is None else np.minimum(lo, self.mins[k][j])
+                hi = self.maxs[k][j].copy() if hi is None else np.maximum(hi, self.maxs[k][j])
+                pos -= size
+        return lo, hi
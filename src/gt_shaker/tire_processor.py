@@ -15,20 +15,29 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <https://www.gnu.org/licenses/>.
 
+import json, threading, time
+from collections import OrderedDict
 import numpy as np
+from .config_store import ConfigWriter
+from .jit import kernel
 
-try:
-    from numba import njit
-except ImportError:
-    # Fallback if numba is not installed (slower, but functional)
-    def njit(f=None, *args, **kwargs):
-        if callable(f): return f
-        def decorator(func): return func
-        return decorator
+
+def np_traction_calc(v_car, wheel_speeds, wheel_radii, calib, threshold, sensitivity, is_braking, abs_offset):
+    """ Vectorised NumPy twin of jit_traction_calc: all four wheels in one pass """
+    if v_car < 1.0:
+        return 0.0, 0.0, 0.0, 0.0
+    diff = (wheel_speeds[:4] * wheel_radii[:4] * calib[:4]).astype(np.float64) - v_car
+    # Locking wheels are slower than the car, spinning ones faster
+    slip = np.maximum(0.0, (-diff if is_braking else diff) / v_car)
+    limit = threshold + abs_offset if is_braking else threshold
+    trig = np.where(slip > limit, np.minimum(1.0, (slip - limit) / sensitivity), 0.0)
+    front = float(max(trig[0], trig[1])); rear = float(max(trig[2], trig[3]))
+    if is_braking: return 0.0, 0.0, front, rear
+    return front, rear, 0.0, 0.0
 
 # --- JIT OPTIMIZED PHYSICS KERNEL ---
 # Updated to separate Traction (Spin) from ABS (Locking)
-@njit(fastmath=True, cache=True)
+@kernel("(float64, float32[::1], float32[::1], float32[::1], float64, float64, boolean, float64)", fallback=np_traction_calc)
 def jit_traction_calc(v_car, wheel_speeds, wheel_radii, calib, threshold, sensitivity, is_braking, abs_offset):
     """
     Calculates slip ratios and triggers using machine code.
@@ -105,30 +114,137 @@ def process_tires(data):
         processed.append({"temp": round(temp, 1), "temp_color": get_tire_color(temp)})
     return processed
 
+class CalibrationCache:
+    def __init__(self, path, max_cars=64):
+        """
+        Per-car wheel calibration factors on disk, keyed by car code.
+        Least recently driven cars are evicted beyond max_cars. Writes go through
+        the debounced atomic ConfigWriter, so saving never blocks the caller. An engine
+        process may share the file, so each write keeps whichever entry was used last.
+        """
+        self.path = path
+        self.max_cars = max_cars
+        self.entries = OrderedDict()
+        self.lock = threading.RLock() # engine thread learns, the web thread saves on stop/exit
+        try:
+            with open(path, 'r') as f:
+                for car, entry in json.load(f).items(): self.entries[car] = entry
+        except (OSError, ValueError):
+            pass
+        self.writer = ConfigWriter(path, quiet_period=5.0, merge=self._merge, lock=self.lock)
+
+    def _merge(self, ours, on_disk):
+        """ Per car, the more recently updated entry wins; then the max_cars newest are kept """
+        merged = dict(on_disk)
+        for car, entry in ours.items():
+            if entry.get('used', 0.0) >= merged.get(car, {}).get('used', 0.0): merged[car] = entry
+        newest = sorted(merged.items(), key=lambda kv: kv[1].get('used', 0.0))[-self.max_cars:]
+        return dict(newest)
+
+    def get(self, car_code):
+        with self.lock:
+            entry = self.entries.get(str(car_code))
+            if entry is None: return None
+            entry['used'] = time.time() # eviction follows the cars actually driven
+            self.entries.move_to_end(str(car_code))
+            return np.array(entry['calib'], dtype=np.float32), int(entry['samples'])
+
+    def put(self, car_code, calib, samples):
+        key = str(car_code)
+        with self.lock:
+            self.entries[key] = {'calib': [round(float(c), 6) for c in calib], 'samples': int(samples), 'used': time.time()}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_cars: self.entries.popitem(last=False)
+            self.writer.schedule(self.entries)
+
+    def flush(self):
+        self.writer.flush()
+
 class TireProcessor:
-    def __init__(self):
+    CALIB_FULL_SAMPLES = 300 # ~5 s of light-throttle cruising at 60 Hz = fully trusted
+    CALIB_SAVE_EVERY = 120
+
+    def __init__(self, calib_cache=None):
         self.threshold = 0.05
         self.sensitivity = 0.15
         self.abs_offset = 0.09 # Standardværdi
         self.use_autocalib = True
+        self.calib_gate = True
+        self.min_confidence = 0.5
         self.calib = np.array([1.0, 1.0, 1.0, 1.0], dtype=np.float32)
+        self.calib_samples = 0
+        self.car_code = None
+        self.calib_cache = calib_cache
+        self.wheel_speeds = np.zeros(4, dtype=np.float32)
+        self.wheel_radii = np.zeros(4, dtype=np.float32)
+
+    @property
+    def confidence(self):
+        return min(1.0, self.calib_samples / self.CALIB_FULL_SAMPLES)
+
+    def calibration_status(self):
+        return {'car': self.car_code, 'confidence': round(self.confidence, 2), 'samples': self.calib_samples,
+                'calib': [round(float(c), 4) for c in self.calib]}
+
+    def save(self):
+        """ Hands the current car's factors to the cache (call before flushing it on stop/exit) """
+        if self.calib_cache is not None and self.car_code is not None and self.calib_samples > 0:
+            self.calib_cache.put(self.car_code, self.calib, self.calib_samples)
+
+    def _switch_car(self, car_code):
+        """ Stores the outgoing car's factors and loads the incoming car's (or starts fresh) """
+        if self.calib_cache is not None:
+            self.save()
+            cached = self.calib_cache.get(car_code)
+        else:
+            cached = None
+        if cached is not None:
+            self.calib, self.calib_samples = cached
+        else:
+            self.calib = np.array([1.0, 1.0, 1.0, 1.0], dtype=np.float32)
+            self.calib_samples = 0
+        self.car_code = car_code
+
+    def configure(self, t_cfg):
+        """ Applies the 'traction' effect settings from a config dict """
+        self.threshold = float(t_cfg.get("threshold", 0.15))
+        self.sensitivity = float(t_cfg.get("sensitivity", 0.06))
+        self.use_autocalib = bool(t_cfg.get("use_autocalib", True))
+        self.abs_offset = float(t_cfg.get("abs_offset", 0.09))
+        self.calib_gate = bool(t_cfg.get("calib_gate", True))
+        self.min_confidence = float(t_cfg.get("min_confidence", 0.5))
 
     def get_traction_triggers(self, d):
-        if not d or d.speed_kmh < 5.0:
+        if not d: return 0.0, 0.0, 0.0, 0.0
+        car_code = getattr(d, 'car_code', None)
+        if car_code != self.car_code: self._switch_car(car_code)
+        if d.speed_kmh < 5.0:
             return 0.0, 0.0, 0.0, 0.0
 
         v_car = d.speed_kmh / 3.6
         is_braking = d.brake > 0
 
-        wheel_speeds = np.array([abs(d.wheel_speed_FL), abs(d.wheel_speed_FR), abs(d.wheel_speed_RL), abs(d.wheel_speed_RR)], dtype=np.float32)
-        wheel_radii = np.array([d.wheel_radius_FL, d.wheel_radius_FR, d.wheel_radius_RL, d.wheel_radius_RR], dtype=np.float32)
+        # Filled in place; called once per packet from the feature extractor
+        wheel_speeds = self.wheel_speeds; wheel_radii = self.wheel_radii
+        wheel_speeds[0] = abs(d.wheel_speed_FL); wheel_speeds[1] = abs(d.wheel_speed_FR)
+        wheel_speeds[2] = abs(d.wheel_speed_RL); wheel_speeds[3] = abs(d.wheel_speed_RR)
+        wheel_radii[0] = d.wheel_radius_FL; wheel_radii[1] = d.wheel_radius_FR
+        wheel_radii[2] = d.wheel_radius_RL; wheel_radii[3] = d.wheel_radius_RR
 
         if self.use_autocalib and not is_braking and 0 <= d.throttle < 30 and abs(wheel_speeds[0] - wheel_speeds[1]) < 0.1:
-            alpha = 0.001
+            # Running mean for the first samples (fast convergence), then the slow EMA
+            alpha = max(0.001, 1.0 / (self.calib_samples + 1))
             for i in range(4):
                 if wheel_speeds[i] > 0.1:
                     factor = v_car / (wheel_speeds[i] * wheel_radii[i])
                     self.calib[i] = (1 - alpha) * self.calib[i] + alpha * factor
+            self.calib_samples += 1
+            if self.calib_cache is not None and self.calib_samples % self.CALIB_SAVE_EVERY == 0:
+                self.calib_cache.put(self.car_code, self.calib, self.calib_samples)
+
+        # Untrusted factors would fire false wheelspin/ABS cues; stay quiet until converged
+        if self.use_autocalib and self.calib_gate and self.confidence < self.min_confidence:
+            return 0.0, 0.0, 0.0, 0.0
 
         # Her sender vi self.abs_offset med ind i beregningen
         return jit_traction_calc(v_car, wheel_speeds, wheel_radii, self.calib, self.threshold, self.sensitivity, is_braking, self.abs_offset)
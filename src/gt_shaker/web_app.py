@@ -16,15 +16,24 @@
 # along with this program. If not, see <https://www.gnu.org/licenses/>.
 
 
-from flask import Flask, render_template, request, jsonify
-import json, threading, pyaudio, time, copy
+from flask import Flask, Response, abort, render_template, request, jsonify
+import json, os, threading, copy, atexit, signal, sys
 from .main import ShakerEngine
-from .tire_processor import process_tires, TireProcessor
+from .tire_processor import TireProcessor, CalibrationCache
 from .audio_utils import play_test_tone
+from .device_registry import AudioDeviceRegistry
+from .audio_backends import BACKENDS
+from .eq import DEFAULT_EQ
+from .limiter import DEFAULT_LIMITER
+from .config_store import ConfigWriter
+from .lap_store import LapStore
+from .paths import user_data_dir, user_state_dir
+from .rigs import RigSupervisor, EngineProcess, make_rig_config
+from .discovery import discover_consoles
 from werkzeug.serving import WSGIRequestHandler
 
 app = Flask(__name__)
-CONFIG_FILE = "config.json"
+CONFIG_FILE = os.environ.get("GT_SHAKER_CONFIG") or "config.json"
 
 # Log filter for telemetry spam
 class NoTelemetryLog(WSGIRequestHandler):
@@ -33,7 +42,15 @@ class NoTelemetryLog(WSGIRequestHandler):
             return
         super().log_request(code, size)
 
-tire_processor = TireProcessor()
+# Learned wheel calibration per car, so traction cues are right from the first corner
+calib_cache = CalibrationCache(os.path.join(user_state_dir(), 'traction_calib.json'))
+tire_processor = TireProcessor(calib_cache)
+
+def save_calibration():
+    """ Puts the current car's learned factors and writes the cache out now """
+    tire_processor.save()
+    calib_cache.flush()
+atexit.register(save_calibration)
 
 # Standard effekter
 default_effects = {
@@ -48,10 +65,12 @@ default_effects = {
     },
     "traction": {
         "enabled": True, "threshold": 0.15, "sensitivity": 0.06,
-        "use_autocalib": True, "volume": 0.8, "front_freq": 38.0, "rear_freq": 34.0, "priority": True, "abs_offset": 0.09
+        "use_autocalib": True, "volume": 0.8, "front_freq": 38.0, "rear_freq": 34.0, "priority": True, "abs_offset": 0.09,
+        "calib_gate": True, "min_confidence": 0.5
     },
     "sim_road": {
-        "enabled": False, "volume": 0.5, "texture_volume": 0.5, "texture_freq": 30.0, "roughness": 0.3
+        "enabled": False, "volume": 0.5, "texture_volume": 0.5, "texture_freq": 30.0, "roughness": 0.3,
+        "texture_mode": "analyzed", "texture_gain": 300.0, "kerb_volume": 0.0
     },
     "obstacle_impact": {
         "enabled": True, "volume": 1.0, "threshold": 50.0, "freq": 30.0
@@ -65,8 +84,20 @@ default_config = {
     "shaker_mode": 2,
     "units": "metric",
     "allow_replays": False,
+    "history_seconds": 300,
+    "lap_recording": True,
+    "track_name": "unknown",
+    "rigs": {},
+    "engine_process": False,
+    "fanout": {"enabled": False, "unix": True, "unix_path": "", "multicast": "", "format": "raw", "ttl": 0},
+    "capture": {"enabled": False, "dir": ""},
+    "receive_mode": "poll",
+    "output_eq": copy.deepcopy(DEFAULT_EQ),
+    "limiter": dict(DEFAULT_LIMITER),
+    "governor": {"enabled": True, "high": 0.7, "low": 0.3, "up_after": 10.0, "max_level": 4},
+    "control": {"interpolate": True, "horizon_ms": 0.0, "compensate_output": False, "sub_block": 16},
     "active_profile_id": "1",
-    "audio": {"device_index": -1, "sample_rate": 48000},
+    "audio": {"device_index": -1, "sample_rate": 48000, "backend": "pyaudio", "idle_policy": "warm", "idle_timeout": 10.0, "internal_rate": 0, "block_size": 3072},
     "profiles": {
         "1": {"name": "Profil 1", "effects": copy.deepcopy(default_effects)},
         "2": {"name": "Profil 2", "effects": copy.deepcopy(default_effects)},
@@ -76,9 +107,15 @@ default_config = {
     "effects": copy.deepcopy(default_effects)
 }
 
+# Slider drags arrive as bursts of /api/update; coalesce them into one atomic write.
+# Request threads change current_config (and the rigs' configs inside it) only while holding
+# config_lock; the writer serialises under the same lock.
+config_lock = threading.RLock()
+config_writer = ConfigWriter(CONFIG_FILE, quiet_period=1.0, lock=config_lock)
+atexit.register(config_writer.flush)
+
 def save_config(cfg):
-    with open(CONFIG_FILE, 'w') as f:
-        json.dump(cfg, f, indent=4)
+    config_writer.schedule(cfg)
 
 def load_config():
     try:
@@ -102,6 +139,7 @@ def load_config():
                                     cfg["profiles"][p_id]["effects"][eff_name][key] = val
 
             if "units" not in cfg: cfg["units"] = "metric"
+            if "rigs" not in cfg: cfg["rigs"] = {}
             return cfg
     except Exception as e:
         print(f"Config load error: {e}")
@@ -110,30 +148,75 @@ def load_config():
 current_config = load_config()
 engine = None
 
+lap_store = LapStore(current_config.get('lap_store_dir') or os.path.join(user_data_dir(), 'laps'))
+
+# Extra rigs (one console + one audio device each) run as supervised worker processes
+rig_supervisor = RigSupervisor()
+for _rig_id, _rig_cfg in current_config["rigs"].items(): rig_supervisor.add(_rig_id, _rig_cfg)
+
+# Enumerated once; refreshes are postponed while the engine owns the sound card
+device_registry = AudioDeviceRegistry(is_busy=lambda: (engine is not None and engine.thread_active) or rig_supervisor.any_running())
+
 if "traction" in current_config.get("effects", {}):
-    t_cfg = current_config["effects"]["traction"]
-    tire_processor.threshold = float(t_cfg.get("threshold", 0.15))
-    tire_processor.sensitivity = float(t_cfg.get("sensitivity", 0.06))
-    tire_processor.use_autocalib = t_cfg.get("use_autocalib", True)
-    tire_processor.abs_offset = float(t_cfg.get("abs_offset", 0.09))
+    tire_processor.configure(current_config["effects"]["traction"])
+
+def apply_settings(cfg, data):
+    """ Applies an /api/update payload to a config dict (the main one or a rig's) """
+    p_id = cfg.get('active_profile_id', '1')
+    cfg['master_volume'] = float(data.get('master_volume', cfg['master_volume']))
+    cfg['output_headroom'] = float(data.get('output_headroom', cfg.get('output_headroom', 0.45)))
+    cfg['ps5_ip'] = data.get('ps5_ip', cfg['ps5_ip'])
+    cfg['units'] = data.get('units', cfg.get('units', 'metric'))
+    cfg['shaker_mode'] = int(data.get('shaker_mode', cfg.get('shaker_mode', 2)))
+    cfg['allow_replays'] = bool(data.get('allow_replays', cfg.get('allow_replays', False)))
+    if 'engine_process' in data: cfg['engine_process'] = bool(data['engine_process']) # Takes effect on the next start
+    if 'track_name' in data:
+        cfg['track_name'] = str(data['track_name']).strip()[:40] or 'unknown'
+
+    if 'audio' in data:
+        cfg['audio']['device_index'] = int(data['audio'].get('device_index', -1))
+        cfg['audio']['sample_rate'] = int(data['audio'].get('sample_rate', 48000))
+        if data['audio'].get('backend') in BACKENDS:
+            cfg['audio']['backend'] = data['audio']['backend']
+        if data['audio'].get('idle_policy') in ('warm', 'pause', 'close'):
+            cfg['audio']['idle_policy'] = data['audio']['idle_policy']
+        if 'internal_rate' in data['audio']:
+            cfg['audio']['internal_rate'] = max(0, int(data['audio']['internal_rate']))
+
+    # HER VAR FEJLEN: 'obstacle_impact' manglede i denne liste!
+    for effect in ['rpm', 'suspension', 'gear_shift', 'traction', 'sim_road', 'obstacle_impact']:
+        if effect in data:
+            for key, val in data[effect].items():
+                if isinstance(val, str) and (val.replace('.','',1).isdigit() or (val.startswith('-') and val[1:].replace('.','',1).isdigit())):
+                    val = float(val)
+                cfg['effects'][effect][key] = val
+                cfg['profiles'][p_id]['effects'][effect][key] = val
+
+def select_profile_in(cfg, p_id):
+    if p_id not in cfg['profiles']: return False
+    cfg['active_profile_id'] = p_id
+    cfg['effects'] = copy.deepcopy(cfg['profiles'][p_id]['effects'])
+    return True
+
+def rename_profile_in(cfg, p_id, new_name):
+    if p_id not in cfg['profiles'] or not new_name: return False
+    cfg['profiles'][p_id]['name'] = new_name[:20]
+    return True
 
 @app.route('/')
 def index():
-    p = pyaudio.PyAudio(); devices = []
-    for i in range(p.get_device_count()):
-        try:
-            info = p.get_device_info_by_index(i)
-            if info['maxOutputChannels'] > 0: devices.append({'id': i, 'name': info['name']})
-        except: pass
-    p.terminate()
-    return render_template('index.html', config=current_config, devices=devices)
-
-def format_time(ms):
-    if ms <= 0 or ms == 0xFFFFFFFF: return "--:--.---"
-    m = ms // 60000
-    s = (ms % 60000) // 1000
-    ms_rem = ms % 1000
-    return f"{m}:{s:02d}.{ms_rem:03d}"
+    devices = device_registry.get_devices()
+    with config_lock:
+        return render_template('index.html', config=current_config, devices=devices, api_base='', rig_name=None)
+
+@app.route('/api/devices')
+def get_devices():
+    return jsonify(device_registry.to_dict())
+
+@app.route('/api/devices/refresh', methods=['POST'])
+def refresh_devices():
+    refreshed = device_registry.refresh()
+    return jsonify({'status': 'ok' if refreshed else 'postponed', **device_registry.to_dict()})
 
 @app.route('/api/telemetry')
 def get_telemetry():
@@ -141,89 +224,108 @@ def get_telemetry():
         if not hasattr(engine, 'client') or engine.client is None:
             return jsonify({'active': True, 'is_live': False, 'status': 'connecting'})
 
-        if engine.current_data:
-            d = engine.current_data
-            packet_age = time.time() - engine.client.last_packet_time
-            is_data_fresh = packet_age < 2.5
-
-            red_start = d.car_max_rpm - 50
-            is_at_limit = (d.car_max_rpm > 0 and d.engine_rpm >= red_start) or bool(d.rev_limiter_active)
-            is_shift_point = (d.engine_rpm >= d.car_shift_rpm - 100 and d.engine_rpm < red_start - 100) and not is_at_limit
-
-            tc_f, tc_r, abs_f, abs_r = tire_processor.get_traction_triggers(d)
-
-
-            trig_f = max(tc_f, abs_f)
-            trig_r = max(tc_r, abs_r)
-
-            if not current_config['effects']['traction'].get('enabled', True):
-                trig_f, trig_r = 0.0, 0.0
-
-            debug = getattr(engine, 'live_debug', {'road_noise': 0.0, 'g_force': 0.0, 'sim_road': 0.0})
-
-            return jsonify({
-                'active': True, 'is_live': is_data_fresh, 'heartbeat': time.time(),
-                'units': current_config.get('units', 'metric'),
-                'rpm': round(d.engine_rpm), 'max_rpm': d.car_max_rpm or 8000,
-                'speed': d.speed_kmh, 'gear': d.gear, 'throttle': d.throttle, 'brake': d.brake,
-                'tires': process_tires(d), 'rev_limiter': is_at_limit, 'shift_indicator': is_shift_point,
-                'position': getattr(d, 'position', 0),
-                'best_lap': format_time(getattr(d, 'best_lap_ms', -1)),
-                'last_lap': format_time(getattr(d, 'last_lap_ms', -1)),
-                'analysis': {'road': debug['road_noise'], 'impact': debug['g_force'], 'sim_road': debug.get('sim_road', 0.0)},
-                'traction_triggers': {'front': round(trig_f, 2), 'rear': round(trig_r, 2)}
-            })
+        # Pre-encoded by the engine thread once per packet
+        snapshot = engine.dashboard_snapshot
+        if snapshot is not None:
+            return Response(snapshot[1], mimetype='application/json')
     return jsonify({'active': engine.running if engine else False, 'is_live': False})
 
+@app.route('/api/engine/stats')
+def engine_stats():
+    if not engine: return jsonify({'active': False})
+    if isinstance(engine, EngineProcess):
+        calibration, fanout, governor = engine.calibration, engine.fanout_stats, engine.governor_status
+    else:
+        calibration, fanout, governor = tire_processor.calibration_status(), engine.fanout.stats() if engine.fanout else None, engine.governor.status()
+    return jsonify({'active': engine.running, 'audio': engine.audio_stats, 'calibration': calibration, 'fanout': fanout, 'governor': governor})
+
+@app.route('/api/history')
+def get_history():
+    """ Min/max-decimated traces: ?seconds=<window>&width=<pixels> """
+    if not engine:
+        return jsonify({'t': [], 'channels': {}})
+    seconds = min(float(request.args.get('seconds', 60)), float(current_config.get('history_seconds', 300)))
+    width = min(int(request.args.get('width', 300)), 4096)
+    return jsonify(engine.history.query(seconds, width))
+
+@app.route('/api/laps')
+def list_laps():
+    car = request.args.get('car')
+    return jsonify({'laps': lap_store.list_laps(session=request.args.get('session'), track=request.args.get('track'),
+                                                car=int(car) if car else None)})
+
+@app.route('/api/laps/compare')
+def compare_laps():
+    """ ?a=<lap id>&b=<lap id>&step=<metres> """
+    try:
+        return jsonify(lap_store.compare(request.args['a'], request.args['b'], step_m=max(0.5, float(request.args.get('step', 2.0)))))
+    except KeyError as e:
+        return jsonify({'status': 'error', 'msg': f"Unknown lap {e}"}), 404
+
 @app.route('/api/update', methods=['POST'])
 def update_settings():
     data = request.json
-    p_id = current_config.get('active_profile_id', '1')
     try:
-        current_config['master_volume'] = float(data.get('master_volume', current_config['master_volume']))
-        current_config['output_headroom'] = float(data.get('output_headroom', current_config.get('output_headroom', 0.45)))
-        current_config['ps5_ip'] = data.get('ps5_ip', current_config['ps5_ip'])
-        current_config['units'] = data.get('units', current_config.get('units', 'metric'))
-        current_config['shaker_mode'] = int(data.get('shaker_mode', current_config.get('shaker_mode', 2)))
-        current_config['allow_replays'] = bool(data.get('allow_replays', current_config.get('allow_replays', False)))
-
-        if 'audio' in data:
-            current_config['audio']['device_index'] = int(data['audio'].get('device_index', -1))
-            current_config['audio']['sample_rate'] = int(data['audio'].get('sample_rate', 48000))
-
-        # HER VAR FEJLEN: 'obstacle_impact' manglede i denne liste!
-        for effect in ['rpm', 'suspension', 'gear_shift', 'traction', 'sim_road', 'obstacle_impact']:
-            if effect in data:
-                for key, val in data[effect].items():
-                    if isinstance(val, str) and (val.replace('.','',1).isdigit() or (val.startswith('-') and val[1:].replace('.','',1).isdigit())):
-                        val = float(val)
-                    current_config['effects'][effect][key] = val
-                    current_config['profiles'][p_id]['effects'][effect][key] = val
-
-        if 'traction' in data:
-            t_data = data['traction']
-            if 'threshold' in t_data: tire_processor.threshold = float(t_data['threshold'])
-            if 'sensitivity' in t_data: tire_processor.sensitivity = float(t_data['sensitivity'])
-            if 'abs_offset' in t_data: tire_processor.abs_offset = float(t_data['abs_offset'])
-            if 'use_autocalib' in t_data: tire_processor.use_autocalib = bool(t_data['use_autocalib'])
-
-        save_config(current_config)
-        if engine: engine.cfg = current_config
+        with config_lock:
+            apply_settings(current_config, data)
+            if 'traction' in data: tire_processor.configure(current_config['effects']['traction'])
+            if 'track_name' in data and engine and engine.lap_recorder:
+                engine.lap_recorder.track = current_config['track_name']
+            save_config(current_config)
+        if engine:
+            engine.cfg = current_config
+            engine.request_snapshot()
         return jsonify({'status': 'updated'})
     except Exception as e:
         print(f"Update error: {e}")
         return jsonify({'status': 'error', 'msg': str(e)})
 
+def run_discovery(cfg):
+    """ Scans the local subnets for consoles with cfg's receive address/port; remembers a single hit """
+    consoles = discover_consoles(recv_port=int(cfg.get('recv_port', 33740)), bind_addr=cfg.get('bind_addr', '0.0.0.0'))
+    if len(consoles) == 1:
+        with config_lock:
+            cfg['ps5_ip'] = consoles[0]['ip']
+            save_config(current_config)
+    return consoles
+
+@app.route('/api/discover', methods=['POST'])
+def discover():
+    if engine and engine.thread_active: return jsonify({'status': 'busy', 'msg': 'Stop the engine to scan'})
+    try:
+        consoles = run_discovery(current_config)
+    except OSError as e:
+        return jsonify({'status': 'error', 'msg': f"Scan failed: {e}"})
+    return jsonify({'status': 'ok', 'consoles': consoles, 'ps5_ip': current_config['ps5_ip']})
+
 @app.route('/api/toggle', methods=['POST'])
 def toggle_engine():
     global engine
     data = request.json
     if data.get('action') == 'start':
         if engine and engine.thread_active: return jsonify({'status': 'busy'})
-        current_config['ps5_ip'] = data.get('ip', current_config['ps5_ip'])
-        save_config(current_config)
+        if rig_supervisor.device_in_use(current_config['audio'].get('device_index', -1)):
+            return jsonify({'status': 'busy', 'msg': 'Audio device is used by a rig'})
+        if data.get('ip') == 'auto':
+            try: consoles = run_discovery(current_config)
+            except OSError as e: return jsonify({'status': 'error', 'msg': f"Scan failed: {e}"})
+            if not consoles: return jsonify({'status': 'error', 'msg': 'No console found'})
+            ip = consoles[0]['ip']
+        else:
+            ip = data.get('ip', current_config['ps5_ip'])
+        with config_lock:
+            current_config['ps5_ip'] = ip
+            save_config(current_config)
+        if current_config.get('engine_process', False):
+            # Receive + render in a child process; data crosses over shared memory rings
+            save_calibration() # the child reads the file on start
+            with config_lock:
+                engine = EngineProcess(current_config, calib_cache.path, lap_store.root)
+                engine.start()
+            return jsonify({'status': 'ok'})
         engine = ShakerEngine(current_config)
         engine.tire_processor = tire_processor
+        engine.lap_store = lap_store
         threading.Thread(target=engine.run, args=(current_config['ps5_ip'],), daemon=True).start()
         return jsonify({'status': 'ok'})
     elif data.get('action') == 'stop':
@@ -234,33 +336,157 @@ def toggle_engine():
 @app.route('/api/profiles/select', methods=['POST'])
 def select_profile():
     p_id = str(request.json.get('id'))
-    if p_id in current_config['profiles']:
-        current_config['active_profile_id'] = p_id
-        current_config['effects'] = copy.deepcopy(current_config['profiles'][p_id]['effects'])
+    with config_lock:
+        if not select_profile_in(current_config, p_id): return jsonify({'status': 'error'})
+        tire_processor.configure(current_config['effects']['traction'])
         save_config(current_config)
-        if engine: engine.cfg = current_config
+        if engine:
+            engine.cfg = current_config
+            engine.request_snapshot()
         return jsonify({'status': 'ok', 'config': current_config})
-    return jsonify({'status': 'error'})
 
 @app.route('/api/profiles/rename', methods=['POST'])
 def rename_profile():
     data = request.json
-    p_id, new_name = str(data.get('id')), data.get('name', '').strip()
-    if p_id in current_config['profiles'] and new_name:
-        current_config['profiles'][p_id]['name'] = new_name[:20]
+    with config_lock:
+        if not rename_profile_in(current_config, str(data.get('id')), data.get('name', '').strip()): return jsonify({'status': 'error'})
         save_config(current_config)
-        return jsonify({'status': 'ok'})
-    return jsonify({'status': 'error'})
+    return jsonify({'status': 'ok'})
 
 @app.route('/api/test', methods=['POST'])
 def test_shaker():
     threading.Thread(target=play_test_tone, args=(current_config, request.json.get('side', 0)), daemon=True).start()
     return jsonify({'status': 'ok'})
 
+# --- MULTI-RIG (one worker process per console/audio device) ---
+def _rig_or_404(rig_id):
+    handle = rig_supervisor.rigs.get(rig_id)
+    if handle is None: abort(404)
+    return handle
+
+@app.route('/api/rigs', methods=['GET', 'POST'])
+def rigs():
+    if request.method == 'POST':
+        data = request.json
+        with config_lock:
+            rig_id = str(data.get('id') or '')
+            if not rig_id: # first unused number, so ids freed by a delete are reused
+                n = 1
+                while str(n) in current_config['rigs']: n += 1
+                rig_id = str(n)
+            if rig_id in current_config['rigs']: return jsonify({'status': 'error', 'msg': 'Rig exists'})
+            current_config['rigs'][rig_id] = make_rig_config(current_config, data)
+            rig_supervisor.add(rig_id, current_config['rigs'][rig_id])
+            save_config(current_config)
+    return jsonify({'rigs': [h.status() for h in rig_supervisor.rigs.values()]})
+
+@app.route('/api/rigs/<rig_id>', methods=['DELETE'])
+def delete_rig(rig_id):
+    _rig_or_404(rig_id)
+    rig_supervisor.remove(rig_id)
+    with config_lock:
+        current_config['rigs'].pop(rig_id, None)
+        save_config(current_config)
+    return jsonify({'status': 'ok'})
+
+@app.route('/rig/<rig_id>/')
+def rig_index(rig_id):
+    handle = _rig_or_404(rig_id)
+    devices = device_registry.get_devices()
+    with config_lock:
+        return render_template('index.html', config=handle.cfg, devices=devices,
+                               api_base=f'/rig/{rig_id}', rig_name=handle.cfg.get('name', rig_id))
+
+@app.route('/rig/<rig_id>/api/telemetry')
+def rig_telemetry(rig_id):
+    handle = _rig_or_404(rig_id)
+    if handle.is_alive() and handle.snapshot is not None:
+        return Response(handle.snapshot, mimetype='application/json')
+    return jsonify({'active': handle.wanted, 'is_live': False})
+
+@app.route('/rig/<rig_id>/api/toggle', methods=['POST'])
+def rig_toggle(rig_id):
+    handle = _rig_or_404(rig_id)
+    data = request.json
+    if data.get('action') == 'start':
+        if handle.is_alive(): return jsonify({'status': 'busy'})
+        device = handle.cfg['audio'].get('device_index', -1)
+        if rig_supervisor.device_in_use(device, exclude=rig_id) or (engine and engine.thread_active and current_config['audio'].get('device_index', -1) == device):
+            return jsonify({'status': 'busy', 'msg': 'Audio device is already in use'})
+        if data.get('ip') == 'auto':
+            try: consoles = run_discovery(handle.cfg)
+            except OSError as e: return jsonify({'status': 'error', 'msg': f"Scan failed: {e}"})
+            if not consoles: return jsonify({'status': 'error', 'msg': 'No console found'})
+            ip = consoles[0]['ip']
+        else:
+            ip = data.get('ip', handle.cfg['ps5_ip'])
+        with config_lock:
+            handle.cfg['ps5_ip'] = ip
+            save_config(current_config)
+            handle.start()
+        return jsonify({'status': 'ok'})
+    elif data.get('action') == 'stop':
+        handle.stop()
+        return jsonify({'status': 'ok'})
+    return jsonify({'status': 'error'})
+
+@app.route('/rig/<rig_id>/api/discover', methods=['POST'])
+def rig_discover(rig_id):
+    handle = _rig_or_404(rig_id)
+    if handle.is_alive(): return jsonify({'status': 'busy', 'msg': 'Stop the rig to scan'})
+    try:
+        consoles = run_discovery(handle.cfg)
+    except OSError as e:
+        return jsonify({'status': 'error', 'msg': f"Scan failed: {e}"})
+    return jsonify({'status': 'ok', 'consoles': consoles, 'ps5_ip': handle.cfg['ps5_ip']})
+
+@app.route('/rig/<rig_id>/api/update', methods=['POST'])
+def rig_update(rig_id):
+    handle = _rig_or_404(rig_id)
+    try:
+        with config_lock:
+            apply_settings(handle.cfg, request.json)
+            save_config(current_config)
+            handle.update_config(handle.cfg)
+        return jsonify({'status': 'updated'})
+    except Exception as e:
+        print(f"Update error: {e}")
+        return jsonify({'status': 'error', 'msg': str(e)})
+
+@app.route('/rig/<rig_id>/api/profiles/select', methods=['POST'])
+def rig_select_profile(rig_id):
+    handle = _rig_or_404(rig_id)
+    with config_lock:
+        if not select_profile_in(handle.cfg, str(request.json.get('id'))): return jsonify({'status': 'error'})
+        save_config(current_config)
+        handle.update_config(handle.cfg)
+        return jsonify({'status': 'ok', 'config': handle.cfg})
+
+@app.route('/rig/<rig_id>/api/profiles/rename', methods=['POST'])
+def rig_rename_profile(rig_id):
+    handle = _rig_or_404(rig_id)
+    data = request.json
+    with config_lock:
+        if not rename_profile_in(handle.cfg, str(data.get('id')), data.get('name', '').strip()): return jsonify({'status': 'error'})
+        save_config(current_config)
+    return jsonify({'status': 'ok'})
+
+@app.route('/rig/<rig_id>/api/test', methods=['POST'])
+def rig_test_shaker(rig_id):
+    handle = _rig_or_404(rig_id)
+    if handle.is_alive(): return jsonify({'status': 'busy'})
+    threading.Thread(target=play_test_tone, args=(handle.cfg, request.json.get('side', 0)), daemon=True).start()
+    return jsonify({'status': 'ok'})
+
 @app.route('/manual')
 def manual(): return render_template('manual.html')
 
 def main():
+    # systemd stops us with SIGTERM; turn it into a normal exit so atexit flushes the config
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    device_registry.start()
+    rig_supervisor.start()
+    atexit.register(rig_supervisor.stop_all)
     app.run(host='0.0.0.0', port=5000, request_handler=NoTelemetryLog)
 
 if __name__ == '__main__': main()
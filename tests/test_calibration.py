@@ -0,0 +1,45 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+
+# Wheel calibration persistence: what was learned since the last periodic save survives a stop.
+
+import json
+import numpy as np
+from gt_shaker.tire_processor import CalibrationCache, TireProcessor
+
+def test_save_before_flush_keeps_partial_learning(tmp_path):
+    path = str(tmp_path / 'calib.json')
+    tp = TireProcessor(CalibrationCache(path))
+    tp._switch_car(1234)
+    tp.calib = np.array([1.01, 1.02, 0.99, 0.98], dtype=np.float32); tp.calib_samples = 37 # below CALIB_SAVE_EVERY
+    tp.save(); tp.calib_cache.flush()
+    with open(path) as f: entry = json.load(f)['1234']
+    assert entry['samples'] == 37
+    calib, samples = CalibrationCache(path).get(1234)
+    assert samples == 37 and np.allclose(calib, [1.01, 1.02, 0.99, 0.98])
+
+def test_get_refreshes_used(tmp_path):
+    cache = CalibrationCache(str(tmp_path / 'calib.json'), max_cars=2)
+    cache.put(1, [1.0] * 4, 10); cache.put(2, [1.0] * 4, 10)
+    cache.entries['1']['used'] = 0.0
+    cache.get(1) # car 1 driven again
+    assert cache.entries['1']['used'] >= cache.entries['2']['used']
+    cache.put(3, [1.0] * 4, 10)
+    assert set(cache.entries) == {'1', '3'}
+    assert set(cache._merge(dict(cache.entries), {})) == {'1', '3'}
@@ -0,0 +1,46 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+
+# ConfigWriter: the snapshot is taken under the owner's lock, and without one a dict that
+# never stops changing is given up on instead of spinning forever.
+
+import json, threading, time
+from gt_shaker.config_store import ConfigWriter
+
+def test_schedule_serialises_under_the_owners_lock(tmp_path):
+    lock = threading.RLock()
+    writer = ConfigWriter(str(tmp_path / 'config.json'), quiet_period=0.05, lock=lock)
+    cfg = {'a': 1}
+    done = threading.Event()
+    with lock:
+        threading.Thread(target=lambda: (writer.schedule(cfg), done.set()), daemon=True).start()
+        assert not done.wait(0.1) # waits for the edit in progress
+        cfg['b'] = 2
+    assert done.wait(1.0)
+    writer.flush()
+    with open(tmp_path / 'config.json') as f: assert json.load(f) == {'a': 1, 'b': 2}
+
+def test_schedule_gives_up_on_a_dict_that_keeps_changing(tmp_path, monkeypatch, capsys):
+    writer = ConfigWriter(str(tmp_path / 'config.json'))
+    def busy(*args, **kwargs): raise RuntimeError('dictionary changed size during iteration')
+    monkeypatch.setattr(json, 'dumps', busy)
+    t0 = time.monotonic()
+    writer.schedule({'a': 1})
+    assert time.monotonic() - t0 < 1.0
+    assert writer.pending is None and 'not written' in capsys.readouterr().out
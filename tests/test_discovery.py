@@ -0,0 +1,87 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+# Discovery against the ConsoleSim stand-in on loopback: the console is found, and hosts
+# that stay silent or answer with something that isn't GT7 telemetry are not reported.
+
+import asyncio, socket, threading, time
+import pytest
+from gt_shaker.console_sim import ConsoleSim
+from gt_shaker.discovery import discover
+
+def free_udp_port(addr='127.0.0.1'):
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind((addr, 0))
+        return s.getsockname()[1]
+
+class JunkResponder:
+    """ Answers any datagram with bytes that don't decrypt (a foreign service on the console port) """
+    def __init__(self, addr, port, reply_port):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((addr, port)); self.sock.settimeout(0.2)
+        self.reply_port = reply_port; self.running = True
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        while self.running:
+            try: _, sender = self.sock.recvfrom(64)
+            except socket.timeout: continue
+            except OSError: break
+            self.sock.sendto(b'\x00' * 296, (sender[0], self.reply_port))
+
+    def stop(self):
+        self.running = False; self.sock.close()
+
+@pytest.fixture
+def ports():
+    return free_udp_port(), free_udp_port()
+
+def run_discover(**kwargs):
+    t0 = time.monotonic()
+    found = asyncio.run(asyncio.wait_for(discover(**kwargs), timeout=10.0))
+    return found, time.monotonic() - t0
+
+def test_finds_console_sim(ports):
+    port, recv_port = ports
+    sim = ConsoleSim('127.0.0.1', port=port, reply_port=recv_port).start()
+    try:
+        found, elapsed = run_discover(hosts=['127.0.0.1'], port=port, recv_port=recv_port, bind_addr='127.0.0.1', timeout=1.0)
+    finally:
+        sim.stop()
+    assert [c['ip'] for c in found] == ['127.0.0.1']
+    assert found[0]['car_code'] == 1234 # build_packet's default car
+    assert found[0]['reply_ms'] is not None and found[0]['reply_ms'] < 1000.0
+    assert elapsed < 5.0
+
+def test_no_false_positives(ports):
+    port, recv_port = ports
+    sim = ConsoleSim('127.0.0.1', port=port, reply_port=recv_port).start()
+    junk = JunkResponder('127.0.0.3', port, recv_port)
+    try:
+        # 127.0.0.0/29: the sim on .1, a junk answer from .3, silence from the rest
+        found, _ = run_discover(subnets=['127.0.0.0/29'], port=port, recv_port=recv_port, bind_addr='0.0.0.0', timeout=1.0)
+    finally:
+        sim.stop(); junk.stop()
+    assert [c['ip'] for c in found] == ['127.0.0.1']
+
+def test_nothing_listening(ports):
+    port, recv_port = ports
+    found, elapsed = run_discover(hosts=['127.0.0.1', '127.0.0.2'], port=port, recv_port=recv_port, bind_addr='127.0.0.1',
+                                  rounds=2, timeout=0.3)
+    assert found == []
+    assert elapsed < 3.0
@@ -0,0 +1,48 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+
+# FeatureExtractor hand-off to the audio thread: transients reach exactly one block.
+
+import numpy as np
+from gt_shaker.console_sim import build_packet
+from gt_shaker.features import FeatureExtractor, PEAK_SLOTS, F_IMPACT_F, F_IMPACT_R
+from gt_shaker.network_manager import GTData
+
+CFG = {'effects': {'suspension': {'threshold': 0.5, 'impact_threshold': 3.0},
+                   'sim_road': {'texture_gain': 300.0, 'kerb_volume': 0.0},
+                   'obstacle_impact': {'enabled': True, 'threshold': 50.0}}}
+
+def test_transient_is_consumed_once():
+    fx = FeatureExtractor()
+    fx.update(GTData(build_packet(susp=(0.1,) * 4)), CFG, t=0.0)
+    fx.consume()
+    fx.update(GTData(build_packet(susp=(0.2,) * 4)), CFG, t=1 / 60) # a hard jolt on all four wheels
+    first = fx.consume().copy()
+    assert first[F_IMPACT_F] > 0 and first[F_IMPACT_R] > 0
+    second = fx.consume()
+    assert np.all(second[PEAK_SLOTS] == 0.0)
+
+def test_peak_of_several_packets_in_one_block():
+    fx = FeatureExtractor()
+    seen = []
+    for i, h in enumerate((0.1, 0.2, 0.2, 0.2)): # jolt, then the suspension settles
+        fx.update(GTData(build_packet(susp=(h,) * 4)), CFG, t=i / 60)
+        seen.append(float(fx.frame[F_IMPACT_F]))
+    assert seen[-1] < max(seen)
+    assert fx.consume()[F_IMPACT_F] == max(seen)
@@ -0,0 +1,100 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+
+# CpuGovernor state machine, driven with synthetic render times and a fake clock.
+
+from gt_shaker.governor import CpuGovernor, Q_FULL, Q_NO_TEXTURE, Q_SIMPLE_ENGINE
+
+WINDOW = 48
+BLOCK = 0.02 # seconds per block
+
+def feed(g, ratio, t, blocks):
+    """ Up to `blocks` blocks at `ratio` of the budget from time t, stopping after a level change """
+    for _ in range(blocks):
+        level = g.record(ratio * BLOCK, BLOCK, t)
+        t += BLOCK
+        if level is not None: return t, [level]
+    return t, []
+
+def make():
+    g = CpuGovernor({'high': 0.7, 'low': 0.3, 'up_after': 10.0}, window=WINDOW)
+    return g, g.last_change
+
+def test_high_p90_steps_down_one_level():
+    g, t = make()
+    t, changes = feed(g, 0.8, t, WINDOW // 4)
+    assert changes == [Q_NO_TEXTURE] and g.level == Q_NO_TEXTURE
+    assert g.drain_messages() and not g.drain_messages()
+
+def test_overrun_steps_down_even_with_low_p90():
+    g, t = make()
+    t, _ = feed(g, 0.2, t, WINDOW // 4)
+    assert g.level == Q_FULL
+    assert g.record(1.5 * BLOCK, BLOCK, t) == Q_NO_TEXTURE
+    assert g.transitions[-1]['reason'] == 'overrun' and g.overruns == 1
+
+def test_no_change_before_a_quarter_window():
+    g, t = make()
+    t, changes = feed(g, 2.0, t, WINDOW // 4 - 1)
+    assert changes == [] and g.level == Q_FULL
+    t, changes = feed(g, 2.0, t, 1)
+    assert changes == [Q_NO_TEXTURE]
+    t, changes = feed(g, 2.0, t, WINDOW // 4 - 1) # the new level starts with an empty window
+    assert changes == []
+
+def test_step_up_waits_for_up_after_times_backoff():
+    g, t = make()
+    t, _ = feed(g, 0.8, t, WINDOW // 4)
+    down_at = g.last_change
+    t, changes = feed(g, 0.1, t, int(9.9 / BLOCK))
+    assert changes == [] and g.level == Q_NO_TEXTURE
+    t, changes = feed(g, 0.1, t, int(0.2 / BLOCK))
+    assert changes == [Q_FULL] and g.last_change - down_at >= 10.0
+
+def test_premature_step_up_doubles_backoff():
+    g, t = make()
+    t, _ = feed(g, 0.8, t, WINDOW // 4)                       # down to no_texture
+    t, _ = feed(g, 0.1, t, int(10.2 / BLOCK))                 # up to full after 10 s
+    assert g.level == Q_FULL and g.backoff == 1.0
+    t, changes = feed(g, 0.8, t, WINDOW // 4)                 # ...and straight back down
+    assert changes == [Q_NO_TEXTURE] and g.backoff == 2.0
+    down_at = g.last_change
+    t, changes = feed(g, 0.1, t, int(15.0 / BLOCK))
+    assert changes == []                                      # 10 s is not enough any more
+    t, changes = feed(g, 0.1, t, int(5.2 / BLOCK))
+    assert changes == [Q_FULL] and g.last_change - down_at >= 20.0
+
+def test_disabled_returns_to_full():
+    g, t = make()
+    t, _ = feed(g, 0.8, t, WINDOW // 4)
+    t, _ = feed(g, 0.8, t, WINDOW // 4)
+    assert g.level == Q_SIMPLE_ENGINE
+    g.configure({'enabled': False})
+    assert g.record(5.0 * BLOCK, BLOCK, t) == Q_FULL
+    t, changes = feed(g, 5.0, t, WINDOW)
+    assert changes == [] and g.level == Q_FULL
+
+def test_failing_render_counts_as_overrun():
+    from gt_shaker.main import ShakerEngine
+    engine = ShakerEngine({'audio': {}})
+    def boom(d): raise RuntimeError('render failed')
+    engine._should_be_silent = boom
+    for _ in range(WINDOW // 4): engine.render(512)
+    assert engine.audio_stats['render_errors'] == WINDOW // 4
+    assert engine.governor.overruns == WINDOW // 4 and engine.governor.level == Q_NO_TEXTURE
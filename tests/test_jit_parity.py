@@ -0,0 +1,128 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+# Every numba kernel against its NumPy twin: random inputs, zero-length blocks,
+# denormals, and state (filter memories, limiter delay lines, voices) carried across calls.
+
+import numpy as np
+import pytest
+from gt_shaker import jit
+from gt_shaker.events import V_AMP
+
+jit._load_kernel_modules()
+pytestmark = pytest.mark.skipif(not jit.HAVE_NUMBA, reason="numba not installed")
+
+KERNELS = {k[0]: k for k in jit.KERNELS}
+CASES = [(k[0], sig) for k in jit.KERNELS for sig in k[2]]
+# Kernels whose first argument is the audio-rate block
+BLOCK_KERNELS = ('jit_render_voices', 'jit_biquad_cascade', 'jit_lookahead_limiter', 'generate_texture_jit', 'jit_engine_core')
+
+def assert_close(x, y):
+    err = jit.compare_outputs(x, y)
+    assert err is None, err
+
+def run_both(name, a_jit, a_np):
+    """ Calls both versions in place on their own argument lists and compares everything they produce """
+    _, disp, _, np_impl, _, _ = KERNELS[name]
+    err = jit.compare_calls(disp, np_impl, a_jit, a_np)
+    assert err is None, f"{name}: {err}"
+
+def copies(args):
+    return [a.copy() if isinstance(a, np.ndarray) else a for a in args]
+
+@pytest.mark.parametrize("name,sig", CASES)
+def test_random_inputs(name, sig):
+    _, disp, _, np_impl, _, sample = KERNELS[name]
+    rng = np.random.default_rng(7)
+    for trial in range(50):
+        assert jit.compare(disp, np_impl, sample(sig, rng, 256)) is None, f"{name} trial {trial}"
+
+@pytest.mark.parametrize("name", BLOCK_KERNELS)
+def test_zero_length_block(name):
+    _, _, sigs, _, _, sample = KERNELS[name]
+    args = sample(sigs[0], np.random.default_rng(1), 64)
+    args[0] = np.ascontiguousarray(args[0][..., :0])
+    a_jit, a_np = copies(args), copies(args)
+    run_both(name, a_jit, a_np)
+    # Nothing was consumed, so the state is untouched
+    for before, x in zip(args[1:], a_jit[1:]):
+        if isinstance(x, np.ndarray): np.testing.assert_array_equal(before, x)
+
+@pytest.mark.parametrize("name", BLOCK_KERNELS)
+def test_denormal_input(name):
+    _, _, sigs, _, _, sample = KERNELS[name]
+    args = sample(sigs[0], np.random.default_rng(2), 256)
+    if name != 'jit_render_voices': # its block is output-only
+        args[0] = (args[0] * np.float32(1e-39)).astype(args[0].dtype)
+    else:
+        args[1][:, V_AMP] *= 1e-300
+    a_jit, a_np = copies(args), copies(args)
+    run_both(name, a_jit, a_np)
+    assert np.isfinite(a_jit[0]).all()
+
+def test_biquad_state_across_blocks():
+    from gt_shaker.eq import _biquad_args
+    rng = np.random.default_rng(3)
+    x, coefs, state = _biquad_args(None, rng, 1024)
+    a_jit = [None, coefs, state.copy()]; a_np = [None, coefs, state.copy()]
+    whole = [x.copy(), coefs, state.copy()]
+    KERNELS['jit_biquad_cascade'][1](*whole)
+    out = []
+    for i in range(0, 1024, 256):
+        a_jit[0] = x[i:i + 256].copy(); a_np[0] = x[i:i + 256].copy()
+        run_both('jit_biquad_cascade', a_jit, a_np)
+        out.append(a_jit[0])
+    # Block by block is the same filter as one long call
+    assert_close(np.concatenate(out), whole[0])
+    assert_close(a_jit[2], whole[2])
+
+def test_limiter_state_across_blocks():
+    from gt_shaker.limiter import _limiter_args
+    rng = np.random.default_rng(4)
+    args = _limiter_args(None, rng, 1024)
+    x = args[0]
+    whole = copies(args)
+    KERNELS['jit_lookahead_limiter'][1](*whole)
+    a_jit, a_np = copies(args), copies(args)
+    out = []
+    for i in range(0, 1024, 200): # block length unrelated to the look-ahead
+        a_jit[0] = x[i:i + 200].copy(); a_np[0] = x[i:i + 200].copy()
+        run_both('jit_lookahead_limiter', a_jit, a_np)
+        out.append(a_jit[0])
+    assert_close(np.concatenate(out), whole[0])
+    assert np.abs(whole[0]).max() <= args[4] + 1e-6
+
+def test_voices_across_blocks():
+    from gt_shaker.events import _voice_args
+    rng = np.random.default_rng(5)
+    out, voices, block_start = _voice_args(None, rng, 256)
+    a_jit = [None, voices.copy(), 0.0]; a_np = [None, voices.copy(), 0.0]
+    for blk in range(8): # voices start, play across block edges and end
+        for a in (a_jit, a_np):
+            a[0] = np.zeros_like(out); a[2] = block_start + blk * 256
+        run_both('jit_render_voices', a_jit, a_np)
+
+def test_suspension_state_across_packets():
+    rng = np.random.default_rng(6)
+    s0 = rng.uniform(0.05, 0.15, 4).astype(np.float32)
+    a_jit = [None, s0.copy(), np.zeros(4, dtype=np.float32), 0.006, 0.035]
+    a_np = [None, s0.copy(), np.zeros(4, dtype=np.float32), 0.006, 0.035]
+    for step in range(120):
+        curr = (s0 + rng.normal(0.0, 0.01, 4) * (step % 10 == 0)).astype(np.float32)
+        a_jit[0] = curr.copy(); a_np[0] = curr.copy()
+        run_both('jit_suspension_step', a_jit, a_np)
@@ -0,0 +1,103 @@
+# GT7 Shaker for Linux 1.31
+# Copyright (C) 2026 Soeren Helskov
+# https://github.com/Helskov/GT7-Shaker-for-linux
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+
+
+# The seqlock ring behind the engine process: overwritten or half-written slots are never
+# returned, losses are counted, and a reader in another process only accepts intact records.
+
+import multiprocessing as mp
+import struct, time
+import numpy as np
+import pytest
+from gt_shaker.shm_ring import ShmRing
+
+@pytest.fixture
+def ring():
+    r = ShmRing(slot_size=64, slots=4)
+    yield r
+    r.close()
+
+def test_read_round_trip(ring):
+    assert ring.read(1) is None and ring.latest() == (0, None)
+    seq = ring.write(b'hello')
+    assert seq == 1 and ring.read(1) == b'hello'
+    assert ring.write(np.arange(3, dtype=np.float64)) == 2
+    assert np.frombuffer(ring.read(2), dtype=np.float64).tolist() == [0.0, 1.0, 2.0]
+
+def test_read_rejects_overwritten_and_mid_write_slots(ring):
+    for i in range(ring.slots + 1): ring.write(bytes([i]))
+    assert ring.read(1) is None # its slot now holds record slots + 1
+    assert ring.read(ring.slots + 1) == bytes([ring.slots])
+    head = ring.seq
+    ring.slot_hdr[head % ring.slots][0] = 2 * head - 1 # writer stopped halfway through
+    assert ring.read(head) is None
+
+def test_latest_falls_back_past_a_slot_being_written(ring):
+    for i in range(3): ring.write(bytes([i]))
+    ring.slot_hdr[3 % ring.slots][0] = 2 * 3 - 1
+    assert ring.latest() == (2, bytes([1]))
+
+def test_read_since_counts_lost_records(ring):
+    for i in range(10): ring.write(bytes([i]))
+    head, recs, lost = ring.read_since(0)
+    # The slot after head is treated as mid-write, so slots - 1 records are readable
+    assert head == 10 and recs == [bytes([7]), bytes([8]), bytes([9])] and lost == 7
+    assert ring.read_since(head) == (10, [], 0)
+    ring.write(b'x'); ring.write(b'y')
+    assert ring.read_since(head) == (12, [b'x', b'y'], 0)
+
+def test_oversize_record_raises(ring):
+    with pytest.raises(ValueError):
+        ring.write(bytes(ring.slot_size + 1))
+    assert ring.seq == 0
+
+def _record(seq):
+    """ Length and content both depend on seq, so a torn copy can't pass the check """
+    n = 8 + seq % 50
+    return struct.pack('<Q', seq) + bytes([seq % 251]) * (n - 8)
+
+def _writer(name, count):
+    ring = ShmRing(name, create=False)
+    for seq in range(1, count + 1):
+        ring.write(_record(seq))
+        if seq % 64 == 0: time.sleep(0) # let the reader in now and then
+    ring.close()
+
+def test_reader_in_another_process_only_sees_intact_records():
+    count = 50000
+    ring = ShmRing(slot_size=64, slots=8)
+    proc = mp.get_context('spawn').Process(target=_writer, args=(ring.name, count))
+    proc.start()
+    try:
+        seen = 0; accepted = 0; lost = 0; last = 0
+        deadline = time.monotonic() + 60.0
+        while seen < count and time.monotonic() < deadline:
+            head, recs, n_lost = ring.read_since(seen)
+            for rec in recs:
+                seq = struct.unpack('<Q', rec[:8])[0]
+                assert rec == _record(seq)
+                assert seq > last # in order, never twice
+                last = seq
+            accepted += len(recs); lost += n_lost; seen = head
+        proc.join(10.0)
+        assert proc.exitcode == 0 and seen == count
+        assert accepted + lost == count
+        assert accepted > 0
+    finally:
+        if proc.is_alive(): proc.kill()
+        ring.close()